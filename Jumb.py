@@ -1,11 +1,17 @@
 import os
 import sys
-import random
 import pprint
-import copy
 from functools import partial
-import datetime
+from contextlib import contextmanager
+from array import array
+from collections import OrderedDict
 import time
+import sqlite3
+import logging
+import threading
+
+# Time to first frame is measured from here, JAMB_FIRST_FRAME=1 prints it, JAMB_FIRST_FRAME=exit also quits
+STARTUP_TIME = time.perf_counter()
 
 try:
     from PySide import QtGui, QtCore
@@ -19,6 +25,19 @@ except ImportError:
     from PySide2.QtWidgets import *
     from PySide2.QtSvg import *
 
+from jamb_rules import HAND_TURNS, NUMBER_OF_DICE, NUMBER_OF_ROWS, NUMBER_OF_COLS, DICT_ROW_HEADER, DICT_COL_HEADER, COL_ANNOUNCEMENT, \
+    COL_CHECKOUT
+from jamb_game import JambGame, PlayerSheet
+from jamb_random import DiceRandom
+from jamb_journal import DEFAULT_JOURNAL_PATH, GameJournal
+from jamb_history import DEFAULT_HISTORY_PATH, HistoryStore
+from jamb_solver import SearchCancelled, search_stop, suggest_hold_for_cells
+from jamb_strategy import DICT_STRATEGY, get_strategy, choose_action
+import jamb_trace
+from jamb_trace import traced
+
+logger = logging.getLogger(__name__)
+
 def find_data_file(filename=""):
     if getattr(sys, 'frozen', False):
         # The application is frozen
@@ -42,49 +61,133 @@ DICT_DICE_IMG[4] = os.path.join(img_dir, "Dice-4-b.png")
 DICT_DICE_IMG[5] = os.path.join(img_dir, "Dice-5-b.png")
 DICT_DICE_IMG[6] = os.path.join(img_dir, "Dice-6-b.png")
 
+DICT_DICE_SVG = {}
+for i in range(1, 7):
+    DICT_DICE_SVG[i] = os.path.join(img_dir, "Dice-{0}-b.svg".format(i))
 
-HAND_TURNS = 3
-NUMBER_OF_DICE = 6
-MAXIMUM_NUMBER_OF_PLAYERS= 4
-NUMBER_OF_ROWS = 13
+
+# Players of a game: rows of the start form, the player count can go up to the maximum
+DEFAULT_NUMBER_OF_PLAYERS = 4
+MAXIMUM_NUMBER_OF_PLAYERS = 64
+# Results listed when a game ends, the best players first
+MAXIMUM_RESULT_LINES = 10
 WIDTH_DICE_SIZE = 50
+DICE_MARGIN = 5
+
+# Score sheet: padding of the texts, margin around every cell
+SHEET_PADDING = 6
+SHEET_CELL_MARGIN = 2
 
-DICT_ROW_HEADER = {}
-for i in range(6):
-    DICT_ROW_HEADER[i] = "{0}".format(i+1)
-
-DICT_ROW_HEADER[6] = "Max"
-DICT_ROW_HEADER[7] = "Min"
-DICT_ROW_HEADER[8] = "Trilling"
-DICT_ROW_HEADER[9] = "Full House"
-DICT_ROW_HEADER[10] = "Straight"
-DICT_ROW_HEADER[11] = "Poker"
-DICT_ROW_HEADER[12] = "Jamb"
-
-DICT_COL_HEADER = {}
-DICT_COL_HEADER[0] = "Free"
-DICT_COL_HEADER[1] = "Up"
-DICT_COL_HEADER[2] = "Down"
-DICT_COL_HEADER[3] = "Max/Min"
-DICT_COL_HEADER[4] = "Announcement"
-DICT_COL_HEADER[5] = "Checkout"
+# QPainter.drawText takes the alignment flags as int
+ALIGN_CENTER = int(Qt.AlignCenter)
+ALIGN_RIGHT = int(Qt.AlignRight) | int(Qt.AlignVCenter)
+
+# Bots: time budget of a move in ms, after it the bot plays a quick move, and pause before a move is played
+BOT_MOVE_BUDGET = 2000
+BOT_MOVE_DELAY = 300
+
+# Roll animation, duration 0 rolls without animation
+ROLL_ANIMATION_DURATION = 1000
+ROLL_ANIMATION_FPS = 30
 
 q_style = """
 QLabel#lblPlayerName {font-weight: bold; }
-QLabel#lblTotalHeader {font-weight: bold; }
-QLabel#lblColTotal {font-weight: bold; }
 QLabel#lblTotal {font-weight: bold; font-size: 20px; color: DarkGreen;}
-QLabel#lblColHeader {font-weight: bold; }
-QLabel#lblRowHeader {font-weight: bold; }
 """
 
-class DiceWdg(QWidget):
+DICE_HELD_COLOR = "blue"
+DICT_DICE_PALETTE = {}
+
+MAXIMUM_DICE_PIXMAPS = 64
+DICT_DICE_SVG_RENDERER = {}
+DICT_DICE_PIXMAP = OrderedDict()
+
+def render_dice_pixmap(dice_value=0, size=0, device_pixel_ratio=1.0):
+
+    pixel_size = int(round(size * device_pixel_ratio))
+    svg_path = DICT_DICE_SVG.get(dice_value)
+
+    if not svg_path or not os.path.exists(svg_path):
+        pixmap = QPixmap(DICT_DICE_IMG.get(dice_value, ""))
+        if not pixmap.isNull():
+            pixmap = pixmap.scaled(pixel_size, pixel_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            pixmap.setDevicePixelRatio(device_pixel_ratio)
+        return pixmap
+
+    renderer = DICT_DICE_SVG_RENDERER.get(dice_value)
+    if renderer is None:
+        renderer = QSvgRenderer(svg_path)
+        DICT_DICE_SVG_RENDERER[dice_value] = renderer
+
+    image = QImage(pixel_size, pixel_size, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing)
+    # The svg faces are outlines only, paint the face background under them
+    painter.setPen(Qt.NoPen)
+    painter.setBrush(Qt.white)
+    painter.drawRoundedRect(QRectF(0, 0, pixel_size, pixel_size), pixel_size * 0.12, pixel_size * 0.12)
+    renderer.render(painter, QRectF(0, 0, pixel_size, pixel_size))
+    painter.end()
+
+    pixmap = QPixmap.fromImage(image)
+    pixmap.setDevicePixelRatio(device_pixel_ratio)
+    return pixmap
+
+def get_dice_pixmap(dice_value=0, size=WIDTH_DICE_SIZE - 2 * DICE_MARGIN, device_pixel_ratio=1.0):
+    """
+    Dice face rasterized from the svg once per (size, device pixel ratio), shared by every DiceWdg.
+    The last MAXIMUM_DICE_PIXMAPS used faces are kept.
+    """
+
+    key = (dice_value, size, device_pixel_ratio)
+    pixmap = DICT_DICE_PIXMAP.get(key)
+
+    if pixmap is None:
+        pixmap = render_dice_pixmap(dice_value, size, device_pixel_ratio)
+        DICT_DICE_PIXMAP[key] = pixmap
+        if len(DICT_DICE_PIXMAP) > MAXIMUM_DICE_PIXMAPS:
+            DICT_DICE_PIXMAP.popitem(last=False)
+    else:
+        DICT_DICE_PIXMAP.move_to_end(key)
+
+    return pixmap
+
+def get_dice_palette(held=False):
+    """
+    :return: palette of the dice background, built once, setPalette does not restyle like setStyleSheet
+    """
+
+    palette = DICT_DICE_PALETTE.get(held)
+    if palette is None:
+        palette = QPalette(QApplication.palette())
+        palette.setColor(QPalette.Window, QColor(DICE_HELD_COLOR) if held else QColor(Qt.transparent))
+        DICT_DICE_PALETTE[held] = palette
+
+    return palette
+
+def set_widget_state(widget=None, enabled=None, text=None):
+    """
+    Apply only the changes of the enabled state and the text of a widget.
+    """
+
+    if enabled is not None and widget.testAttribute(Qt.WA_Disabled) == enabled:
+        widget.setEnabled(enabled)
+
+    if text is not None and widget.text() != text:
+        widget.setText(text)
+
+class DiceWdg(QLabel):
+
+    sig_press = Signal()
 
     def __init__(self, parent=None):
         super(self.__class__, self).__init__(parent)
 
         self.held = False
         self.dice_value = 0
+        self.shown_pixmap = None
 
         self.set_value(0)
 
@@ -92,22 +195,23 @@ class DiceWdg(QWidget):
         self.fill_dice()
         self.colorized_dice()
 
-    def set_value(self, dice_value=None):
+    def set_value(self, dice_value=0):
         if not self.held:
-            if dice_value is None:
-                self.dice_value = random.randint(1,6)
-            else:
-                self.dice_value = dice_value
+            self.dice_value = dice_value
 
     def fill_dice(self):
-        self.stackedWdg.setCurrentIndex(self.dice_value)
+        pixmap = get_dice_pixmap(self.dice_value, WIDTH_DICE_SIZE - 2 * DICE_MARGIN, self.devicePixelRatioF())
+        if pixmap is not self.shown_pixmap:
+            self.setPixmap(pixmap)
+            self.shown_pixmap = pixmap
 
     def get_value(self):
         return self.dice_value
 
     def set_held(self, state=True):
-        self.held = state
-        self.colorized_dice()
+        if state != self.held:
+            self.held = state
+            self.colorized_dice()
 
     def get_held(self):
         return self.held
@@ -116,57 +220,38 @@ class DiceWdg(QWidget):
         self.set_held(not self.held)
 
     def colorized_dice(self):
-        self.stackedWdg.setStyleSheet("QStackedWidget {background-color: %s}" % ("blue" if self.held else "transparent"))
-
-    def mouse_press_event(self, event):
+        self.setPalette(get_dice_palette(self.held))
 
-        if event.type() == QEvent.Type.MouseButtonPress or event.type() == QEvent.Type.MouseButtonDblClick:
-            if event.button() == Qt.MouseButton.LeftButton:
-                self.hold_switch()
+    def mousePressEvent(self, event):
 
+        if event.button() == Qt.MouseButton.LeftButton:
+            self.hold_switch()
+            self.sig_press.emit()
 
     def build_ui(self):
 
-        self.setContentsMargins(0,0,0,0)
-        main_layout = QVBoxLayout()
-        main_layout.setAlignment(Qt.AlignLeft)
-        main_layout.setContentsMargins(0, 0, 0, 0)
-
-        self.stackedWdg = QStackedWidget()
-        # self.stackedWdg.setContentsMargins(5, 5, 5, 5)
-        self.stackedWdg.setAutoFillBackground(True)
-
-        self.stackedWdg.setFixedSize(WIDTH_DICE_SIZE, WIDTH_DICE_SIZE)
-
-        main_layout.addWidget(self.stackedWdg)
-
-        for dice in DICT_DICE_IMG:
-
-            lblImg = QLabel()
-
-            lblImg.mousePressEvent = self.mouse_press_event
-            lblImg.setObjectName("lblDice")
-            lblImg.setContentsMargins(5,5,5,5)
-
-            img_path = DICT_DICE_IMG.get(dice)
-            if img_path:
-                pixmap = QPixmap(img_path)
-                pixmap.scaledToWidth(WIDTH_DICE_SIZE, Qt.FastTransformation)
-                lblImg.setPixmap(pixmap)
-
-            lblImg.setFixedSize(WIDTH_DICE_SIZE, WIDTH_DICE_SIZE)
-
-            lblImg.setScaledContents(True)
-
-            self.stackedWdg.insertWidget(dice, lblImg)
-
-        self.setLayout(main_layout)
+        self.setObjectName("lblDice")
+        self.setAutoFillBackground(True)
+        self.setAlignment(Qt.AlignCenter)
+        self.setContentsMargins(DICE_MARGIN, DICE_MARGIN, DICE_MARGIN, DICE_MARGIN)
+        self.setFixedSize(WIDTH_DICE_SIZE, WIDTH_DICE_SIZE)
 
 class DicesTableWdg(QWidget):
 
-    def __init__(self, parent=None):
+    sig_rolled = Signal(object)
+    sig_held = Signal(int, bool)
+
+    def __init__(self, parent=None, rng=None):
         super(self.__class__, self).__init__(parent)
         self.lst_diceWdg = []
+        self.rng = rng if rng is not None else DiceRandom()
+        self.final_dices = None
+        self.roll_trace = None
+        self.animation_duration = ROLL_ANIMATION_DURATION
+        self.animationElapsed = QElapsedTimer()
+        self.animationTimer = QTimer(self)
+        self.animationTimer.timeout.connect(self.roll_frame)
+        self.set_animation()
         self.build_ui()
 
     def create_layout(self):
@@ -175,133 +260,104 @@ class DicesTableWdg(QWidget):
         for i in range(NUMBER_OF_DICE):
             diceWdg = DiceWdg()
             diceWdg.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
+            diceWdg.sig_press.connect(partial(self.dice_pressed, i))
             item_layout.addWidget(diceWdg)
             self.lst_diceWdg.append(diceWdg)
 
         return item_layout
 
     def reset_dice(self):
+        self.setUpdatesEnabled(False)
         for diceWdg in self.lst_diceWdg:
             if isinstance(diceWdg, DiceWdg):
                 diceWdg.set_held(False)
                 diceWdg.set_value(0)
                 diceWdg.fill_dice()
+        self.setUpdatesEnabled(True)
 
-    def roll_dice(self):
-
-        end_dt = datetime.datetime.now() + datetime.timedelta(seconds=1)
-
-        while datetime.datetime.now() < end_dt:
-            for diceWdg in self.lst_diceWdg:
-                if isinstance(diceWdg, DiceWdg):
-                    diceWdg.set_value()
-                    diceWdg.fill_dice()
-
-            QApplication.processEvents()
-
-    def get_dice_value(self):
-        dict_result = {}
-        for diceWdg in self.lst_diceWdg:
-            if isinstance(diceWdg, DiceWdg):
-                value = diceWdg.get_value()
-
-                if value not in dict_result:
-                    dict_result[value] = 0
-                dict_result[value] += 1
-
-        return dict_result
-
-    def get_sign_dict(self):
-
+    def set_rng(self, rng=None):
         """
-        [7] = "Max"
-        [8] = "Min"
-        [9] = "Trilling"
-        [10] = "Full House"
-        [11] = "Straight"
-        [12] = "Poker"
-        [13] = "Jamb"
-
-        :return:
+        :param rng: DiceRandom of the game, animation frames use its cosmetic stream
         """
 
-        dict_result = {}
+        self.rng = rng
 
-        for i in range(len(DICT_ROW_HEADER)):
-            dict_result[i] = 0
+    def set_animation(self, duration=ROLL_ANIMATION_DURATION, fps=ROLL_ANIMATION_FPS):
+        """
+        :param duration: roll animation duration in milliseconds, 0 rolls without animation
+        :param fps: animation frames per second
+        """
 
-        dict_dices = self.get_dice_value()
+        self.animation_duration = duration
+        self.animationTimer.setInterval(max(1, int(1000 / fps)))
 
-        lst_dice = []
+    def is_rolling(self):
+        return self.animationTimer.isActive()
 
-        for dice in sorted(dict_dices):
-            dice_count = dict_dices.get(dice)
-            value = dice_count * dice
+    def roll_dice(self, dices=None):
+        """
+        :param dices: final dice values, None rolls random values for the dice that are not held
+        """
 
-            for i in range(dice_count):
-                lst_dice.append(dice)
+        if self.is_rolling():
+            return
 
-            sign_index = dice
-            dict_result[sign_index] = value
-            add_value = 0
+        self.final_dices = dices
+        self.roll_trace = jamb_trace.begin("roll animation")
 
-            if dice_count >= 3:  # Trilling
-                sign_index = 9
-                add_value = 30
-                dict_result[sign_index] = value + add_value
+        if self.animation_duration <= 0:
+            self.finish_roll()
+            return
 
-                for dice_other in sorted(dict_dices):
-                    other_dice_count = dict_dices.get(dice_other)
-                    if dice != dice_other and other_dice_count and other_dice_count == 2:
-                        sign_index = 10
-                        add_value = 40
-                        dict_result[sign_index] = value + (dice_other * other_dice_count) + add_value
+        self.animationElapsed.start()
+        self.animationTimer.start()
 
-                if dice_count >= 4:  # Poker
-                    add_value = 50
-                    sign_index = 12
-                    dict_result[sign_index] = value + add_value
+    def roll_frame(self):
 
-                    if dice_count >= 5:  # Low jamb
-                        sign_index = 13
-                        add_value = 60
-                        if dice == 1:
-                            value = 100
-                            add_value = 0
+        if self.animationElapsed.elapsed() >= self.animation_duration:
+            self.animationTimer.stop()
+            self.finish_roll()
+            return
 
-                        if dice_count == 6:  # Height jamb
-                            sign_index = 13
-                            add_value = 0
-                            value = 100
-                            if dice == 1:
-                                value = 150
-                                add_value = 0
+        for diceWdg in self.lst_diceWdg:
+            if isinstance(diceWdg, DiceWdg):
+                diceWdg.set_value(self.rng.cosmetic_dice())
+                diceWdg.fill_dice()
 
-                        dict_result[sign_index] = value + add_value
+    def finish_roll(self):
 
-        dict_result[7] = 0 if not lst_dice else sum(lst_dice)
-        dict_result[8] = 0 if not lst_dice else sum(sorted(lst_dice[:-1]))
+        final_dices = self.final_dices
+        if final_dices is None:
+            final_dices = self.rng.roll(self.get_dices(), [diceWdg.get_held() for diceWdg in self.lst_diceWdg])
 
-        if len(dict_dices.keys()) >= NUMBER_OF_DICE - 1:  # Low or Middle Kenta
-            sign_index = 0
-            value = 0
+        for i, diceWdg in enumerate(self.lst_diceWdg):
+            if isinstance(diceWdg, DiceWdg):
+                diceWdg.dice_value = final_dices[i]
+                diceWdg.fill_dice()
 
-            if len(list(set(dict_dices.keys()) & set([1, 2, 3, 4 ,5]))) == 5:
-                sign_index = 11
-                value = 45
+        jamb_trace.end(self.roll_trace)
+        self.roll_trace = None
+        self.sig_rolled.emit(self.get_dices())
 
-            if len(list(set(dict_dices.keys()) & set([2, 3, 4 ,5, 6]))) == 5:
-                sign_index = 11
-                value = 50
+    def dice_pressed(self, index=0):
+        diceWdg = self.lst_diceWdg[index]
+        self.sig_held.emit(index, diceWdg.get_held())
 
-            if len(dict_dices.keys()) == NUMBER_OF_DICE:  # Height Kenta
-                sign_index = 11
-                value = 100
+    def get_dices(self):
+        return tuple(diceWdg.get_value() for diceWdg in self.lst_diceWdg if isinstance(diceWdg, DiceWdg))
 
-            if sign_index:
-                dict_result[sign_index] = value
+    def set_dices(self, dices=()):
+        for diceWdg, dice_value in zip(self.lst_diceWdg, dices):
+            if isinstance(diceWdg, DiceWdg):
+                diceWdg.dice_value = dice_value
+                diceWdg.fill_dice()
 
-        return dict_result
+    def set_held_mask(self, held_mask=()):
+        self.setUpdatesEnabled(False)
+        for diceWdg, held in zip(self.lst_diceWdg, held_mask):
+            if isinstance(diceWdg, DiceWdg):
+                diceWdg.set_held(bool(held))
+        self.setUpdatesEnabled(True)
 
     def build_ui(self):
 
@@ -311,72 +367,6 @@ class DicesTableWdg(QWidget):
 
         pass
 
-class LineEditWdg(QLineEdit):
-
-    sig_press = Signal()
-
-    def __init__(self, parent=None, col_name="", col_id=0, row_name="", row_id=0):
-        super(self.__class__, self).__init__(parent)
-        self.col_name = col_name
-        self.col_id = col_id
-        self.row_name = row_name
-        self.row_id = row_id
-        self.assigned = False
-        self.value = 0
-
-    def fill_value(self):
-        self.setText("{0}".format(self.value))
-
-    def get_index(self):
-        return self.col_id, self.row_id
-
-    def set_enable_state(self, state=True):
-
-        if state:
-            self.setEnabled(state)
-
-        if not state and not self.assigned:
-            self.setEnabled(state)
-
-    def assign_value(self, str_value=""):
-
-        self.value = int(str_value) if str_value and "{0}".format(str_value).isnumeric() else 0
-        self.assigned = True
-        self.fill_value()
-        self.setReadOnly(True)
-
-    def get_object_name(self):
-        return "[{0}, {1}] = {2}".format(self.col_name, self.row_name, self.value)
-
-    def __repr__(self):
-        return self.get_object_name()
-
-    def __le__(self, other):
-        return self.value < other.value
-
-    def __lt__(self, other):
-        return self.value <= other.value
-
-    def __eq__(self, other):
-        return self.value == other.value
-
-    def __gt__(self, other):
-        return self.value > other.value
-
-    def __ge__(self, other):
-        return self.value >= other.value
-
-    def keyPressEvent(self, event):
-        if event.key() == Qt.Key_Backspace:
-            event.ignore()
-            return None
-        else:
-            super(self.__class__, self).keyPressEvent(event)
-
-    def mousePressEvent(self, event):
-        super(self.__class__, self).mousePressEvent(event)
-        self.sig_press.emit()
-
 class LabelWdg(QLabel):
 
     def __init__(self, parent=None, col_name=""):
@@ -390,275 +380,359 @@ class LabelWdg(QLabel):
     def fill_value(self):
         self.setText("{0}".format(self.value))
 
-class JambPlayerTable(QWidget):
+class ScoreSheetWdg(QWidget):
+    """
+    Score sheet painted in one widget: column headers, row headers, the cells and the column totals.
+    A click on a cell that can be written or is filled emits sig_press(col, row).
+    """
+
+    sig_press = Signal(int, int)
 
-    def __init__(self, parent=None, player_name=""):
+    def __init__(self, parent=None):
         super(self.__class__, self).__init__(parent)
-        self.dict_cols = {}
-        self.checkout = False
-        self.checkout_row_index = -1
-        self.checkout_col_index = 5
-        self.player_name = player_name
-        self.matrixWdg = []
-        self.lstTotalWdg = []
-        self.dict_dice_values = {}
-        self.txtLineEditWdg = LineEditWdg()
-        self.index_element = [-1, -1]
-        self.validator = QRegExpValidator()
-        self.build_ui()
+        self.values = array("h", [0] * (NUMBER_OF_COLS * NUMBER_OF_ROWS))
+        self.lst_filled = [0] * NUMBER_OF_COLS
+        self.lst_open = [0] * NUMBER_OF_COLS
+        self.lst_total = [0] * NUMBER_OF_COLS
+        self.selected_cell = None
+        self.preview_text = ""
 
-    def create_content_layout(self):
-        grid_layout = QGridLayout()
-        grid_layout.setSpacing(5)
+        # Region of the changed cells while a batch of changes is applied, None outside of a batch
+        self.dirty_region = None
 
-        self.matrixWdg = [[LineEditWdg(col_name=col_name, row_name=row_name, row_id=row_index, col_id=col_index) for row_index, row_name in DICT_ROW_HEADER.items()] for col_index, col_name in DICT_COL_HEADER.items()]
+        self.header_width = 0
+        self.cell_width = 0
+        self.row_height = 0
 
-        row = 1
-        for key in DICT_ROW_HEADER:
-            lblRowHeader = QLabel(DICT_ROW_HEADER[key])
-            lblRowHeader.setAlignment(Qt.AlignRight)
-            lblRowHeader.setObjectName("lblRowHeader")
-            grid_layout.addWidget(lblRowHeader, row, 0)
-            row += 1
+        self.build_ui()
 
-        col = 1
-        for key in DICT_COL_HEADER:
-            lblColHeader = QLabel(DICT_COL_HEADER[key])
-            lblColHeader.setAlignment(Qt.AlignCenter)
-            lblColHeader.setObjectName("lblColHeader")
-            grid_layout.addWidget(lblColHeader, 0, col)
-            col += 1
+    @contextmanager
+    def batch(self):
+        """
+        Repaint the cells changed in the block with one update.
+        """
 
-        for col_ in range(len(self.matrixWdg)):
-            for row_ in range(len(self.matrixWdg[col_])):
-                grid_layout.addWidget(self.matrixWdg[col_][row_], row_+1, col_+1)
-                if isinstance(self.matrixWdg[col_][row_], QLineEdit):
+        self.dirty_region = QRegion()
+        try:
+            yield
+        finally:
+            dirty_region = self.dirty_region
+            self.dirty_region = None
+            if not dirty_region.isEmpty():
+                self.update(dirty_region)
+
+    def update_cell(self, col=0, row=0):
+        if self.dirty_region is not None:
+            self.dirty_region += self.get_cell_rect(col, row)
+        else:
+            self.update(self.get_cell_rect(col, row))
+
+    def clear(self):
+        for i in range(len(self.values)):
+            self.values[i] = 0
+        self.lst_filled = [0] * NUMBER_OF_COLS
+        self.lst_open = [0] * NUMBER_OF_COLS
+        self.lst_total = [0] * NUMBER_OF_COLS
+        self.selected_cell = None
+        self.preview_text = ""
+        self.update()
+
+    def set_value(self, col=0, row=0, value=0):
+        self.values[col * NUMBER_OF_ROWS + row] = value
+        self.lst_filled[col] |= 1 << row
+        self.update_cell(col, row)
+
+    def set_open_mask(self, col=0, open_mask=0):
+        changed_mask = open_mask ^ self.lst_open[col]
+        self.lst_open[col] = open_mask
+
+        row = 0
+        while changed_mask:
+            if changed_mask & 1:
+                self.update_cell(col, row)
+            changed_mask >>= 1
+            row += 1
 
-                    self.matrixWdg[col_][row_].setValidator(self.validator)
-                    self.matrixWdg[col_][row_].sig_press.connect(partial(self.matrixWdg_sig_update, col_, row_))
+    def set_total(self, col=0, total=0):
+        self.lst_total[col] = total
+        self.update_cell(col, NUMBER_OF_ROWS)
 
-        row += 1
+    def set_selection(self, cell=None, text=""):
+        if self.selected_cell is not None:
+            self.update_cell(*self.selected_cell)
 
-        col = 0
+        self.selected_cell = cell
+        self.preview_text = text
 
-        lblRowHeader = QLabel("Total")
-        lblRowHeader.setObjectName("lblTotalHeader")
-        lblRowHeader.setAlignment(Qt.AlignRight)
-        grid_layout.addWidget(lblRowHeader, row, col)
+        if cell is not None:
+            self.update_cell(*cell)
 
-        col += 1
+    def is_filled(self, col=0, row=0):
+        return bool(self.lst_filled[col] & (1 << row))
 
-        for col_id, col_name in DICT_COL_HEADER.items():
-            lblTotalWdg = LabelWdg(col_name=col_name)
-            lblTotalWdg.setObjectName("lblColTotal")
-            lblTotalWdg.setAlignment(Qt.AlignCenter)
-            lblTotalWdg.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-            self.lstTotalWdg.insert(col_id, lblTotalWdg)
-            grid_layout.addWidget(lblTotalWdg, row, col)
-            col += 1
+    def is_open(self, col=0, row=0):
+        return bool(self.lst_open[col] & (1 << row)) and not self.is_filled(col, row)
 
-        return grid_layout
+    def get_cell_rect(self, col=0, row=0):
+        """
+        :param row: NUMBER_OF_ROWS for the total of the column
+        """
 
-    def create_total_layout(self):
-        item_layout = QHBoxLayout()
+        return QRect(self.header_width + col * self.cell_width, (row + 1) * self.row_height,
+                     self.cell_width, self.row_height)
 
-        self.lblTotals = LabelWdg()
-        self.lblTotals.setAlignment(Qt.AlignCenter)
-        self.lblTotals.setText("")
-        self.lblTotals.setObjectName("lblTotal")
-        item_layout.addWidget(self.lblTotals)
-        return item_layout
+    def get_cell_at(self, pos=None):
+        """
+        :return: (col, row) of the cell at a position or None
+        """
 
-    def calculate_totals(self):
-        totals = 0
-        for col_index in range(len(self.matrixWdg)):
-            lst_row = self.matrixWdg[col_index]
-            total_col = 0
+        if self.cell_width <= 0 or self.row_height <= 0 or pos.x() < self.header_width:
+            return None
 
-            # Numbers total
-            for item_ in lst_row[0:6]:
-                total_col += item_.value
+        col = (pos.x() - self.header_width) // self.cell_width
+        row = pos.y() // self.row_height - 1
+        if 0 <= col < NUMBER_OF_COLS and 0 <= row < NUMBER_OF_ROWS:
+            return col, row
+        return None
 
-            # Bonus +30
-            if total_col >= 60:
-                total_col += 30
+    def get_bold_font(self):
+        bold_font = QFont(self.font())
+        bold_font.setBold(True)
+        return bold_font
 
-            # Min Max sub
-            if lst_row[7].value > 0:
-                total_col += ((lst_row[6].value - lst_row[7].value) * lst_row[0].value)
+    def get_header_width(self):
+        metrics = QFontMetrics(self.get_bold_font())
+        return max(metrics.horizontalAdvance(name) for name in DICT_ROW_HEADER.values()) + 2 * SHEET_PADDING
 
-            # Signs totals
-            for item_ in lst_row[8:]:
-                total_col += item_.value
+    def update_geometry(self):
+        self.header_width = self.get_header_width()
+        self.cell_width = max((self.width() - self.header_width) // NUMBER_OF_COLS, 0)
+        self.row_height = self.height() // (NUMBER_OF_ROWS + 2)
 
-            totals += total_col
-            lblTotalWdg = self.lstTotalWdg[col_index]
-            if isinstance(lblTotalWdg, LabelWdg):
-                lblTotalWdg.set_value(total_col)
-                lblTotalWdg.fill_value()
+    def sizeHint(self):
+        metrics = QFontMetrics(self.get_bold_font())
+        cell_width = max(metrics.horizontalAdvance(name) for name in DICT_COL_HEADER.values()) + 2 * SHEET_PADDING
+        return QSize(self.get_header_width() + NUMBER_OF_COLS * cell_width,
+                     (NUMBER_OF_ROWS + 2) * (metrics.height() + 2 * SHEET_PADDING))
 
-        self.lblTotals.set_value(totals)
-        self.lblTotals.fill_value()
+    def minimumSizeHint(self):
+        metrics = self.fontMetrics()
+        return QSize(self.get_header_width() + NUMBER_OF_COLS * 3 * metrics.height(),
+                     (NUMBER_OF_ROWS + 2) * (metrics.height() + 2 * SHEET_CELL_MARGIN))
 
-    def fill_matrixWdg_values(self):
+    def resizeEvent(self, event):
+        self.update_geometry()
+        super(self.__class__, self).resizeEvent(event)
 
-        for col_ in range(len(DICT_COL_HEADER.keys())):
-            for row_ in range(len(DICT_ROW_HEADER.keys())):
-                txtEl = self.matrixWdg[col_][row_]
-                if isinstance(txtEl, LineEditWdg):
-                    if txtEl.assigned:
-                        txtEl.fill_value()
+    def mousePressEvent(self, event):
 
-    def write_value(self):
+        if event.button() == Qt.MouseButton.LeftButton:
+            cell = self.get_cell_at(event.pos())
+            if cell is not None and (self.is_open(*cell) or self.is_filled(*cell)):
+                self.sig_press.emit(*cell)
 
-        if self.txtLineEditWdg and isinstance(self.txtLineEditWdg, LineEditWdg):
-            self.txtLineEditWdg.assign_value(self.txtLineEditWdg.text())
-            col = self.txtLineEditWdg.col_id
-            self.txtLineEditWdg = None
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        palette = self.palette()
+        clip_rect = event.rect()
 
-            if self.checkout:
-                self.reset_checkout()
-            return True
+        bold_font = self.get_bold_font()
+        bold_metrics = QFontMetrics(bold_font)
 
-        return False
+        painter.setFont(bold_font)
+        painter.setPen(palette.color(QPalette.WindowText))
 
-    def get_lineEditWdg(self, column=-1, row=-1):
+        for col_id, col_name in DICT_COL_HEADER.items():
+            rect = QRect(self.header_width + col_id * self.cell_width, 0, self.cell_width, self.row_height)
+            if rect.intersects(clip_rect):
+                painter.drawText(rect, ALIGN_CENTER, bold_metrics.elidedText(col_name, Qt.ElideRight, self.cell_width))
+
+        for row_id, row_name in DICT_ROW_HEADER.items():
+            rect = QRect(0, (row_id + 1) * self.row_height, self.header_width - SHEET_PADDING, self.row_height)
+            if rect.intersects(clip_rect):
+                painter.drawText(rect, ALIGN_RIGHT, row_name)
+
+        rect = QRect(0, (NUMBER_OF_ROWS + 1) * self.row_height, self.header_width - SHEET_PADDING, self.row_height)
+        if rect.intersects(clip_rect):
+            painter.drawText(rect, ALIGN_RIGHT, "Total")
+
+        for col_id in range(NUMBER_OF_COLS):
+            rect = self.get_cell_rect(col_id, NUMBER_OF_ROWS)
+            if rect.intersects(clip_rect):
+                painter.drawText(rect, ALIGN_CENTER, "{0}".format(self.lst_total[col_id]))
+
+        painter.setFont(self.font())
+        frame_color = palette.color(QPalette.Mid)
+
+        for col_id in range(NUMBER_OF_COLS):
+            for row_id in range(NUMBER_OF_ROWS):
+                rect = self.get_cell_rect(col_id, row_id)
+                if not rect.intersects(clip_rect):
+                    continue
+
+                cell_rect = rect.adjusted(SHEET_CELL_MARGIN, SHEET_CELL_MARGIN, -SHEET_CELL_MARGIN, -SHEET_CELL_MARGIN)
+                selected = self.selected_cell == (col_id, row_id)
+                is_open = self.is_open(col_id, row_id)
+                is_filled = self.is_filled(col_id, row_id)
+
+                painter.fillRect(cell_rect, palette.color(QPalette.Base if is_open or is_filled else QPalette.Window))
+                painter.setPen(palette.color(QPalette.Highlight) if selected else frame_color)
+                painter.drawRect(cell_rect.adjusted(0, 0, -1, -1))
+
+                if is_filled:
+                    painter.setPen(palette.color(QPalette.Text))
+                    painter.drawText(cell_rect, ALIGN_CENTER, "{0}".format(self.values[col_id * NUMBER_OF_ROWS + row_id]))
+                elif selected and self.preview_text:
+                    painter.setPen(palette.color(QPalette.Highlight))
+                    painter.drawText(cell_rect, ALIGN_CENTER, self.preview_text)
+
+        painter.end()
 
-        if column > -1 and row > -1:
-            if column < len(self.matrixWdg):
-                if row < len(self.matrixWdg[column]):
-                    return self.matrixWdg[column][row]
-        return None
+    def build_ui(self):
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setFocusPolicy(Qt.ClickFocus)
+        self.update_geometry()
 
-    def lineEditWdg_update(self):
+class JambPlayerTable(QWidget):
 
-        if self.checkout:
-            self.txtLineEditWdg = self.get_lineEditWdg(column=self.checkout_col_index, row=self.checkout_row_index)
+    def __init__(self, parent=None, sheet=None):
+        super(self.__class__, self).__init__(parent)
+        self.sheet = sheet if sheet is not None else PlayerSheet()
+        self.player_name = self.sheet.player_name
+        self.scores = None
+        self.selected_cell = None
+        self.index_element = [-1, -1]
+        self.reset_shown_state()
 
-        if self.txtLineEditWdg and isinstance(self.txtLineEditWdg, LineEditWdg):
-            self.txtLineEditWdg.setFocus()
-            if not (self.txtLineEditWdg.assigned or self.txtLineEditWdg.isReadOnly()):
-                value = self.dict_dice_values.get(self.txtLineEditWdg.row_id + 1)
-                self.txtLineEditWdg.setText("{0}".format(value))
+        self.build_ui()
 
+    def reset_shown_state(self):
+        # Sheet state shown by the widgets, only the differences are refreshed by fill_items
+        self.lst_shown_filled = [0] * len(DICT_COL_HEADER)
+        self.lst_shown_total = [None] * len(DICT_COL_HEADER)
+        self.shown_total = None
+        self.lst_shown_open = None
 
-    def matrixWdg_sig_update(self, col, row):
+    def set_sheet(self, sheet=None):
+        """
+        Show another sheet in the same widgets, fill_sheet or fill_items paint it.
+        """
 
-        if self.txtLineEditWdg and isinstance(self.txtLineEditWdg, LineEditWdg):
-            self.txtLineEditWdg.setText("")
+        if sheet is self.sheet:
+            return
 
-        txtEl = self.get_lineEditWdg(col, row)
+        self.sheet = sheet
+        self.player_name = sheet.player_name
+        self.scores = None
+        self.selected_cell = None
+        self.index_element = [-1, -1]
+        self.reset_shown_state()
+        self.sheetWdg.clear()
 
-        if isinstance(txtEl, LineEditWdg):
-            self.index_element = txtEl.get_index()
+    def create_content_layout(self):
+        item_layout = QVBoxLayout()
 
-            if not txtEl.isReadOnly():
-                value = self.dict_dice_values.get(row+1)
-                regex = QRegExp("[{0}-{0}]".format(value))
-                self.validator.setRegExp(regex)
-                txtEl.setValidator(self.validator)
-                txtEl.setText("{0}".format(value))
-                self.txtLineEditWdg = txtEl
+        self.sheetWdg = ScoreSheetWdg()
+        self.sheetWdg.sig_press.connect(self.cell_pressed)
+        item_layout.addWidget(self.sheetWdg)
 
-    def reset_checkout(self):
-        self.checkout = False
-        self.checkout_row_index = -1
+        return item_layout
 
-    def fill_columns_rules(self):
-        self.set_table_rules()
+    def create_total_layout(self):
+        item_layout = QHBoxLayout()
 
-    def set_table_rules(self):
+        self.lblTotals = LabelWdg()
+        self.lblTotals.setAlignment(Qt.AlignCenter)
+        self.lblTotals.setText("")
+        self.lblTotals.setObjectName("lblTotal")
+        item_layout.addWidget(self.lblTotals)
+        return item_layout
 
-        if self.checkout:
-            self.set_all_disable_except_one(col=self.checkout_col_index, row=self.checkout_row_index)
-        else:
-            for col in range(len(self.matrixWdg)):
-                self.set_column_rules(col)
+    def fill_totals(self):
 
-    def set_column_enabled(self, column=-1, state=False):
+        for col_index in range(len(DICT_COL_HEADER)):
+            total_col = self.sheet.col_total[col_index]
+            if total_col != self.lst_shown_total[col_index]:
+                self.sheetWdg.set_total(col_index, total_col)
+                self.lst_shown_total[col_index] = total_col
 
-        if column > -1 and column < len(self.matrixWdg):
-            for row in range(0, len(self.matrixWdg[column])):
-                lineEdigWdg = self.matrixWdg[column][row]
-                if isinstance(lineEdigWdg, LineEditWdg):
-                    lineEdigWdg.setEnabled(state)
+        if self.sheet.total != self.shown_total:
+            self.lblTotals.set_value(self.sheet.total)
+            self.lblTotals.fill_value()
+            self.shown_total = self.sheet.total
 
-    def set_column_rule_direction(self, column=0, row_start=0, row_end=0, direction=0):
-        """
+    def fill_cell_values(self):
 
-        :param column: column index
-        :param row_start: start or stop index row
-        :param direction: column go from Top to Bottom if direction is 1,
-                        column go from Bottom to Top if direction is 0
-        :return: None
-        """
+        for col_ in range(len(DICT_COL_HEADER)):
+            filled_mask = self.sheet.filled[col_]
+            new_mask = filled_mask & ~self.lst_shown_filled[col_]
 
-        if column < len(self.matrixWdg):
-            if row_end <= len(self.matrixWdg[column]):
-                lst_index = list(range(row_start, row_end+1))
-                if direction == 1:
-                    lst_index.sort(reverse=True)
+            row_ = 0
+            while new_mask:
+                if new_mask & 1:
+                    self.sheetWdg.set_value(col_, row_, self.sheet.get_value(col_, row_))
+                new_mask >>= 1
+                row_ += 1
 
-                row_edit = lst_index[0]
+            self.lst_shown_filled[col_] = filled_mask
 
-                for i in range(len(lst_index)):
-                    row = lst_index[i]
-                    lineEditWdg = self.get_lineEditWdg(column, row)
-                    if isinstance(lineEditWdg, LineEditWdg):
-                        lineEditWdg.set_enable_state(False)
+    def fill_cells_enabled(self, open_masks=None):
+        """
+        :param open_masks: NUMBER_OF_COLS masks of the cells that can be written, None disables every cell
+        """
 
-                        if lineEditWdg.assigned:
-                            if i < len(lst_index) - 1:
-                                row_edit = lst_index[i+1]
+        lst_open = list(open_masks) if open_masks is not None else [0] * len(DICT_COL_HEADER)
 
-                lineEditWdg = self.get_lineEditWdg(column, row_edit)
-                if lineEditWdg:
-                    lineEditWdg.set_enable_state(True)
+        for col_ in range(len(DICT_COL_HEADER)):
+            if self.lst_shown_open is None or lst_open[col_] != self.lst_shown_open[col_]:
+                self.sheetWdg.set_open_mask(col_, lst_open[col_])
 
-    def set_all_disable_except_one(self, col=5, row=0):
+        self.lst_shown_open = lst_open
 
-        for col_ in range(0, len(self.matrixWdg)):
-            self.set_column_enabled(column=col_, state=False)
+    def get_selected_cell(self):
+        return self.selected_cell
 
-        # Line Edit Wdg matrix
-        lineEditWdg = self.get_lineEditWdg(col, row)
-        if lineEditWdg and isinstance(lineEditWdg, LineEditWdg):
-            lineEditWdg.set_enable_state(True)
-            lineEditWdg.setFocusPolicy(Qt.StrongFocus)
+    def set_scores(self, scores=None):
+        self.scores = scores
 
+    def clear_selection(self):
+        self.selected_cell = None
+        self.sheetWdg.set_selection(None)
 
-    def set_column_rules(self, column=-1):
+    @traced("JambPlayerTable.selection_update")
+    def selection_update(self):
 
-        if column > -1:
-            if column < len(self.matrixWdg):
-                row_count = len(self.matrixWdg[column])
+        if self.sheet.checkout:
+            self.selected_cell = (COL_CHECKOUT, self.sheet.checkout_row_index)
 
-                if column in [0, 4]: # Free and Announcement column
-                    for row in range(len(self.matrixWdg[column])):
-                        txtEl = self.matrixWdg[column][row]
-                        if txtEl and isinstance(txtEl, LineEditWdg):
-                            txtEl.set_enable_state(True)
+        if self.selected_cell and self.scores:
+            self.sheetWdg.setFocus()
+            col, row = self.selected_cell
+            if not self.sheet.is_filled(col, row):
+                self.sheetWdg.set_selection(self.selected_cell, "{0}".format(self.scores[row]))
 
-                if column == 1: # Up column => start from bottom to top
-                    self.set_column_rule_direction(column, 0, row_count-1, 1)
+    def cell_pressed(self, col, row):
 
-                if column == 2: # Down column => start from top to bottom
-                    self.set_column_rule_direction(column, 0, row_count-1, 0)
+        self.index_element = [col, row]
 
-                if column == 3:  # Max/Min column => start from Max to Top and Min to Bottom
-                    self.set_column_rule_direction(column, 0, 6, 1)
-                    self.set_column_rule_direction(column, 7, row_count-1, 0)
+        if self.sheetWdg.is_open(col, row) and self.scores:
+            self.selected_cell = (col, row)
+            self.sheetWdg.set_selection(self.selected_cell, "{0}".format(self.scores[row]))
+        else:
+            self.clear_selection()
 
-                if column == 5: # Checkout column cell enable if preview Player call announcement
-                    for row_ in range(0, row_count):
-                        lineEditWdg = self.get_lineEditWdg(column, row_)
-                        if lineEditWdg and isinstance(lineEditWdg, LineEditWdg):
-                            lineEditWdg.set_enable_state(False)
+    @traced("JambPlayerTable.fill_sheet")
+    def fill_sheet(self):
+        with self.sheetWdg.batch():
+            self.fill_cell_values()
+            self.fill_totals()
 
-    def fill_items(self):
-        self.fill_matrixWdg_values()
-        self.fill_columns_rules()
-        self.calculate_totals()
+    @traced("JambPlayerTable.fill_items")
+    def fill_items(self, open_masks=None):
+        with self.sheetWdg.batch():
+            self.fill_cell_values()
+            self.fill_cells_enabled(open_masks)
+            self.fill_totals()
 
     def build_ui(self):
         main_layout = QVBoxLayout()
@@ -672,14 +746,67 @@ class InputWdg(QWidget):
     def __init__(self, parent=None):
         super(self.__class__, self).__init__(parent)
         self.lst_txt_wdg = []
+        self.lst_cmb_wdg = []
+        self.lst_row_wdg = []
         self.build_ui()
 
     def set_wdgs_enable_state(self, state=True):
-        for e in self.lst_txt_wdg:
+        for e in [self.spinPlayers] + self.lst_txt_wdg + self.lst_cmb_wdg:
             e.setEnabled(state)
 
+    def get_player_rows(self):
+        """
+        :return: list of (player name, strategy name or None for a person) of the filled rows
+        """
+
+        lst_row = []
+        for i in range(self.spinPlayers.value()):
+            strategy_name = self.lst_cmb_wdg[i].currentData()
+            name = self.lst_txt_wdg[i].text()
+            if not name and strategy_name:
+                name = "{0} bot {1}".format(strategy_name.capitalize(), i + 1)
+            if name:
+                lst_row.append((name, strategy_name))
+        return lst_row
+
     def get_players(self):
-        return [txtPlayer.text() for txtPlayer in self.lst_txt_wdg if txtPlayer.text()]
+        return [name for name, strategy_name in self.get_player_rows()]
+
+    def get_strategies(self):
+        return [strategy_name for name, strategy_name in self.get_player_rows()]
+
+    def add_player_row(self):
+
+        label_name = "Player {0}: ".format(len(self.lst_row_wdg) + 1)
+        txtWdg = QLineEdit()
+        txtWdg.setPlaceholderText(label_name)
+        self.lst_txt_wdg.append(txtWdg)
+
+        cmbWdg = QComboBox()
+        cmbWdg.addItem("Person", None)
+        for strategy_name in sorted(DICT_STRATEGY):
+            cmbWdg.addItem("Bot: {0}".format(strategy_name), strategy_name)
+        self.lst_cmb_wdg.append(cmbWdg)
+
+        rowWdg = QWidget()
+        row_layout = QHBoxLayout()
+        row_layout.setContentsMargins(0, 0, 0, 0)
+        row_layout.addWidget(txtWdg)
+        row_layout.addWidget(cmbWdg)
+        rowWdg.setLayout(row_layout)
+        self.lst_row_wdg.append(rowWdg)
+        self.rows_layout.addWidget(rowWdg)
+
+    def set_number_of_players(self, players=0):
+        """
+        Show the first rows, the rows are built when the count first reaches them.
+        """
+
+        while len(self.lst_row_wdg) < players:
+            self.add_player_row()
+
+        for i, rowWdg in enumerate(self.lst_row_wdg):
+            rowWdg.setVisible(i < players)
 
     def create_content_layout(self):
 
@@ -687,17 +814,34 @@ class InputWdg(QWidget):
         item_layout.setSpacing(5)
         item_layout.setAlignment(Qt.AlignTop)
 
+        count_layout = QHBoxLayout()
+        count_layout.setAlignment(Qt.AlignLeft)
+        count_layout.addWidget(QLabel("Number of players:"))
+
+        self.spinPlayers = QSpinBox()
+        self.spinPlayers.setRange(1, MAXIMUM_NUMBER_OF_PLAYERS)
+        self.spinPlayers.setValue(DEFAULT_NUMBER_OF_PLAYERS)
+        self.spinPlayers.valueChanged.connect(self.set_number_of_players)
+        count_layout.addWidget(self.spinPlayers)
+        item_layout.addItem(count_layout)
+
         grp_box = QGroupBox("Name of players")
         grp_box_layout = QVBoxLayout()
-        grp_box_layout.setSpacing(5)
+        grp_box_layout.setContentsMargins(0, 0, 0, 0)
+
+        rowsWdg = QWidget()
+        self.rows_layout = QVBoxLayout()
+        self.rows_layout.setSpacing(5)
+        self.rows_layout.setAlignment(Qt.AlignTop)
+        rowsWdg.setLayout(self.rows_layout)
 
-        for i in range(MAXIMUM_NUMBER_OF_PLAYERS):
+        scrollArea = QScrollArea()
+        scrollArea.setWidgetResizable(True)
+        scrollArea.setFrameShape(QFrame.NoFrame)
+        scrollArea.setWidget(rowsWdg)
+        grp_box_layout.addWidget(scrollArea)
 
-            label_name = "Player {0}: ".format(i+1)
-            txtWdg = QLineEdit()
-            txtWdg.setPlaceholderText(label_name)
-            self.lst_txt_wdg.append(txtWdg)
-            grp_box_layout.addWidget(self.lst_txt_wdg[-1])
+        self.set_number_of_players(self.spinPlayers.value())
 
         grp_box.setLayout(grp_box_layout)
         item_layout.addWidget(grp_box)
@@ -712,23 +856,88 @@ class InputWdg(QWidget):
         main_layout.addItem(self.create_content_layout())
         self.setLayout(main_layout)
 
+class BotSignals(QObject):
+
+    # token of the move, action of jamb_strategy.choose_action
+    sig_action = Signal(int, object)
+    # token of the move, error of the strategy
+    sig_failed = Signal(int, str)
+
+class BotMoveTask(QRunnable):
+    """
+    Choose the next action of a bot on a copy of the game, in a QThreadPool thread.
+    The search stops when the task is cancelled or out of its budget, the pool thread is free for the next move.
+    """
+
+    def __init__(self, token=0, game=None, strategy=None, signals=None, budget=BOT_MOVE_BUDGET):
+        super(self.__class__, self).__init__()
+        self.token = token
+        self.game = game
+        self.strategy = strategy
+        self.signals = signals
+        self.cancelled = threading.Event()
+        self.deadline = time.perf_counter() + budget / 1000.0
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def should_stop(self):
+        return self.cancelled.is_set() or time.perf_counter() > self.deadline
+
+    def run(self):
+
+        if self.should_stop():
+            return
+
+        try:
+            with jamb_trace.span("bot move"), search_stop(self.should_stop):
+                action = choose_action(self.game, self.strategy)
+        except SearchCancelled:
+            # DeckWdg.bot_out_of_time plays the quick move
+            return
+        except (ValueError, IndexError, KeyError, OSError) as error:
+            logger.warning("Bot move of %s failed", self.game.get_this_sheet().player_name, exc_info=True)
+            if not self.cancelled.is_set():
+                self.signals.sig_failed.emit(self.token, "{0}".format(error))
+            return
+
+        if not self.cancelled.is_set():
+            self.signals.sig_action.emit(self.token, action)
+
+def get_fallback_action(game=None):
+    """
+    :return: quick action of a bot out of time: roll at the start of the turn, then write the best score
+    """
+
+    if game.roll_turn == 0:
+        return "roll", None
+
+    return ("write",) + tuple(DICT_STRATEGY["greedy"]().choose_cell(game))
+
 class DeckWdg(QWidget):
 
+    sig_finished = Signal(object)
+
     def __init__(self, parent=None):
         super(self.__class__, self).__init__(parent)
 
-        self.player_index = 0
-        self.roll_turn = 0
-        self.total_roll_turns = 0
+        self.game = None
+        self.hint_shown = False
+
+        # Bot strategy of every player index played by the computer
+        self.dict_bot = {}
+        self.bot_token = 0
+        self.botTask = None
+        self.botPool = QThreadPool(self)
+        self.botPool.setMaxThreadCount(1)
+        self.botSignals = BotSignals(self)
+        self.botSignals.sig_action.connect(self.bot_action_ready)
+        self.botSignals.sig_failed.connect(self.bot_move_failed)
+        self.botTimer = QTimer(self)
+        self.botTimer.setSingleShot(True)
+        self.botTimer.timeout.connect(self.bot_out_of_time)
 
-        self.total_game_turns = 5
-        self.game_remain_turns = self.total_game_turns
-        self.lst_diceWdg = []
-        self.lst_players = []
-        self.lst_playerTableWdg = []
-        self.dict_dice_values = {}
         self.build_ui()
-        self.announcement = False
 
     def create_dice_layout(self):
         item_layout = QHBoxLayout()
@@ -743,7 +952,7 @@ class DeckWdg(QWidget):
         btn_top_layout = QHBoxLayout()
         btn_top_layout.setAlignment(Qt.AlignLeft)
 
-        self.btnRoll = QPushButton("Roll {0}".format(self.get_total_roll_turns() - self.roll_turn))
+        self.btnRoll = QPushButton("Roll {0}".format(HAND_TURNS))
         self.btnRoll.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
         self.btnRoll.clicked.connect(self.clicked_btnRoll)
         btn_top_layout.addWidget(self.btnRoll)
@@ -753,6 +962,8 @@ class DeckWdg(QWidget):
         dice_layout.setSpacing(5)
 
         self.dicesTableWdg = DicesTableWdg()
+        self.dicesTableWdg.sig_rolled.connect(self.dices_rolled)
+        self.dicesTableWdg.sig_held.connect(self.dice_held)
         dice_layout.addWidget(self.dicesTableWdg)
 
         btn_bottom_layout = QHBoxLayout()
@@ -769,6 +980,12 @@ class DeckWdg(QWidget):
         self.btnAnnouncement.clicked.connect(self.clicked_btnAnnouncement)
         btn_bottom_layout.addWidget(self.btnAnnouncement)
 
+        self.btnHint = QPushButton("Hint")
+        self.btnHint.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
+        self.btnHint.setEnabled(False)
+        self.btnHint.clicked.connect(self.clicked_btnHint)
+        btn_bottom_layout.addWidget(self.btnHint)
+
         left_layout.addItem(btn_top_layout)
         left_layout.addItem(dice_layout)
         left_layout.addItem(btn_bottom_layout)
@@ -789,141 +1006,319 @@ class DeckWdg(QWidget):
 
     def create_players_layout(self):
         item_layout = QVBoxLayout()
+        item_layout.setSpacing(0)
 
-        self.tabPlayer = QTabWidget()
-
+        # One tab per player and one table, the table paints the sheet of the selected tab
+        self.tabPlayer = QTabBar()
+        self.tabPlayer.setUsesScrollButtons(True)
+        self.tabPlayer.setExpanding(False)
+        self.tabPlayer.currentChanged.connect(self.show_player)
         item_layout.addWidget(self.tabPlayer)
 
+        self.playerWdg = JambPlayerTable()
+        self.playerWdg.setEnabled(False)
+        item_layout.addWidget(self.playerWdg)
+
         return item_layout
 
-    def fill_players_tab(self):
-        for player_name in self.lst_players:
-            playerWdg = JambPlayerTable(player_name=player_name)
-            self.lst_playerTableWdg.append(playerWdg)
-            self.tabPlayer.addTab(playerWdg, player_name)
+    def set_game(self, game=None, lst_strategy_name=()):
+        """
+        :param lst_strategy_name: strategy name of every player, None for the players that are people
+        """
 
-    def fill_player_tab_enabled(self):
-        if self.player_index < len(self.lst_playerTableWdg) and self.player_index < self.tabPlayer.count():
-            self.tabPlayer.setCurrentIndex(self.player_index)
-            for playerWdg in self.lst_playerTableWdg:
-                if isinstance(playerWdg, JambPlayerTable):
-                    playerWdg.setEnabled(False)
+        self.cancel_bot_move()
+        if self.game is not None:
+            self.game.remove_listener(self.game_event)
+
+        self.game = game
+        self.dict_bot = dict((player_index, get_strategy(strategy_name))
+                             for player_index, strategy_name in enumerate(lst_strategy_name) if strategy_name)
+        self.game.add_listener(self.game_event)
+        self.dicesTableWdg.set_rng(game.rng)
+        self.fill_players_tab()
 
+    def game_event(self, event="", data=None):
+
+        if event == "turn":
+            jamb_trace.mark_turn()
+            self.start_player_turn()
+
+        elif event == "roll":
+            self.dicesTableWdg.roll_dice(data.get("dices"))
+
+        elif event == "hold":
+            self.dicesTableWdg.set_held_mask(data.get("held"))
+
+        elif event == "announcement":
             playerWdg = self.get_this_player()
-            if playerWdg:
-                playerWdg.setEnabled(True)
-            self.btnRoll.setEnabled(True)
+            if isinstance(playerWdg, JambPlayerTable):
+                playerWdg.fill_items(self.game.get_open_masks())
 
-    def get_total_roll_turns(self):
-        return HAND_TURNS + 2 if self.game_remain_turns == 1 else HAND_TURNS
+        elif event == "write":
+            # Other sheets are painted when their tab is shown
+            if self.playerWdg.sheet is self.game.lst_sheet[data.get("player_index")]:
+                self.playerWdg.clear_selection()
+                self.playerWdg.fill_sheet()
+            self.lblInfo.clear()
 
-    def get_this_player(self):
-        return self.lst_playerTableWdg[self.player_index] if self.player_index < len(self.lst_playerTableWdg) else None
+        elif event == "finish":
+            self.finish_game()
 
-    def get_next_player(self):
+    def fill_players_tab(self):
 
-        player_index = self.player_index + 1
+        self.tabPlayer.blockSignals(True)
+        while self.tabPlayer.count():
+            self.tabPlayer.removeTab(self.tabPlayer.count() - 1)
 
-        if player_index == len(self.lst_playerTableWdg):
-            player_index = 0
+        for sheet in self.game.lst_sheet:
+            self.tabPlayer.addTab(sheet.player_name)
+        self.tabPlayer.blockSignals(False)
 
-        return self.lst_playerTableWdg[player_index] if player_index < len(self.lst_playerTableWdg) else None
+        self.show_player(self.game.player_index)
 
-    def get_prev_player(self):
+    def show_player(self, player_index=0):
+        """
+        Show the sheet of a player in the table, only the sheet of the selected tab is painted.
+        """
+
+        game = self.game
+        if game is None or not 0 <= player_index < len(game.lst_sheet):
+            return
+
+        if self.tabPlayer.currentIndex() != player_index:
+            self.tabPlayer.blockSignals(True)
+            self.tabPlayer.setCurrentIndex(player_index)
+            self.tabPlayer.blockSignals(False)
+
+        playing = player_index == game.player_index and not game.is_finished()
+        self.playerWdg.set_sheet(game.lst_sheet[player_index])
+        set_widget_state(self.playerWdg, playing and player_index not in self.dict_bot)
+
+        if not playing:
+            self.playerWdg.fill_items()
+        elif game.roll_turn > 0 and not self.dicesTableWdg.is_rolling():
+            self.playerWdg.set_scores(game.scores)
+            self.playerWdg.fill_items(game.get_open_masks())
+            self.playerWdg.selection_update()
+        else:
+            self.playerWdg.fill_items(game.get_available_masks())
+
+    def fill_player_tab_enabled(self):
+        self.get_this_player()
+        set_widget_state(self.playerWdg, not self.game.is_finished() and not self.is_bot_turn())
+
+    def resume_game(self, game=None):
+        """
+        Show a game restored in the middle, from the journal.
+        """
 
-        player_index = self.player_index - 1
+        self.set_game(game)
 
-        if player_index < 0:
-            player_index = len(self.lst_playerTableWdg)
+        if game.roll_turn == 0:
+            self.start_player_turn()
+            return
 
-        return self.lst_playerTableWdg[player_index] if player_index < len(self.lst_playerTableWdg) else None
+        self.fill_player_tab_enabled()
+        self.dicesTableWdg.reset_dice()
+        self.dicesTableWdg.set_dices(game.dices)
+        self.dicesTableWdg.set_held_mask(game.held)
+        self.dices_rolled(tuple(game.dices))
+
+    def get_this_player(self):
+        """
+        :return: the table, showing the sheet of the current player
+        """
+
+        if self.game is not None and self.playerWdg.sheet is not self.game.get_this_sheet():
+            self.show_player(self.game.player_index)
+        return self.playerWdg
 
+    @traced("DeckWdg.start_player_turn")
     def start_player_turn(self):
 
-        self.roll_turn = 0
         playerWdg = self.get_this_player()
         if playerWdg and isinstance(playerWdg, JambPlayerTable):
-            playerWdg.dict_dice_values = {}
-            reply = QMessageBox.information(self, "Next Player", "{0}'s Turn!".format(playerWdg.player_name), QMessageBox.Ok)
+            playerWdg.set_scores(None)
+            if not self.is_bot_turn():
+                with jamb_trace.span("turn message box"):
+                    reply = QMessageBox.information(self, "Next Player", "{0}'s Turn!".format(playerWdg.player_name), QMessageBox.Ok)
 
-            if reply == QMessageBox.Ok:
-                pass
+                if reply == QMessageBox.Ok:
+                    pass
 
             self.fill_player_tab_enabled()
-            playerWdg.fill_items()
+            playerWdg.fill_items(self.game.get_available_masks())
 
-        self.dict_dice_values = {}
         self.dicesTableWdg.reset_dice()
+        self.fill_controls()
+        self.start_bot_move()
+
+    def is_bot_turn(self):
+        return self.game is not None and not self.game.is_finished() and self.game.player_index in self.dict_bot
+
+    def start_bot_move(self):
+        """
+        Let the bot of the current player choose its next action, the result comes back by bot_action_ready.
+        """
 
-        self.btnRoll.setText("Roll {0}".format(self.get_total_roll_turns() - self.roll_turn))
+        if not self.is_bot_turn() or self.dicesTableWdg.is_rolling():
+            return
 
-    def next_player(self):
+        self.cancel_bot_move()
+        self.botTask = BotMoveTask(self.bot_token, self.game.copy(), self.dict_bot[self.game.player_index],
+                                   self.botSignals)
+        self.botPool.start(self.botTask)
+        self.botTimer.start(BOT_MOVE_BUDGET)
 
-        self.player_index += 1
+    def cancel_bot_move(self):
+        """
+        Forget the move in progress, its result is ignored.
+        """
 
-        if self.player_index == len(self.lst_playerTableWdg):
-            self.player_index = 0
-            self.game_remain_turns -= 1
+        self.bot_token += 1
+        self.botTimer.stop()
+        if self.botTask is not None:
+            self.botTask.cancel()
+            self.botTask = None
 
-        self.start_player_turn()
+    def bot_out_of_time(self):
+        if self.is_bot_turn():
+            self.cancel_bot_move()
+            self.play_bot_action(self.bot_token, get_fallback_action(self.game))
 
-    def clicked_write(self):
+    def bot_action_ready(self, token=0, action=None):
+
+        if token != self.bot_token or not self.is_bot_turn():
+            return
+
+        self.botTimer.stop()
+        self.botTask = None
+
+        # Give people time to see the move
+        QTimer.singleShot(BOT_MOVE_DELAY, partial(self.play_bot_action, token, action))
+
+    def bot_move_failed(self, token=0, error=""):
+
+        if token != self.bot_token or not self.is_bot_turn():
+            return
+
+        self.lblInfo.setText("{0}\n\nBot move failed: {1}\nQuick move played".format(self.lblInfo.text(), error))
+        self.bot_action_ready(token, get_fallback_action(self.game))
+
+    def play_bot_action(self, token=0, action=None):
+
+        if token != self.bot_token or not self.is_bot_turn():
+            return
+
+        self.bot_token += 1
+
+        if action[0] == "roll":
+            if action[1] is not None:
+                self.game.set_held_mask(action[1])
+            self.clicked_btnRoll()
+
+        elif action[0] == "announce":
+            self.game.announce(action[1])
+            self.start_bot_move()
+
+        elif not self.game.write(action[1], action[2]):
+            self.game.write(*get_fallback_action(self.game)[1:])
 
-        self.announcement = False
+    def fill_controls(self):
+        """
+        Enabled state and text of the buttons computed from the game, only the changes are applied.
+        """
+
+        game = self.game
+        playing = game is not None and not game.is_finished() and not self.dicesTableWdg.is_rolling() and \
+            not self.is_bot_turn()
+        rolled = playing and game.roll_turn > 0
+
+        set_widget_state(self.btnRoll, playing and game.can_roll(),
+                         "Roll {0}".format(game.get_rolls_left()) if game is not None else None)
+        set_widget_state(self.btnWrite, rolled)
+        set_widget_state(self.btnAnnouncement, rolled and game.can_announce())
+        set_widget_state(self.btnHint, rolled and game.get_rolls_left() > 0 and not self.hint_shown)
+
+    def finish_game(self):
+
+        self.cancel_bot_move()
+        self.fill_controls()
+
+        self.playerWdg.fill_items()
+        set_widget_state(self.playerWdg, False)
+
+        lst_sheet = sorted(self.game.lst_sheet, key=lambda sheet_: -sheet_.total)
+        lst_line = ["{0} = {1}".format(sheet.player_name, sheet.total) for sheet in lst_sheet[:MAXIMUM_RESULT_LINES]]
+        if len(lst_sheet) > MAXIMUM_RESULT_LINES:
+            lst_line.append("... {0} more, see the tabs".format(len(lst_sheet) - MAXIMUM_RESULT_LINES))
+        self.lblInfo.setText("\n".join(lst_line))
+        self.sig_finished.emit(self.game)
+        QMessageBox.information(self, "Game Over", "\n".join(lst_line), QMessageBox.Ok)
+
+    @traced("DeckWdg.clicked_write")
+    def clicked_write(self):
 
         playerWdg = self.get_this_player()
         if isinstance(playerWdg, JambPlayerTable):
-            if isinstance(playerWdg.txtLineEditWdg, LineEditWdg):
-                if playerWdg.txtLineEditWdg and playerWdg.txtLineEditWdg.col_id == 4 and not self.announcement:
-                    self.clicked_btnAnnouncement()
+            cell = playerWdg.get_selected_cell()
+            if cell:
+                self.game.write(*cell)
 
-                if playerWdg.write_value():
-                    self.next_player()
-                    self.lblInfo.clear()
+    @traced("DeckWdg.clicked_btnRoll")
+    def clicked_btnRoll(self):
 
+        if self.game is not None and self.game.can_roll():
+            self.game.roll()
+            self.fill_controls()
 
-    def clicked_btnRoll(self):
+    def dice_held(self, index=0, state=False):
 
-        total_turn = self.get_total_roll_turns()
-        lst_line = []
-        player_checkout_state = False
-        if self.roll_turn < total_turn:
-            self.btnRoll.setEnabled(False)
-            self.dicesTableWdg.roll_dice()
-            self.btnRoll.setEnabled(True)
+        if self.game is None or self.is_bot_turn() or not self.game.set_held(index, state):
+            self.dicesTableWdg.set_held_mask(self.game.held if self.game is not None else ())
 
-            playerWdg = self.get_this_player()
-            if isinstance(playerWdg, JambPlayerTable):
-                playerWdg.dict_dice_values = copy.deepcopy(self.dicesTableWdg.get_sign_dict())
+    @traced("DeckWdg.dices_rolled")
+    def dices_rolled(self, dices=()):
 
-                dict_dice_value = playerWdg.dict_dice_values
+        if self.game is None:
+            return
 
-                for sign_id_ in DICT_ROW_HEADER:
-                    sign_name = DICT_ROW_HEADER.get(sign_id_)
-                    value = dict_dice_value.get(sign_id_+1)
-                    if value:
-                        lst_line.append("{0} = {1}".format(sign_name, value))
+        lst_line = []
+        scores = self.game.scores
 
-                if self.roll_turn == 1:
-                    if not self.announcement:
-                        playerWdg.set_column_enabled(column=4, state=False)
+        playerWdg = self.get_this_player()
+        if isinstance(playerWdg, JambPlayerTable):
+            playerWdg.set_scores(scores)
 
-                playerWdg.lineEditWdg_update()
-                player_checkout_state = playerWdg.checkout
+            for sign_id_ in DICT_ROW_HEADER:
+                sign_name = DICT_ROW_HEADER.get(sign_id_)
+                value = scores[sign_id_]
+                if value:
+                    lst_line.append("{0} = {1}".format(sign_name, value))
 
-            self.roll_turn += 1
-            self.btnRoll.setText("Roll {0}".format(total_turn - self.roll_turn))
+            playerWdg.fill_items(self.game.get_open_masks())
+            playerWdg.selection_update()
 
-        if self.roll_turn == total_turn:
-            self.btnRoll.setEnabled(False)
+        self.hint_shown = False
+        self.fill_controls()
+        set_widget_state(self.lblInfo, text="\n".join(lst_line))
+        self.start_bot_move()
 
-        self.btnAnnouncement.setEnabled(True if self.roll_turn == 1 and not player_checkout_state else False)
+    @traced("DeckWdg.clicked_btnHint")
+    def clicked_btnHint(self):
 
-        self.lblInfo.setText("\n".join(lst_line))
+        rolls_left = self.game.get_rolls_left() if self.game is not None else 0
 
-    def clicked_btnAnnouncement(self):
+        if self.game is not None and self.game.roll_turn > 0 and rolls_left > 0:
+            open_cells = self.game.get_open_cells()
+            if open_cells:
+                held_mask, expected_value = suggest_hold_for_cells(tuple(self.game.dices), rolls_left, open_cells)
+                self.game.set_held_mask(held_mask)
+                self.lblInfo.setText("{0}\n\nHint: expected {1:.1f}".format(self.lblInfo.text(), expected_value))
+                self.hint_shown = True
+                self.fill_controls()
 
-        self.announcement = True
+    def clicked_btnAnnouncement(self):
 
         thisPlayerWdg = self.get_this_player()
 
@@ -932,12 +1327,8 @@ class DeckWdg(QWidget):
             col = thisPlayerWdg.index_element[0]
             row = thisPlayerWdg.index_element[1]
 
-            thisPlayerWdg.set_all_disable_except_one(col, row)
-            nextPlayerWdg = self.get_next_player()
-            if nextPlayerWdg and isinstance(nextPlayerWdg, JambPlayerTable):
-                nextPlayerWdg.checkout = True
-                nextPlayerWdg.checkout_row_index = row
-
+            if col == COL_ANNOUNCEMENT and self.game.announce(row):
+                self.fill_controls()
 
     def build_ui(self):
         main_layout = QVBoxLayout()
@@ -957,22 +1348,70 @@ class JambWdg(QWidget):
 
         self.inputWdg = InputWdg()
         self.inputWdg.btnStart.clicked.connect(self.clicked_inputWdg_btnStart)
-        self.deckWdg = DeckWdg()
-
         self.stackWdg.addWidget(self.inputWdg)
-        self.stackWdg.addWidget(self.deckWdg)
+
+        # Built by get_deckWdg when the first game starts
+        self.deckWdg = None
+
+        self.journal = GameJournal(os.environ.get("JAMB_JOURNAL", DEFAULT_JOURNAL_PATH))
 
         self.build_ui()
 
+        QTimer.singleShot(0, self.resume_game)
+
+    def get_deckWdg(self):
+
+        if self.deckWdg is None:
+            self.deckWdg = DeckWdg()
+            self.deckWdg.sig_finished.connect(self.save_game)
+            jamb_trace.count_widget_calls([self.deckWdg] + self.deckWdg.findChildren(QWidget))
+            self.stackWdg.addWidget(self.deckWdg)
+
+        return self.deckWdg
+
+    def save_game(self, game=None):
+
+        try:
+            history = HistoryStore(os.environ.get("JAMB_HISTORY", DEFAULT_HISTORY_PATH))
+            history.add_game(game)
+            history.close()
+        except sqlite3.Error as error:
+            logger.warning("Game not saved: %s", error)
+
+    def resume_game(self):
+
+        if self.deckWdg is not None and self.deckWdg.game is not None:
+            return
+
+        try:
+            game = self.journal.resume()
+        except (ValueError, OSError) as error:
+            logger.warning("Journal not resumed: %s", error)
+            game = None
+
+        if game is None:
+            return
+
+        self.inputWdg.set_wdgs_enable_state(False)
+        deckWdg = self.get_deckWdg()
+        self.stackWdg.setCurrentWidget(deckWdg)
+        deckWdg.resume_game(game)
+
     def clicked_inputWdg_btnStart(self):
 
+        lst_players = self.inputWdg.get_players()
+        if not lst_players:
+            return
+
         self.inputWdg.set_wdgs_enable_state(False)
-        self.stackWdg.setCurrentIndex(1)
+        deckWdg = self.get_deckWdg()
+        self.stackWdg.setCurrentWidget(deckWdg)
 
-        self.deckWdg.lst_players = self.inputWdg.get_players()
-        self.deckWdg.fill_players_tab()
-        self.deckWdg.fill_player_tab_enabled()
-        self.deckWdg.start_player_turn()
+        seed = os.environ.get("JAMB_SEED")
+        game = JambGame(lst_players, rng=DiceRandom(seed))
+        self.journal.start(game)
+        deckWdg.set_game(game, self.inputWdg.get_strategies())
+        game.start()
 
 
     def build_ui(self):
@@ -994,17 +1433,48 @@ class JambWin(QMainWindow):
 
         self.move_center_position()
 
+    def closeEvent(self, event):
+        if self.jambWdg.deckWdg is not None:
+            self.jambWdg.deckWdg.cancel_bot_move()
+        super(self.__class__, self).closeEvent(event)
+
     def move_center_position(self):
         fg = self.frameGeometry()
         cp = QGuiApplication.primaryScreen().availableGeometry().center()
         fg.moveCenter(cp)
         self.move(fg.topLeft())
 
+class FirstFrameFilter(QObject):
+    """
+    Print the time from STARTUP_TIME to the first paint of a window.
+    """
+
+    def __init__(self, parent=None, quit_after=False):
+        super(self.__class__, self).__init__(parent)
+        self.quit_after = quit_after
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint:
+            watched.removeEventFilter(self)
+            QTimer.singleShot(0, self.first_frame)
+        return False
+
+    def first_frame(self):
+        print("First frame after {0:.1f} ms, {1} widgets".format((time.perf_counter() - STARTUP_TIME) * 1000,
+                                                               len(QApplication.allWidgets())))
+        if self.quit_after:
+            QApplication.quit()
+
 def main():
     app = QApplication(sys.argv)
 
     jambWin = JambWin()
     jambWin.resize(750, 600)
+
+    first_frame = os.environ.get("JAMB_FIRST_FRAME")
+    if first_frame:
+        jambWin.installEventFilter(FirstFrameFilter(jambWin, first_frame == "exit"))
+
     jambWin.show()
     jambWin.move_center_position()
 
@@ -1012,5 +1482,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
-
@@ -0,0 +1,77 @@
+"""
+NumPy batch scorer: score many rolls at once with the rules of jamb_rules.score_dice().
+
+    scores = score_batch(dice)    # dice: (N, NUMBER_OF_DICE) ints 1-6 -> scores: (N, NUMBER_OF_ROWS)
+
+tests/test_batch.py checks it against the scalar scorer for every ordered
+outcome of the dice.
+"""
+
+import numpy as np
+
+from jamb_rules import NUMBER_OF_DICE, NUMBER_OF_ROWS, ROW_MAX, ROW_MIN, ROW_TRILLING, ROW_FULL_HOUSE, \
+    ROW_STRAIGHT, ROW_POKER, ROW_JAMB
+
+FACES = np.arange(7)
+
+
+def count_batch(dice):
+    """
+    :param dice: (N, NUMBER_OF_DICE) int array
+    :return: (N, 7) int array of counters, column is dice value (column 0 is unused)
+    """
+
+    dice = np.asarray(dice)
+    if dice.ndim != 2 or dice.shape[1] != NUMBER_OF_DICE:
+        raise ValueError("Expected shape (N, {0}), got {1}".format(NUMBER_OF_DICE, dice.shape))
+
+    if dice.size and (dice.min() < 1 or dice.max() > 6):
+        raise ValueError("Dice values must be in range 1-6")
+
+    rows = dice.shape[0]
+    offsets = dice + 7 * np.arange(rows)[:, None]
+    return np.bincount(offsets.ravel(), minlength=7 * rows).reshape(rows, 7)
+
+
+def score_batch(dice):
+    """
+    :param dice: (N, NUMBER_OF_DICE) int array of dice values (1-6)
+    :return: (N, NUMBER_OF_ROWS) int16 array, column is row id from DICT_ROW_HEADER
+    """
+
+    dice = np.asarray(dice)
+    counts = count_batch(dice)
+    result = np.zeros((dice.shape[0], NUMBER_OF_ROWS), dtype=np.int16)
+
+    # Numbers
+    result[:, 0:6] = (counts * FACES)[:, 1:7]
+
+    # Max and Min
+    total = dice.sum(axis=1)
+    result[:, ROW_MAX] = total
+    result[:, ROW_MIN] = total - dice.max(axis=1)
+
+    # Two faces can have 3 dice each (1,1,1,2,2,2), the highest one counts as in jamb_rules.score_dice(),
+    # the pair of a Full House is a face with exactly 2 dice
+    trilling_face = np.where(counts >= 3, FACES, 0).max(axis=1)
+    trilling_count = counts[np.arange(counts.shape[0]), trilling_face]
+    trilling_value = trilling_face * trilling_count
+    pair_face = np.where(counts == 2, FACES, 0).max(axis=1)
+
+    has_trilling = trilling_face > 0
+    result[:, ROW_TRILLING] = np.where(has_trilling, trilling_value + 30, 0)
+    result[:, ROW_FULL_HOUSE] = np.where(has_trilling & (pair_face > 0), trilling_value + pair_face * 2 + 40, 0)
+    result[:, ROW_POKER] = np.where(trilling_count >= 4, trilling_value + 50, 0)
+
+    jamb_value = np.where(trilling_face == 1, 100, trilling_value + 60)
+    jamb_value = np.where(trilling_count == 6, np.where(trilling_face == 1, 150, 100), jamb_value)
+    result[:, ROW_JAMB] = np.where(trilling_count >= 5, jamb_value, 0)
+
+    # Straight
+    present = counts[:, 1:7] > 0
+    straight_value = np.where(present[:, 0:5].all(axis=1), 45, 0)
+    straight_value = np.where(present[:, 1:6].all(axis=1), 50, straight_value)
+    straight_value = np.where(present.all(axis=1), 100, straight_value)
+    result[:, ROW_STRAIGHT] = straight_value
+
+    return result
@@ -0,0 +1,309 @@
+"""
+Benchmarks of the hot paths, headless (the Qt ones run on the offscreen platform).
+
+    python jamb_benchmark.py --output before.json
+    python jamb_benchmark.py --output after.json --compare before.json
+    python jamb_benchmark.py --filter score_dice,roll_dice --no-gui
+
+Every benchmark is timed --repeat times, the results are microseconds per
+operation. --compare prints the ratio of the minimum timings to an older
+result file and exits with 1 if a benchmark is slower than --threshold.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import timeit
+import tempfile
+import platform
+import argparse
+
+from jamb_rules import NUMBER_OF_DICE, NUMBER_OF_ROWS, NUMBER_OF_COLS, get_column_total
+from jamb_table import score_dice
+from jamb_game import JambGame, PlayerSheet
+from jamb_random import DiceRandom
+from jamb_strategy import get_strategy, play_turn
+
+SAMPLE_SIZE = 1000
+# Turns of the sample games are picked up to 2 players * SAMPLE_GAME_TURNS
+SAMPLE_GAME_TURNS = 20
+
+DEFAULT_REPEAT = 7
+DEFAULT_THRESHOLD = 0.1
+
+
+def get_sample_dice(rng=None, size=SAMPLE_SIZE):
+    return [tuple(rng.randint(1, 6) for i in range(NUMBER_OF_DICE)) for j in range(size)]
+
+
+def get_sample_games(rng=None, size=100):
+    """
+    :return: 2 player games stopped at a random turn, after the first roll
+    """
+
+    strategy = get_strategy("greedy", rng)
+    lst_game = []
+    for i in range(size):
+        game = JambGame(["Ana", "Bob"], rng=DiceRandom(rng.random()))
+        game.start()
+        for turn in range(rng.randrange(SAMPLE_GAME_TURNS * 2)):
+            play_turn(game, strategy)
+        game.roll()
+        lst_game.append(game)
+
+    return lst_game
+
+
+def bench_score_dice(rng=None):
+    """
+    Scores of a roll from the jamb_table lookup, as JambGame.roll gets them.
+    """
+
+    lst_dice = get_sample_dice(rng)
+
+    def run():
+        for dice in lst_dice:
+            score_dice(dice)
+
+    return run, len(lst_dice)
+
+
+def bench_column_total(rng=None):
+    lst_column = [[rng.randint(0, 60) for row_id in range(NUMBER_OF_ROWS)] for i in range(SAMPLE_SIZE)]
+
+    def run():
+        for lst_value in lst_column:
+            get_column_total(lst_value)
+
+    return run, len(lst_column)
+
+
+def bench_sheet_write(rng=None):
+    """
+    Totals kept up to date by PlayerSheet.write, one operation is a whole sheet.
+    """
+
+    lst_cell = [(col_id, row_id, rng.randint(0, 60)) for col_id in range(NUMBER_OF_COLS)
+                for row_id in range(NUMBER_OF_ROWS)]
+
+    def run():
+        for i in range(10):
+            sheet = PlayerSheet()
+            for cell in lst_cell:
+                sheet.write(*cell)
+
+    return run, 10
+
+
+def bench_open_masks(rng=None):
+    """
+    Table rules: the cells a player can write after a roll.
+    """
+
+    lst_game = get_sample_games(rng)
+
+    def run():
+        for game in lst_game:
+            game.get_open_masks()
+            game.get_available_masks()
+
+    return run, len(lst_game)
+
+
+def bench_roll_dice(rng=None):
+    dice_rng = DiceRandom(rng.random())
+    lst_held = [[rng.random() < 0.5 for i in range(NUMBER_OF_DICE)] for j in range(SAMPLE_SIZE)]
+    dices = dice_rng.roll_dices(NUMBER_OF_DICE)
+
+    def run():
+        for held in lst_held:
+            dice_rng.roll(dices, held)
+
+    return run, len(lst_held)
+
+
+def bench_game_roll(rng=None):
+    """
+    JambGame.roll with a listener, as the GUI and the server use it.
+    """
+
+    game = JambGame(["Ana", "Bob"], rng=DiceRandom(rng.random()))
+    game.add_listener(lambda event="", data=None: None)
+    game.start()
+
+    def run():
+        for i in range(SAMPLE_SIZE):
+            game.roll_turn = 0
+            game.roll()
+
+    return run, SAMPLE_SIZE
+
+
+def get_application():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from Jumb import QApplication
+
+    return QApplication.instance() or QApplication([])
+
+
+def bench_player_table(rng=None):
+    from Jumb import JambPlayerTable
+
+    app = get_application()
+    lst_game = get_sample_games(rng, 10)
+
+    def run():
+        for game in lst_game:
+            playerWdg = JambPlayerTable(sheet=game.get_this_sheet())
+            playerWdg.resize(700, 420)
+            playerWdg.show()
+            playerWdg.fill_items(game.get_open_masks())
+            app.processEvents()
+            playerWdg.close()
+            playerWdg.deleteLater()
+        app.processEvents()
+
+    return run, len(lst_game)
+
+
+def bench_jamb_win(rng=None):
+    """
+    Main window built, shown and painted, without a journal to resume.
+    """
+
+    from Jumb import JambWin
+
+    app = get_application()
+    os.environ["JAMB_JOURNAL"] = os.path.join(tempfile.gettempdir(), "jamb_benchmark_journal.bin")
+
+    def run():
+        jambWin = JambWin()
+        jambWin.resize(750, 600)
+        jambWin.show()
+        app.processEvents()
+        jambWin.close()
+        jambWin.deleteLater()
+        app.processEvents()
+
+    return run, 1
+
+
+# (name, setup, needs Qt), setup(rng) returns (function, operations per call)
+LST_BENCHMARK = [
+    ("score_dice", bench_score_dice, False),
+    ("column_total", bench_column_total, False),
+    ("sheet_write", bench_sheet_write, False),
+    ("open_masks", bench_open_masks, False),
+    ("roll_dice", bench_roll_dice, False),
+    ("game_roll", bench_game_roll, False),
+    ("player_table", bench_player_table, True),
+    ("jamb_win", bench_jamb_win, True),
+]
+
+
+def run_benchmarks(lst_name=None, repeat=DEFAULT_REPEAT, gui=True, seed=0):
+    """
+    :return: dict {name: {"ops", "min_us", "median_us", "mean_us"}}
+    """
+
+    dict_result = {}
+
+    for name, setup, needs_gui in LST_BENCHMARK:
+        if lst_name and name not in lst_name:
+            continue
+        if needs_gui and not gui:
+            continue
+
+        func, ops = setup(random.Random("{0}-{1}".format(seed, name)))
+        func()
+
+        # About 0.2 s per timing
+        start_time = time.perf_counter()
+        func()
+        number = max(1, int(0.2 / max(time.perf_counter() - start_time, 1e-6)))
+
+        lst_time = sorted(timing / (number * ops) * 1e6 for timing in timeit.Timer(func).repeat(repeat, number))
+        dict_result[name] = {"ops": number * ops, "min_us": lst_time[0], "median_us": lst_time[len(lst_time) // 2],
+                             "mean_us": sum(lst_time) / len(lst_time)}
+
+    return dict_result
+
+
+def compare_results(dict_result=None, dict_old=None, threshold=DEFAULT_THRESHOLD):
+    """
+    :return: names of the benchmarks slower than threshold
+    """
+
+    lst_slower = []
+    print("")
+    print("{0:<16}{1:>12}{2:>12}{3:>10}".format("", "old us", "new us", "ratio"))
+
+    for name, dict_item in dict_result.items():
+        dict_old_item = dict_old.get(name)
+        if dict_old_item is None:
+            continue
+
+        # The minimum is the timing least disturbed by the rest of the system
+        ratio = dict_item["min_us"] / max(dict_old_item["min_us"], 1e-9)
+        mark = ""
+        if ratio > 1 + threshold:
+            lst_slower.append(name)
+            mark = "  slower"
+        elif ratio < 1 - threshold:
+            mark = "  faster"
+
+        print("{0:<16}{1:>12.2f}{2:>12.2f}{3:>10.2f}{4}".format(name, dict_old_item["min_us"], dict_item["min_us"],
+                                                              ratio, mark))
+
+    return lst_slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Jamb benchmarks")
+    parser.add_argument("--filter", default="", help="comma separated benchmark names: {0}".format(
+        ", ".join(name for name, setup, needs_gui in LST_BENCHMARK)))
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timings per benchmark")
+    parser.add_argument("--no-gui", action="store_true", help="skip the Qt benchmarks")
+    parser.add_argument("--seed", default="0", help="seed of the sample data")
+    parser.add_argument("--output", default="", help="write the results to a JSON file")
+    parser.add_argument("--compare", default="", help="JSON results of an older run")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="slower ratio counted as a regression by --compare")
+    args = parser.parse_args()
+
+    lst_name = [name for name in args.filter.split(",") if name]
+    lst_unknown = [name for name in lst_name if name not in [name_ for name_, setup, needs_gui in LST_BENCHMARK]]
+    if lst_unknown:
+        parser.error("unknown benchmark: {0}".format(", ".join(lst_unknown)))
+    dict_result = run_benchmarks(lst_name, max(args.repeat, 1), not args.no_gui, args.seed)
+
+    print("{0:<16}{1:>12}{2:>12}{3:>12}".format("", "min us", "median us", "ops"))
+    for name, dict_item in dict_result.items():
+        print("{0:<16}{1:>12.2f}{2:>12.2f}{3:>12}".format(name, dict_item["min_us"], dict_item["median_us"],
+                                                        dict_item["ops"]))
+
+    if args.output:
+        dict_output = {
+            "created": int(time.time()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "results": dict_result,
+        }
+        with open(args.output, "w") as file_:
+            json.dump(dict_output, file_, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file_:
+            dict_old = json.load(file_)["results"]
+        if compare_results(dict_result, dict_old, args.threshold):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+Scripted Jamb client: bot players for the jamb_server tables.
+
+    python jamb_client.py --tables 1000 --players 2 --strategy greedy
+    python jamb_client.py --local --tables 200     # with a server in the same process
+
+Every bot keeps a JambGame copy of its table, fed by the events of the
+server, and plays its turns with a jamb_strategy strategy.
+"""
+
+import sys
+import time
+import random
+import asyncio
+import argparse
+
+from jamb_game import JambGame
+from jamb_strategy import DICT_STRATEGY, get_strategy, choose_action
+from jamb_server import DEFAULT_HOST, DEFAULT_PORT, JambServer, get_game_turns
+from jamb_protocol import encode_message, read_message
+
+
+class BotClient(object):
+
+    def __init__(self, table_id="", name="", seats=2, strategy=None):
+        self.table_id = table_id
+        self.name = name
+        self.seats = seats
+        self.strategy = strategy
+        self.seat = -1
+        self.game = None
+        self.pending_event = None
+        self.totals = None
+        self.messages = 0
+        self.errors = 0
+
+    def apply_event(self, message=None):
+        """
+        Follow the server game with the local copy.
+
+        :return: True if it is the turn of the bot to play
+        """
+
+        event = message.get("event")
+        game = self.game
+
+        if event == "start":
+            self.seat = message["seat"]
+            self.game = JambGame(message["players"], message["game_turns"])
+            self.game.start()
+            return False
+
+        if game is None:
+            return False
+
+        if event == "finish":
+            self.totals = message["totals"]
+            return False
+
+        game.apply_event(event, message)
+
+        # Play on "turn" or when the event of the last action comes back,
+        # a write to the Announcement column also sends an "announcement" event
+        if event != "turn" and event != self.pending_event:
+            return False
+
+        self.pending_event = None
+        return not game.is_finished() and game.player_index == self.seat
+
+    def get_action_message(self):
+        action = choose_action(self.game, self.strategy)
+
+        if action[0] == "roll":
+            self.pending_event = "roll"
+            message = {"type": "roll"}
+            if action[1] is not None:
+                message["held"] = list(action[1])
+            return message
+
+        if action[0] == "announce":
+            self.pending_event = "announcement"
+            return {"type": "announce", "row": action[1]}
+
+        return {"type": "write", "col": action[1], "row": action[2]}
+
+    async def play(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        reader, writer = await asyncio.open_connection(host, port)
+
+        writer.write(encode_message({"type": "join", "table": self.table_id, "name": self.name,
+                                     "seats": self.seats}))
+
+        try:
+            while True:
+                message = await read_message(reader)
+                if message is None:
+                    break
+
+                self.messages += 1
+
+                if message["type"] == "joined":
+                    self.seat = message["seat"]
+
+                elif message["type"] == "error":
+                    self.errors += 1
+                    break
+
+                elif message["type"] == "event":
+                    if message["event"] == "closed":
+                        break
+
+                    if self.apply_event(message):
+                        writer.write(encode_message(self.get_action_message()))
+
+                    if self.totals is not None:
+                        break
+
+                await writer.drain()
+
+        finally:
+            writer.close()
+
+
+async def run_clients(host=DEFAULT_HOST, port=DEFAULT_PORT, tables=1, players=2, strategy_name="greedy", seed=0,
+                      local=False, game_turns=None):
+
+    server = None
+    if local:
+        server = JambServer(seed=seed) if game_turns is None else JambServer(game_turns, seed)
+        host, port = await server.start(host, 0)
+
+    rng = random.Random(seed)
+    lst_client = [BotClient("table-{0}".format(table_index), "Bot {0}".format(seat + 1), players,
+                            get_strategy(strategy_name, rng))
+                  for table_index in range(tables) for seat in range(players)]
+
+    try:
+        await asyncio.gather(*[client.play(host, port) for client in lst_client])
+    finally:
+        if server is not None:
+            server.close()
+
+    return lst_client
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Jamb scripted clients")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="server address")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="server port")
+    parser.add_argument("--tables", type=int, default=10, help="number of tables")
+    parser.add_argument("--players", type=int, default=2, help="bots per table")
+    parser.add_argument("--strategy", default="greedy", choices=sorted(DICT_STRATEGY), help="strategy of the bots")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the bots (and the local server dice)")
+    parser.add_argument("--local", action="store_true", help="run a server in this process on a free port")
+    parser.add_argument("--game-turns", type=get_game_turns, default=None,
+                        help="rounds of a game of the local server, 0 plays until the sheets are full")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    lst_client = asyncio.run(run_clients(args.host, args.port, args.tables, args.players, args.strategy, args.seed,
+                                         args.local, args.game_turns))
+    elapsed = time.time() - start_time
+
+    finished = [client for client in lst_client if client.totals is not None]
+    messages = sum(client.messages for client in lst_client)
+    errors = sum(client.errors for client in lst_client)
+
+    print("{0}/{1} clients finished, {2} messages, {3} errors, {4:.1f}s ({5:.0f} messages/s)".format(
+        len(finished), len(lst_client), messages, errors, elapsed, messages / max(elapsed, 1e-9)))
+
+    lst_total = [total for client in finished if client.seat == 0 for total in client.totals]
+    if lst_total:
+        print("Mean total: {0:.1f}".format(sum(lst_total) / float(len(lst_total))))
+
+    return 0 if len(finished) == len(lst_client) and not errors else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""
+Columnar export of game sheets for analytics.
+
+    sheets.npy          int16 array (games, players, NUMBER_OF_COLS, NUMBER_OF_ROWS), NumPy .npy format
+    sheets.players.npy  uint16 array (games, players), index of the player name in the metadata
+    sheets.json         metadata: shape, axes, column and row names, player names, source
+
+The .npy files are written with the standard library only and can be
+loaded zero-copy:
+
+    sheets, players, dict_meta = load_sheets("sheets.npy")   # numpy memory maps
+
+Games with fewer players than the array are padded with zero sheets and
+player index NO_PLAYER.
+
+    python jamb_export.py --history jamb_history.db --output sheets.npy
+"""
+
+import os
+import sys
+import ast
+import json
+import time
+import struct
+import argparse
+from array import array
+
+from jamb_rules import NUMBER_OF_ROWS, NUMBER_OF_COLS, DICT_ROW_HEADER, DICT_COL_HEADER
+from jamb_history import HistoryStore, pack_cells
+
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+
+# Header size of the files, room to write the final shape once all the games are written
+NPY_HEADER_SIZE = 128
+
+NO_PLAYER = 0xFFFF
+SHEET_SIZE = NUMBER_OF_COLS * NUMBER_OF_ROWS
+
+
+def get_npy_header(descr="<i2", shape=()):
+    """
+    :return: NPY_HEADER_SIZE bytes of a .npy version 1.0 header
+    """
+
+    header = "{{'descr': '{0}', 'fortran_order': False, 'shape': {1}, }}".format(descr, tuple(shape))
+    size = NPY_HEADER_SIZE - len(NPY_MAGIC) - 2
+    if len(header) + 1 > size:
+        raise ValueError("Shape too large for the header: {0}".format(shape))
+
+    return NPY_MAGIC + struct.pack("<H", size) + (header.ljust(size - 1) + "\n").encode("latin1")
+
+
+def read_npy_header(path=""):
+    """
+    :return: (descr, shape, data offset) of a .npy version 1.0 file
+    """
+
+    with open(path, "rb") as file_:
+        data = file_.read(len(NPY_MAGIC) + 2)
+        if data[:len(NPY_MAGIC)] != NPY_MAGIC:
+            raise ValueError("Not a .npy 1.0 file: {0}".format(path))
+        size = struct.unpack("<H", data[len(NPY_MAGIC):])[0]
+        dict_header = ast.literal_eval(file_.read(size).decode("latin1"))
+
+    return dict_header["descr"], dict_header["shape"], len(NPY_MAGIC) + 2 + size
+
+
+def get_side_paths(path=""):
+    """
+    :return: (players .npy path, metadata .json path) next to a sheets .npy path
+    """
+
+    root = path[:-4] if path.endswith(".npy") else path
+    return root + ".players.npy", root + ".json"
+
+
+class SheetArrayWriter(object):
+    """
+    Streams games to the .npy files, the shape is written by close().
+    """
+
+    def __init__(self, path="", players=1, source="", dict_extra=None):
+        self.path = path
+        self.players = players
+        self.source = source
+        self.dict_extra = dict_extra or {}
+        self.players_path, self.meta_path = get_side_paths(path)
+        self.games = 0
+        self.lst_name = []
+        self.dict_name_index = {}
+
+        self.file = open(path, "wb")
+        self.file.write(get_npy_header("<i2", (0, players, NUMBER_OF_COLS, NUMBER_OF_ROWS)))
+        self.players_file = open(self.players_path, "wb")
+        self.players_file.write(get_npy_header("<u2", (0, players)))
+
+        self.empty_sheet = bytes(SHEET_SIZE * 2)
+
+    def get_name_index(self, name=""):
+        index = self.dict_name_index.get(name)
+        if index is None:
+            index = len(self.lst_name)
+            self.lst_name.append(name)
+            self.dict_name_index[name] = index
+        return index
+
+    def add_game(self, lst_sheet=()):
+        """
+        :param lst_sheet: list of (player name, NUMBER_OF_COLS * NUMBER_OF_ROWS values) of one game
+        """
+
+        if len(lst_sheet) > self.players:
+            raise ValueError("{0} sheets for {1} players".format(len(lst_sheet), self.players))
+
+        players = array("H", [NO_PLAYER]) * self.players
+        for seat, (name, values) in enumerate(lst_sheet):
+            self.file.write(pack_cells(values))
+            players[seat] = self.get_name_index(name)
+
+        for seat in range(len(lst_sheet), self.players):
+            self.file.write(self.empty_sheet)
+
+        if sys.byteorder != "little":
+            players.byteswap()
+        self.players_file.write(players.tobytes())
+        self.games += 1
+
+    def add_jamb_game(self, game=None):
+        self.add_game([(sheet.player_name, sheet.values) for sheet in game.lst_sheet])
+
+    def add_data(self, data=b"", lst_player_name=()):
+        """
+        Add games already packed as little-endian int16 sheets, all of the same players.
+        """
+
+        self.file.write(data)
+
+        game_bytes = SHEET_SIZE * 2 * self.players
+        games = len(data) // game_bytes
+        players = array("H", [self.get_name_index(name) for name in lst_player_name])
+        players.extend([NO_PLAYER] * (self.players - len(players)))
+        if sys.byteorder != "little":
+            players.byteswap()
+        self.players_file.write(players.tobytes() * games)
+        self.games += games
+
+    def close(self):
+        shape = (self.games, self.players, NUMBER_OF_COLS, NUMBER_OF_ROWS)
+
+        self.file.seek(0)
+        self.file.write(get_npy_header("<i2", shape))
+        self.file.close()
+
+        self.players_file.seek(0)
+        self.players_file.write(get_npy_header("<u2", shape[:2]))
+        self.players_file.close()
+
+        dict_meta = {
+            "shape": list(shape),
+            "dtype": "int16",
+            "axes": ["game", "player", "col", "row"],
+            "columns": [DICT_COL_HEADER[col_id] for col_id in range(NUMBER_OF_COLS)],
+            "rows": [DICT_ROW_HEADER[row_id] for row_id in range(NUMBER_OF_ROWS)],
+            "players_file": os.path.basename(self.players_path),
+            "player_names": self.lst_name,
+            "no_player": NO_PLAYER,
+            "source": self.source,
+            "created": int(time.time()),
+        }
+        dict_meta.update(self.dict_extra)
+
+        with open(self.meta_path, "w") as file_:
+            json.dump(dict_meta, file_, indent=2)
+
+
+def load_sheets(path=""):
+    """
+    :return: (sheets, players, metadata), the arrays are read-only numpy memory maps
+    """
+
+    import numpy as np
+
+    players_path, meta_path = get_side_paths(path)
+    with open(meta_path) as file_:
+        dict_meta = json.load(file_)
+
+    return np.load(path, mmap_mode="r"), np.load(players_path, mmap_mode="r"), dict_meta
+
+
+def export_history(history=None, path="", players=None):
+    """
+    Export every game of a jamb_history store.
+
+    :return: number of games written
+    """
+
+    if players is None:
+        players = history.connection.execute("SELECT COALESCE(MAX(players), 1) FROM games").fetchone()[0]
+
+    writer = SheetArrayWriter(path, players, "history:{0}".format(os.path.basename(history.path)))
+
+    game_id = None
+    lst_sheet = []
+    for row in history.iter_sheets():
+        if row[0] != game_id:
+            if lst_sheet:
+                writer.add_game(lst_sheet)
+            game_id = row[0]
+            lst_sheet = []
+        lst_sheet.append((row[3], row[6]))
+
+    if lst_sheet:
+        writer.add_game(lst_sheet)
+
+    writer.close()
+    return writer.games
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export Jamb sheets to .npy")
+    parser.add_argument("--history", default=None, help="jamb_history database to export")
+    parser.add_argument("--output", default="sheets.npy", help="sheets .npy file")
+    args = parser.parse_args()
+
+    if args.history:
+        start_time = time.time()
+        history = HistoryStore(args.history)
+        games = export_history(history, args.output)
+        history.close()
+        print("{0} games exported in {1:.1f}s".format(games, time.time() - start_time))
+
+    descr, shape, offset = read_npy_header(args.output)
+    print("{0}: {1} {2}".format(args.output, descr, shape))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,443 @@
+"""
+Jamb game state without any Qt dependency.
+
+JambGame owns the turn flow (rolls, held dice, announcement, checkout,
+player rotation) and one PlayerSheet per player. Widgets, bots and servers
+follow the game through listeners:
+
+    game = JambGame(["Ana", "Bob"])
+    game.add_listener(lambda event, data: ...)
+    game.start()
+    game.roll()
+    game.set_held(0, True)
+    game.write(col_id, row_id)
+
+Events: "turn", "roll", "hold", "announcement", "checkout", "write", "finish".
+
+The game ends when every sheet is full, players with a full sheet are
+skipped. total_game_turns > 0 ends it after that many rounds instead. The
+last turn of a player has LAST_TURN_EXTRA_ROLLS more rolls, see is_last_turn().
+"""
+
+from array import array
+
+from jamb_rules import TOTAL_GAME_TURNS, NUMBER_OF_DICE, NUMBER_OF_ROWS, NUMBER_OF_COLS, COL_ANNOUNCEMENT, \
+    COL_CHECKOUT, ROW_MAX, ROW_MIN, ROW_TRILLING, DEFAULT_RULES, get_column_total_from_parts, get_open_mask, \
+    get_mask_rows
+from jamb_table import score_dice
+from jamb_random import DiceRandom
+from jamb_trace import traced
+
+
+class PlayerSheet(object):
+    """
+    Values of one player table in flat arrays, index of a cell is col_id * NUMBER_OF_ROWS + row_id.
+    """
+
+    __slots__ = ("player_name", "rules", "values", "filled", "open_mask", "numbers_sum", "signs_sum", "col_total", "total",
+                 "checkout", "checkout_row_index")
+
+    def __init__(self, player_name="", rules=DEFAULT_RULES):
+        self.player_name = player_name
+        self.rules = rules
+        self.values = array("h", [0]) * (NUMBER_OF_COLS * NUMBER_OF_ROWS)
+        self.filled = array("H", [0]) * NUMBER_OF_COLS
+        self.open_mask = array("H", [get_open_mask(col_id, 0) for col_id in range(NUMBER_OF_COLS)])
+        self.numbers_sum = array("i", [0]) * NUMBER_OF_COLS
+        self.signs_sum = array("i", [0]) * NUMBER_OF_COLS
+        self.col_total = array("i", [0]) * NUMBER_OF_COLS
+        self.total = 0
+        self.checkout = False
+        self.checkout_row_index = -1
+
+    def copy(self):
+        sheet = PlayerSheet.__new__(PlayerSheet)
+        for name in PlayerSheet.__slots__:
+            value = getattr(self, name)
+            setattr(sheet, name, value[:] if isinstance(value, array) else value)
+        return sheet
+
+    def get_value(self, col_id=0, row_id=0):
+        return self.values[col_id * NUMBER_OF_ROWS + row_id]
+
+    def is_filled(self, col_id=0, row_id=0):
+        return bool(self.filled[col_id] & (1 << row_id))
+
+    def is_full(self):
+        return all(filled_mask == (1 << NUMBER_OF_ROWS) - 1 for filled_mask in self.filled[:COL_CHECKOUT])
+
+    def get_empty_cells(self):
+        """
+        :return: number of cells left outside the Checkout column
+        """
+        filled_cells = sum(bin(filled_mask).count("1") for filled_mask in self.filled[:COL_CHECKOUT])
+        return NUMBER_OF_ROWS * COL_CHECKOUT - filled_cells
+
+    def get_column_values(self, col_id=0):
+        start = col_id * NUMBER_OF_ROWS
+        return self.values[start:start + NUMBER_OF_ROWS]
+
+    def get_values_matrix(self):
+        return [list(self.get_column_values(col_id)) for col_id in range(NUMBER_OF_COLS)]
+
+    def get_open_rows(self, col_id=0):
+        return get_mask_rows(self.open_mask[col_id])
+
+    def write(self, col_id=0, row_id=0, value=0):
+
+        index = col_id * NUMBER_OF_ROWS + row_id
+        old_value = self.values[index]
+        self.values[index] = value
+        self.filled[col_id] |= 1 << row_id
+        self.open_mask[col_id] = get_open_mask(col_id, self.filled[col_id])
+
+        if row_id < 6:
+            self.numbers_sum[col_id] += value - old_value
+        elif row_id >= ROW_TRILLING:
+            self.signs_sum[col_id] += value - old_value
+
+        start = col_id * NUMBER_OF_ROWS
+        total_col = get_column_total_from_parts(self.numbers_sum[col_id], self.signs_sum[col_id], self.values[start],
+                                                self.values[start + ROW_MAX], self.values[start + ROW_MIN],
+                                                self.rules.bonus_threshold, self.rules.bonus_value)
+
+        self.total += total_col - self.col_total[col_id]
+        self.col_total[col_id] = total_col
+
+    def set_checkout(self, row_id=0):
+        """
+        :return: True if the Checkout cell is open and the player has to write it next turn
+        """
+
+        if self.is_filled(COL_CHECKOUT, row_id):
+            return False
+
+        self.checkout = True
+        self.checkout_row_index = row_id
+        return True
+
+    def reset_checkout(self):
+        self.checkout = False
+        self.checkout_row_index = -1
+
+
+class JambGame(object):
+
+    __slots__ = ("rules", "rng", "lst_sheet", "player_index", "roll_turn", "total_game_turns", "game_remain_turns",
+                 "open_sheets", "announcement", "announcement_row", "dices", "held", "scores", "lst_listener")
+
+    def __init__(self, lst_player_name=(), total_game_turns=TOTAL_GAME_TURNS, rules=DEFAULT_RULES, rng=None):
+        """
+        :param total_game_turns: rounds of the game, 0 plays until every sheet is full
+        :param rng: DiceRandom of the game, seed it to replay the same dice
+        """
+
+        self.rules = rules
+        self.rng = rng if rng is not None else DiceRandom()
+        self.lst_sheet = [PlayerSheet(player_name, rules) for player_name in lst_player_name]
+        self.player_index = 0
+        self.roll_turn = 0
+        self.total_game_turns = total_game_turns
+        self.game_remain_turns = total_game_turns
+        # Sheets with cells left outside the Checkout column
+        self.open_sheets = len(self.lst_sheet)
+        self.announcement = False
+        self.announcement_row = -1
+        self.dices = array("b", [0]) * NUMBER_OF_DICE
+        self.held = [False] * NUMBER_OF_DICE
+        self.scores = None
+        self.lst_listener = []
+
+    def copy(self):
+        """
+        :return: JambGame with copies of the sheets and of the turn state, without the listeners
+        """
+
+        game = JambGame.__new__(JambGame)
+        game.rules = self.rules
+        game.rng = self.rng
+        game.lst_sheet = [sheet.copy() for sheet in self.lst_sheet]
+        game.player_index = self.player_index
+        game.roll_turn = self.roll_turn
+        game.total_game_turns = self.total_game_turns
+        game.game_remain_turns = self.game_remain_turns
+        game.open_sheets = self.open_sheets
+        game.announcement = self.announcement
+        game.announcement_row = self.announcement_row
+        game.dices = self.dices[:]
+        game.held = list(self.held)
+        game.scores = self.scores
+        game.lst_listener = []
+        return game
+
+    def add_listener(self, listener=None):
+        """
+        :param listener: callable(event, data) called after every change of the game
+        """
+
+        if listener not in self.lst_listener:
+            self.lst_listener.append(listener)
+
+    def remove_listener(self, listener=None):
+        if listener in self.lst_listener:
+            self.lst_listener.remove(listener)
+
+    def notify(self, event="", **data):
+        for listener in list(self.lst_listener):
+            listener(event, data)
+
+    def is_last_turn(self):
+        """
+        Last round of a game with a round limit, else the turn that writes the last empty cell of the sheet.
+        """
+
+        if self.total_game_turns:
+            return self.game_remain_turns == 1
+
+        sheet = self.get_this_sheet()
+        return sheet is not None and not sheet.checkout and sheet.get_empty_cells() == 1
+
+    def get_total_roll_turns(self):
+        return self.rules.get_total_roll_turns(self.is_last_turn())
+
+    def get_rolls_left(self):
+        return self.get_total_roll_turns() - self.roll_turn
+
+    def get_this_sheet(self):
+        return self.lst_sheet[self.player_index] if self.player_index < len(self.lst_sheet) else None
+
+    def get_next_sheet(self):
+        if not self.lst_sheet:
+            return None
+        return self.lst_sheet[(self.player_index + 1) % len(self.lst_sheet)]
+
+    def count_open_sheets(self):
+        """
+        Count the sheets that are not full again, after the sheets were replaced.
+        """
+
+        self.open_sheets = sum(1 for sheet in self.lst_sheet if not sheet.is_full())
+
+    def is_finished(self):
+
+        if not self.lst_sheet:
+            return True
+
+        if self.total_game_turns and self.game_remain_turns < 1:
+            return True
+
+        # A checkout announced in the last turn is still played
+        return self.open_sheets == 0 and not self.lst_sheet[self.player_index].checkout
+
+    def can_roll(self):
+
+        if self.is_finished() or self.roll_turn >= self.get_total_roll_turns():
+            return False
+
+        # The Announcement column closes with the second roll, a sheet with only that column left
+        # has to announce or write after the first roll
+        sheet = self.get_this_sheet()
+        return self.roll_turn == 0 or self.announcement or sheet.checkout or any(sheet.open_mask[:COL_ANNOUNCEMENT])
+
+    def can_announce(self):
+        sheet = self.get_this_sheet()
+        return self.roll_turn == 1 and not self.announcement and sheet is not None and not sheet.checkout
+
+    def start(self):
+        self.player_index = 0
+        self.game_remain_turns = self.total_game_turns
+        self.count_open_sheets()
+        self.start_turn()
+
+    def start_turn(self):
+
+        self.roll_turn = 0
+        self.announcement = False
+        self.announcement_row = -1
+        self.scores = None
+        for i in range(NUMBER_OF_DICE):
+            self.dices[i] = 0
+            self.held[i] = False
+
+        if self.is_finished():
+            self.notify("finish")
+        else:
+            self.notify("turn", player_index=self.player_index)
+
+    def set_held(self, index=0, state=True):
+
+        if self.roll_turn == 0 or not 0 <= index < NUMBER_OF_DICE:
+            return False
+
+        self.held[index] = bool(state)
+        self.notify("hold", held=tuple(self.held))
+        return True
+
+    def set_held_mask(self, held_mask=()):
+
+        if self.roll_turn == 0:
+            return False
+
+        for i, state in enumerate(held_mask):
+            self.held[i] = bool(state)
+
+        self.notify("hold", held=tuple(self.held))
+        return True
+
+    @traced("JambGame.roll")
+    def roll(self, dices=None):
+        """
+        :param dices: values to use instead of random dice (replay, remote play), held dice are kept anyway
+        :return: tuple of the dice or None if the turn has no rolls left
+        """
+
+        if not self.can_roll():
+            return None
+
+        if dices is None:
+            dices = self.rng.roll(self.dices, self.held)
+
+        for i in range(NUMBER_OF_DICE):
+            if not self.held[i]:
+                self.dices[i] = dices[i]
+
+        self.roll_turn += 1
+        self.scores = score_dice(self.dices)
+        self.notify("roll", dices=tuple(self.dices), roll_turn=self.roll_turn)
+
+        return tuple(self.dices)
+
+    @traced("JambGame.get_available_masks")
+    def get_available_masks(self):
+        """
+        :return: list of NUMBER_OF_COLS masks, bit row_id is set if the rules leave the cell open
+                 for the current player this turn
+        """
+
+        lst_mask = [0] * NUMBER_OF_COLS
+
+        sheet = self.get_this_sheet()
+        if sheet is None or self.is_finished():
+            return lst_mask
+
+        if sheet.checkout:
+            lst_mask[COL_CHECKOUT] = 1 << sheet.checkout_row_index
+        elif self.announcement:
+            lst_mask[COL_ANNOUNCEMENT] = 1 << self.announcement_row
+        else:
+            lst_mask[:COL_CHECKOUT] = sheet.open_mask[:COL_CHECKOUT]
+
+            # Announcement column closes after the first roll
+            if self.roll_turn > 1:
+                lst_mask[COL_ANNOUNCEMENT] = 0
+
+        return lst_mask
+
+    @traced("JambGame.get_open_masks")
+    def get_open_masks(self):
+        """
+        :return: list of NUMBER_OF_COLS masks of the cells the current player can write now
+        """
+
+        if self.roll_turn == 0:
+            return [0] * NUMBER_OF_COLS
+
+        return self.get_available_masks()
+
+    def is_open_cell(self, col_id=0, row_id=0):
+        return 0 <= col_id < NUMBER_OF_COLS and 0 <= row_id < NUMBER_OF_ROWS and \
+            bool(self.get_open_masks()[col_id] & (1 << row_id))
+
+    def get_open_cells(self):
+        """
+        :return: list of (col_id, row_id) cells the current player can write now
+        """
+
+        return [(col_id, row_id) for col_id, open_mask in enumerate(self.get_open_masks())
+                for row_id in get_mask_rows(open_mask)]
+
+    def announce(self, row_id=0):
+
+        if not self.can_announce() or not self.is_open_cell(COL_ANNOUNCEMENT, row_id):
+            return False
+
+        self.announcement = True
+        self.announcement_row = row_id
+
+        sheet = self.get_this_sheet()
+        next_sheet = self.get_next_sheet()
+        checkout = next_sheet is not sheet and next_sheet.set_checkout(row_id)
+
+        self.notify("announcement", player_index=self.player_index, row_id=row_id)
+
+        if checkout:
+            self.notify("checkout", player_index=(self.player_index + 1) % len(self.lst_sheet), row_id=row_id)
+        return True
+
+    @traced("JambGame.write")
+    def write(self, col_id=0, row_id=0):
+        """
+        Write the score of the dice to a cell and pass the turn to the next player.
+
+        :return: True if the cell was written
+        """
+
+        if not self.is_open_cell(col_id, row_id):
+            return False
+
+        # Writing to the Announcement column announces it
+        if col_id == COL_ANNOUNCEMENT and not self.announcement:
+            self.announce(row_id)
+
+        sheet = self.get_this_sheet()
+        value = self.scores[row_id]
+        sheet.write(col_id, row_id, value)
+
+        if col_id != COL_CHECKOUT and sheet.is_full():
+            self.open_sheets -= 1
+
+        if sheet.checkout:
+            sheet.reset_checkout()
+
+        self.notify("write", player_index=self.player_index, col_id=col_id, row_id=row_id, value=value)
+        self.next_player()
+        return True
+
+    def apply_event(self, event="", data=None):
+        """
+        Replay an event of another game with the same players (server copy, journal).
+
+        :return: False if the event does not fit the state of this game
+        """
+
+        if event == "roll":
+            return self.roll(data["dices"]) is not None
+
+        if event == "hold":
+            return self.set_held_mask(data["held"])
+
+        if event == "announcement":
+            return self.announcement or self.announce(data["row_id"])
+
+        if event == "write":
+            return self.write(data["col_id"], data["row_id"])
+
+        # turn, checkout and finish follow from the other events
+        return True
+
+    def next_player(self):
+
+        while True:
+            self.player_index += 1
+
+            if self.player_index == len(self.lst_sheet):
+                self.player_index = 0
+                if self.total_game_turns:
+                    self.game_remain_turns -= 1
+
+            # Full sheets skip their turns, unless a checkout is left to write
+            sheet = self.lst_sheet[self.player_index]
+            if self.open_sheets == 0 or not sheet.is_full() or sheet.checkout:
+                break
+
+        self.start_turn()
@@ -0,0 +1,358 @@
+"""
+SQLite store of the finished games.
+
+    history = HistoryStore()
+    history.add_game(game)          # buffered, written in batches of BATCH_SIZE games
+    history.flush()
+    history.get_leaderboard()
+    history.get_category_averages("Ana")
+    history.export_csv(sys.stdout)  # streamed, one sheet per line
+
+Every sheet keeps its 6 x 13 values (int16 blob), column totals and total.
+Leaderboard and per-category averages are read from summary tables kept
+up to date by the inserts, so they do not scan the sheets:
+
+    python jamb_history.py --generate 1000000 --leaderboard --averages
+"""
+
+import os
+import sys
+import csv
+import time
+import sqlite3
+import argparse
+from array import array
+
+from jamb_rules import NUMBER_OF_ROWS, NUMBER_OF_COLS, DICT_ROW_HEADER, DICT_COL_HEADER
+
+DEFAULT_HISTORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "jamb_history.db")
+
+BATCH_SIZE = 1000
+EXPORT_BATCH_SIZE = 1000
+
+LST_COL_FIELD = ["col_{0}".format(col_id) for col_id in range(NUMBER_OF_COLS)]
+
+LST_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS games (id INTEGER PRIMARY KEY, played_at INTEGER NOT NULL, "
+    "players INTEGER NOT NULL, game_turns INTEGER NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS idx_games_played_at ON games (played_at)",
+    "CREATE TABLE IF NOT EXISTS sheets (game_id INTEGER NOT NULL, seat INTEGER NOT NULL, player TEXT NOT NULL, "
+    "total INTEGER NOT NULL, {0} INTEGER NOT NULL, cells BLOB NOT NULL, "
+    "PRIMARY KEY (game_id, seat)) WITHOUT ROWID".format(" INTEGER NOT NULL, ".join(LST_COL_FIELD)),
+    "CREATE INDEX IF NOT EXISTS idx_sheets_player_total ON sheets (player, total)",
+    "CREATE INDEX IF NOT EXISTS idx_sheets_total ON sheets (total)",
+    "CREATE TABLE IF NOT EXISTS player_stats (player TEXT PRIMARY KEY, games INTEGER NOT NULL, "
+    "total_sum INTEGER NOT NULL, best INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS cell_stats (player TEXT NOT NULL, col_id INTEGER NOT NULL, row_id INTEGER NOT NULL, "
+    "count INTEGER NOT NULL, value_sum INTEGER NOT NULL, PRIMARY KEY (player, col_id, row_id)) WITHOUT ROWID",
+]
+
+
+def pack_cells(values=()):
+    cells = array("h", values)
+    if sys.byteorder != "little":
+        cells.byteswap()
+    return cells.tobytes()
+
+
+def unpack_cells(data=b""):
+    cells = array("h")
+    cells.frombytes(data)
+    if sys.byteorder != "little":
+        cells.byteswap()
+    return cells
+
+
+class HistoryStore(object):
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH, batch_size=BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            for statement in LST_SCHEMA:
+                self.connection.execute(statement)
+
+        self.lst_pending = []
+
+    def add_game(self, game=None, played_at=None):
+        """
+        Buffer a finished JambGame, the buffer is written every batch_size games.
+        """
+
+        self.add_sheets([(sheet.player_name, sheet.values, sheet.filled, sheet.col_total, sheet.total)
+                         for sheet in game.lst_sheet], game.total_game_turns, played_at)
+
+    def add_sheets(self, lst_sheet=(), game_turns=0, played_at=None):
+        """
+        :param lst_sheet: list of (player, values, filled masks, column totals, total) of one game
+        """
+
+        self.lst_pending.append((int(time.time() if played_at is None else played_at), game_turns, lst_sheet))
+
+        if len(self.lst_pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the buffered games in one transaction.
+        """
+
+        if not self.lst_pending:
+            return
+
+        lst_pending = self.lst_pending
+        self.lst_pending = []
+
+        dict_player = {}
+        dict_cell = {}
+
+        with self.connection:
+            cursor = self.connection.cursor()
+            row = cursor.execute("SELECT COALESCE(MAX(id), 0) FROM games").fetchone()
+            game_id = row[0]
+
+            lst_game = []
+            lst_row = []
+            for played_at, game_turns, lst_sheet in lst_pending:
+                game_id += 1
+                lst_game.append((game_id, played_at, len(lst_sheet), game_turns))
+
+                for seat, (player, values, filled, col_total, total) in enumerate(lst_sheet):
+                    lst_row.append((game_id, seat, player, total) + tuple(col_total) + (pack_cells(values),))
+
+                    stats = dict_player.setdefault(player, [0, 0, total])
+                    stats[0] += 1
+                    stats[1] += total
+                    stats[2] = max(stats[2], total)
+
+                    for col_id in range(NUMBER_OF_COLS):
+                        filled_mask = filled[col_id]
+                        row_id = 0
+                        while filled_mask:
+                            if filled_mask & 1:
+                                stats = dict_cell.setdefault((player, col_id, row_id), [0, 0])
+                                stats[0] += 1
+                                stats[1] += values[col_id * NUMBER_OF_ROWS + row_id]
+                            filled_mask >>= 1
+                            row_id += 1
+
+            cursor.executemany("INSERT INTO games (id, played_at, players, game_turns) VALUES (?, ?, ?, ?)",
+                               lst_game)
+            cursor.executemany("INSERT INTO sheets (game_id, seat, player, total, {0}, cells) "
+                               "VALUES (?, ?, ?, ?, {1}, ?)".format(", ".join(LST_COL_FIELD),
+                                                                    ", ".join("?" * NUMBER_OF_COLS)), lst_row)
+            cursor.executemany("INSERT INTO player_stats (player, games, total_sum, best) VALUES (?, ?, ?, ?) "
+                               "ON CONFLICT (player) DO UPDATE SET games = games + excluded.games, "
+                               "total_sum = total_sum + excluded.total_sum, best = MAX(best, excluded.best)",
+                               [(player,) + tuple(stats) for player, stats in dict_player.items()])
+            cursor.executemany("INSERT INTO cell_stats (player, col_id, row_id, count, value_sum) "
+                               "VALUES (?, ?, ?, ?, ?) "
+                               "ON CONFLICT (player, col_id, row_id) DO UPDATE SET count = count + excluded.count, "
+                               "value_sum = value_sum + excluded.value_sum",
+                               [key + tuple(stats) for key, stats in dict_cell.items()])
+
+    def get_game_count(self):
+        return self.connection.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def get_leaderboard(self, limit=10):
+        """
+        :return: list of (player, games, average total, best total), best average first
+        """
+
+        return self.connection.execute(
+            "SELECT player, games, CAST(total_sum AS REAL) / games AS average, best FROM player_stats "
+            "ORDER BY average DESC LIMIT ?", (limit,)).fetchall()
+
+    def get_top_sheets(self, limit=10, player=None, since=None, until=None):
+        """
+        :return: list of (total, player, game_id, played_at), best total first
+        """
+
+        lst_where = []
+        lst_param = []
+        if player is not None:
+            lst_where.append("sheets.player = ?")
+            lst_param.append(player)
+        if since is not None:
+            lst_where.append("games.played_at >= ?")
+            lst_param.append(since)
+        if until is not None:
+            lst_where.append("games.played_at < ?")
+            lst_param.append(until)
+
+        where = "WHERE {0}".format(" AND ".join(lst_where)) if lst_where else ""
+        return self.connection.execute(
+            "SELECT sheets.total, sheets.player, sheets.game_id, games.played_at FROM sheets "
+            "JOIN games ON games.id = sheets.game_id {0} ORDER BY sheets.total DESC LIMIT ?".format(where),
+            lst_param + [limit]).fetchall()
+
+    def get_category_averages(self, player=None, col_id=None):
+        """
+        :return: dict {row_id: average of the written values} of a player (all players if None),
+                 of one column (all columns if None)
+        """
+
+        lst_where = []
+        lst_param = []
+        if player is not None:
+            lst_where.append("player = ?")
+            lst_param.append(player)
+        if col_id is not None:
+            lst_where.append("col_id = ?")
+            lst_param.append(col_id)
+
+        where = "WHERE {0}".format(" AND ".join(lst_where)) if lst_where else ""
+        return dict(self.connection.execute(
+            "SELECT row_id, CAST(SUM(value_sum) AS REAL) / SUM(count) FROM cell_stats {0} "
+            "GROUP BY row_id".format(where), lst_param).fetchall())
+
+    def iter_sheets(self, player=None, since=None, until=None):
+        """
+        Stream the sheets, oldest game first.
+
+        :return: iterator of (game_id, played_at, seat, player, total, column totals, cells)
+        """
+
+        lst_where = []
+        lst_param = []
+        if player is not None:
+            lst_where.append("sheets.player = ?")
+            lst_param.append(player)
+        if since is not None:
+            lst_where.append("games.played_at >= ?")
+            lst_param.append(since)
+        if until is not None:
+            lst_where.append("games.played_at < ?")
+            lst_param.append(until)
+
+        where = "WHERE {0}".format(" AND ".join(lst_where)) if lst_where else ""
+        cursor = self.connection.execute(
+            "SELECT sheets.game_id, games.played_at, sheets.seat, sheets.player, sheets.total, {0}, sheets.cells "
+            "FROM sheets JOIN games ON games.id = sheets.game_id {1} "
+            "ORDER BY sheets.game_id, sheets.seat".format(", ".join("sheets." + field for field in LST_COL_FIELD),
+                                                          where), lst_param)
+
+        while True:
+            lst_row = cursor.fetchmany(EXPORT_BATCH_SIZE)
+            if not lst_row:
+                break
+
+            for row in lst_row:
+                yield row[:5] + (row[5:5 + NUMBER_OF_COLS], unpack_cells(row[-1]))
+
+    def export_csv(self, file_=None, player=None, since=None, until=None):
+        """
+        :return: number of sheets written
+        """
+
+        writer = csv.writer(file_)
+        writer.writerow(["game_id", "played_at", "seat", "player", "total"] +
+                        [DICT_COL_HEADER[col_id] for col_id in range(NUMBER_OF_COLS)] +
+                        ["{0} {1}".format(DICT_COL_HEADER[col_id], DICT_ROW_HEADER[row_id])
+                         for col_id in range(NUMBER_OF_COLS) for row_id in range(NUMBER_OF_ROWS)])
+
+        count = 0
+        for game_id, played_at, seat, player_name, total, col_total, cells in self.iter_sheets(player, since, until):
+            writer.writerow([game_id, played_at, seat, player_name, total] + list(col_total) + list(cells))
+            count += 1
+
+        return count
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+
+def generate_games(history=None, games=0, players=4, seed=0):
+    """
+    Fill the store with sheets of random rolls, for the query benchmarks.
+    """
+
+    import numpy as np
+
+    from jamb_rules import get_column_total
+    from jamb_random import DiceRandom
+    from jamb_batch import score_batch
+
+    rng = DiceRandom(seed)
+    lst_name = ["Player {0}".format(i) for i in range(100)]
+    start_time = int(time.time()) - games * 60
+    cols = NUMBER_OF_COLS - 1
+    lst_filled = [(1 << NUMBER_OF_ROWS) - 1] * cols + [0]
+    checkout_values = [0] * NUMBER_OF_ROWS
+
+    for game_index in range(games):
+        scores = score_batch(rng.roll_batch(players * cols * NUMBER_OF_ROWS))
+        cells = np.diagonal(scores.reshape(players, cols, NUMBER_OF_ROWS, NUMBER_OF_ROWS), axis1=2, axis2=3)
+
+        lst_sheet = []
+        for seat in range(players):
+            lst_col = cells[seat].tolist()
+            col_total = [get_column_total(lst_value) for lst_value in lst_col] + [0]
+            values = [value for lst_value in lst_col for value in lst_value] + checkout_values
+            lst_sheet.append((rng.random.choice(lst_name), values, lst_filled, col_total, sum(col_total)))
+
+        history.add_sheets(lst_sheet, cols * NUMBER_OF_ROWS, start_time + game_index * 60)
+
+    history.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Jamb game history")
+    parser.add_argument("--path", default=DEFAULT_HISTORY_PATH, help="history database")
+    parser.add_argument("--generate", type=int, default=0, help="add random games for benchmarks")
+    parser.add_argument("--leaderboard", action="store_true", help="best players by average total")
+    parser.add_argument("--top", action="store_true", help="best sheets")
+    parser.add_argument("--averages", action="store_true", help="average of every category")
+    parser.add_argument("--player", default=None, help="player of --top, --averages and --export")
+    parser.add_argument("--export", default=None, help="export the sheets as CSV to a file, - for stdout")
+    args = parser.parse_args()
+
+    history = HistoryStore(args.path)
+
+    if args.generate:
+        start_time = time.time()
+        generate_games(history, args.generate)
+        print("{0} games added in {1:.1f}s".format(args.generate, time.time() - start_time))
+
+    if args.leaderboard:
+        start_time = time.perf_counter()
+        lst_row = history.get_leaderboard()
+        elapsed = time.perf_counter() - start_time
+        print("Leaderboard ({0} games, {1:.1f} ms)".format(history.get_game_count(), elapsed * 1000))
+        for player, games, average, best in lst_row:
+            print("{0:<16}{1:>10}{2:>10.1f}{3:>8}".format(player, games, average, best))
+
+    if args.top:
+        start_time = time.perf_counter()
+        lst_row = history.get_top_sheets(player=args.player)
+        elapsed = time.perf_counter() - start_time
+        print("Top sheets ({0:.1f} ms)".format(elapsed * 1000))
+        for total, player, game_id, played_at in lst_row:
+            print("{0:>8}  {1:<16}{2:>10}  {3}".format(total, player, game_id,
+                                                     time.strftime("%Y-%m-%d %H:%M", time.localtime(played_at))))
+
+    if args.averages:
+        start_time = time.perf_counter()
+        dict_average = history.get_category_averages(args.player)
+        elapsed = time.perf_counter() - start_time
+        print("Category averages ({0:.1f} ms)".format(elapsed * 1000))
+        for row_id, row_name in DICT_ROW_HEADER.items():
+            if row_id in dict_average:
+                print("{0:<14}{1:>8.2f}".format(row_name, dict_average[row_id]))
+
+    if args.export:
+        if args.export == "-":
+            history.export_csv(sys.stdout, args.player)
+        else:
+            with open(args.export, "w", newline="") as file_:
+                history.export_csv(file_, args.player)
+
+    history.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,291 @@
+"""
+Append-only journal of the current game, to resume it after a crash.
+
+    journal = GameJournal()
+    journal.start(game)             # new journal: players, then every game event
+    ...
+    game = journal.resume()         # at startup: JambGame of the unfinished game or None
+
+The file is a magic header followed by jamb_protocol frames: the "start"
+event, the game events and, every SNAPSHOT_TURNS turns, a snapshot of the
+sheets. Resuming restores the last snapshot and replays the events after
+it. Every record reaches the OS at once, fsync is batched by time and
+record count. A torn record at the end of the file (crash while writing)
+is dropped.
+"""
+
+import os
+import sys
+import time
+import struct
+import argparse
+
+from jamb_rules import NUMBER_OF_ROWS, NUMBER_OF_COLS
+from jamb_game import JambGame, PlayerSheet
+from jamb_protocol import FRAME_HEADER, EVENT_START, get_event_message, encode_payload, decode_payload
+
+JOURNAL_MAGIC = b"JAMBJ001"
+DEFAULT_JOURNAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "jamb_journal.bin")
+
+RECORD_SNAPSHOT = 64
+
+# Snapshot at the start of every SNAPSHOT_TURNS-th turn
+SNAPSHOT_TURNS = 8
+
+FSYNC_INTERVAL = 1.0
+FSYNC_RECORDS = 64
+
+STRUCT_SNAPSHOT = struct.Struct("!BHHB")
+STRUCT_SNAPSHOT_SHEET = struct.Struct("!{0}h{1}Hb".format(NUMBER_OF_COLS * NUMBER_OF_ROWS, NUMBER_OF_COLS))
+
+
+def pack_snapshot(game=None):
+    """
+    Sheets and turn of a game between two turns.
+    """
+
+    lst_data = [STRUCT_SNAPSHOT.pack(RECORD_SNAPSHOT, game.player_index, game.game_remain_turns, len(game.lst_sheet))]
+
+    for sheet in game.lst_sheet:
+        lst_data.append(STRUCT_SNAPSHOT_SHEET.pack(*(list(sheet.values) + list(sheet.filled) +
+                                                      [sheet.checkout_row_index if sheet.checkout else -1])))
+
+    return b"".join(lst_data)
+
+
+def unpack_snapshot(data=b"", game=None):
+    """
+    Restore the sheets and the turn of a game of the same players from a snapshot, ValueError if it is damaged.
+    """
+
+    try:
+        record_id, player_index, game_remain_turns, players = STRUCT_SNAPSHOT.unpack_from(data)
+    except struct.error as error:
+        raise ValueError("Bad snapshot: {0}".format(error))
+
+    if players != len(game.lst_sheet):
+        raise ValueError("Snapshot of {0} players for {1} sheets".format(players, len(game.lst_sheet)))
+
+    if len(data) != STRUCT_SNAPSHOT.size + players * STRUCT_SNAPSHOT_SHEET.size:
+        raise ValueError("Snapshot of {0} bytes for {1} sheets".format(len(data), players))
+
+    cell_count = NUMBER_OF_COLS * NUMBER_OF_ROWS
+    for i, sheet in enumerate(list(game.lst_sheet)):
+        lst_item = STRUCT_SNAPSHOT_SHEET.unpack_from(data, STRUCT_SNAPSHOT.size + i * STRUCT_SNAPSHOT_SHEET.size)
+        sheet = PlayerSheet(sheet.player_name, sheet.rules)
+        game.lst_sheet[i] = sheet
+
+        for col_id in range(NUMBER_OF_COLS):
+            filled_mask = lst_item[cell_count + col_id]
+            for row_id in range(NUMBER_OF_ROWS):
+                if filled_mask & (1 << row_id):
+                    sheet.write(col_id, row_id, lst_item[col_id * NUMBER_OF_ROWS + row_id])
+
+        if lst_item[-1] >= 0:
+            sheet.set_checkout(lst_item[-1])
+
+    game.player_index = player_index
+    game.game_remain_turns = game_remain_turns
+    game.count_open_sheets()
+    game.start_turn()
+
+
+def read_records(path=""):
+    """
+    :return: (list of (offset, payload), offset after the last whole record), None if there is no journal
+    """
+
+    if not os.path.exists(path):
+        return None
+
+    with open(path, "rb") as file_:
+        data = file_.read()
+
+    if not data.startswith(JOURNAL_MAGIC):
+        return None
+
+    lst_record = []
+    offset = len(JOURNAL_MAGIC)
+    header_size = FRAME_HEADER.size
+
+    while offset + header_size <= len(data):
+        length = FRAME_HEADER.unpack_from(data, offset)[0]
+        end = offset + header_size + length
+        if not length or end > len(data):
+            break
+
+        lst_record.append((offset, data[offset + header_size:end]))
+        offset = end
+
+    return lst_record, offset
+
+
+class GameJournal(object):
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self.file = None
+        self.game = None
+        self.turns = 0
+        self.pending = 0
+        self.sync_time = 0.0
+
+    def start(self, game=None):
+        """
+        Start a new journal for a game that is not started yet.
+        """
+
+        self.close()
+        self.file = open(self.path, "wb")
+        self.file.write(JOURNAL_MAGIC)
+
+        self.append(encode_payload({"type": "event", "event": "start", "table": "",
+                                    "players": [sheet.player_name for sheet in game.lst_sheet],
+                                    "game_turns": game.total_game_turns}))
+        self.sync()
+        self.attach(game)
+
+    def attach(self, game=None):
+        self.game = game
+        self.turns = 0
+        game.add_listener(self.game_event)
+
+    def append(self, payload=b""):
+        self.file.write(FRAME_HEADER.pack(len(payload)))
+        self.file.write(payload)
+        self.file.flush()
+        self.pending += 1
+
+        if self.pending >= FSYNC_RECORDS or time.time() - self.sync_time >= FSYNC_INTERVAL:
+            self.sync()
+
+    def sync(self):
+        if self.file is not None:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.pending = 0
+            self.sync_time = time.time()
+
+    def game_event(self, event="", data=None):
+
+        if self.file is None:
+            return
+
+        if event == "turn":
+            if self.turns % SNAPSHOT_TURNS == 0:
+                self.append(pack_snapshot(self.game))
+            self.turns += 1
+            return
+
+        if event == "finish":
+            self.clear()
+            return
+
+        if event != "checkout":
+            self.append(encode_payload(get_event_message(self.game, event, data)))
+
+    def resume(self):
+        """
+        :return: JambGame of the unfinished game of the journal or None, the journal goes on with it
+        """
+
+        result = read_records(self.path)
+        if result is None:
+            return None
+
+        lst_record, end_offset = result
+
+        # Last start, then last snapshot after it
+        start_index = None
+        snapshot_index = None
+        for i, (offset, payload) in enumerate(lst_record):
+            if payload[0] == RECORD_SNAPSHOT:
+                snapshot_index = i
+            elif payload[0] == EVENT_START:
+                start_index = i
+                snapshot_index = None
+
+        if start_index is None:
+            return None
+
+        message = decode_payload(lst_record[start_index][1])
+        game = JambGame(message["players"], message["game_turns"])
+        game.start()
+
+        replay_index = start_index + 1
+        if snapshot_index is not None:
+            unpack_snapshot(lst_record[snapshot_index][1], game)
+            replay_index = snapshot_index + 1
+
+        for offset, payload in lst_record[replay_index:]:
+            if payload[0] == RECORD_SNAPSHOT:
+                continue
+
+            try:
+                message = decode_payload(payload)
+            except ValueError:
+                message = None
+
+            if message is None or not game.apply_event(message.get("event"), message):
+                # The game goes on from the last good record, the bad one and the records after it are cut
+                end_offset = offset
+                break
+
+        if game.is_finished():
+            self.clear()
+            return None
+
+        # Go on after the last whole record
+        self.close()
+        self.file = open(self.path, "r+b")
+        self.file.truncate(end_offset)
+        self.file.seek(end_offset)
+        self.attach(game)
+
+        return game
+
+    def clear(self):
+        """
+        Remove the journal, the game is over.
+        """
+
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def close(self):
+        if self.file is not None:
+            self.sync()
+            self.file.close()
+            self.file = None
+
+        if self.game is not None:
+            self.game.remove_listener(self.game_event)
+            self.game = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Jamb game journal")
+    parser.add_argument("--path", default=DEFAULT_JOURNAL_PATH, help="journal file")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    journal = GameJournal(args.path)
+    game = journal.resume()
+    elapsed = time.perf_counter() - start_time
+    journal.close()
+
+    if game is None:
+        print("No game to resume")
+        return 0
+
+    print("Resumed in {0:.2f} ms, turn of {1}, {2} sheets not full".format(
+        elapsed * 1000, game.get_this_sheet().player_name, game.open_sheets))
+    for sheet in game.lst_sheet:
+        print("{0} = {1}".format(sheet.player_name, sheet.total))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
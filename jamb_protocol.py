@@ -0,0 +1,420 @@
+"""
+Binary wire protocol of jamb_server.
+
+Messages are the same dicts as the JSON messages documented in
+jamb_server, packed in a frame:
+
+    length (uint16, big endian) + message id (1 byte) + fields
+
+Fields use as few bytes as the game allows:
+
+    dice      6 x 3 bits (value - 1) in 3 bytes
+    held mask 6 bits in 1 byte, bit i is die i
+    cell      1 byte, col_id << 4 | row_id (DICT_COL_HEADER, DICT_ROW_HEADER)
+    scores    int16, texts are utf-8 with a 1 byte length
+
+A whole turn, client moves and server events (turn, rolls, holds, write),
+takes about 65 bytes against 700 with JSON lines. Run this module for the
+encode/decode benchmark against JSON, tests/test_protocol.py checks that
+both give the same messages.
+"""
+
+import sys
+import json
+import time
+import random
+import struct
+
+from jamb_rules import NUMBER_OF_DICE, NUMBER_OF_ROWS, NUMBER_OF_COLS
+
+FRAME_HEADER = struct.Struct("!H")
+
+# Message ids, client to server
+MSG_JOIN = 1
+MSG_START = 2
+MSG_ROLL = 3
+MSG_HOLD = 4
+MSG_ANNOUNCE = 5
+MSG_WRITE = 6
+MSG_LEAVE = 7
+
+# Message ids, server to client
+MSG_JOINED = 16
+MSG_ERROR = 17
+
+# Game events
+EVENT_START = 32
+EVENT_TURN = 33
+EVENT_ROLL = 34
+EVENT_HOLD = 35
+EVENT_ANNOUNCEMENT = 36
+EVENT_CHECKOUT = 37
+EVENT_WRITE = 38
+EVENT_FINISH = 39
+EVENT_CLOSED = 40
+
+DICT_MESSAGE_ID = {"join": MSG_JOIN, "start": MSG_START, "roll": MSG_ROLL, "hold": MSG_HOLD,
+                   "announce": MSG_ANNOUNCE, "write": MSG_WRITE, "leave": MSG_LEAVE,
+                   "joined": MSG_JOINED, "error": MSG_ERROR}
+
+DICT_EVENT_ID = {"start": EVENT_START, "turn": EVENT_TURN, "roll": EVENT_ROLL, "hold": EVENT_HOLD,
+                 "announcement": EVENT_ANNOUNCEMENT, "checkout": EVENT_CHECKOUT, "write": EVENT_WRITE,
+                 "finish": EVENT_FINISH, "closed": EVENT_CLOSED}
+
+DICT_EVENT_NAME = dict((event_id, event) for event, event_id in DICT_EVENT_ID.items())
+
+# Roll flag of the held byte: the roll message carries a held mask
+HELD_GIVEN = 0x80
+
+STRUCT_SCORE = struct.Struct("!h")
+STRUCT_WRITE = struct.Struct("!BBhh")
+
+
+def pack_dice(dices=()):
+    bits = 0
+    for i, dice_value in enumerate(dices):
+        bits |= (dice_value - 1) << (3 * i)
+    return bits.to_bytes(3, "big")
+
+
+def unpack_dice(data=b""):
+    bits = int.from_bytes(data, "big")
+    return [((bits >> (3 * i)) & 7) + 1 for i in range(NUMBER_OF_DICE)]
+
+
+def pack_held(held_mask=()):
+    bits = 0
+    for i, held in enumerate(held_mask):
+        if held:
+            bits |= 1 << i
+    return bits
+
+
+def unpack_held(bits=0):
+    return [bool(bits & (1 << i)) for i in range(NUMBER_OF_DICE)]
+
+
+def pack_cell(col_id=0, row_id=0):
+    if not 0 <= col_id < NUMBER_OF_COLS or not 0 <= row_id < NUMBER_OF_ROWS:
+        raise ValueError("Invalid cell: {0}, {1}".format(col_id, row_id))
+    return col_id << 4 | row_id
+
+
+def unpack_cell(cell=0):
+    return cell >> 4, cell & 15
+
+
+def pack_text(text=""):
+    data = "{0}".format(text).encode("utf-8")
+    if len(data) > 255:
+        raise ValueError("Text too long")
+    return bytes([len(data)]) + data
+
+
+def unpack_text(data=b"", offset=0):
+    """
+    :return: (text, offset after the text)
+    """
+
+    end = offset + 1 + data[offset]
+    if end > len(data):
+        raise ValueError("Text out of the message")
+    return data[offset + 1:end].decode("utf-8"), end
+
+
+def get_event_message(game=None, event="", data=None):
+    """
+    :return: message dict of a JambGame listener event, with the totals the protocol sends
+    """
+
+    message = {"type": "event", "event": event}
+    message.update(data)
+
+    if event == "write":
+        message["total"] = game.lst_sheet[data["player_index"]].total
+
+    elif event == "finish":
+        message["totals"] = [sheet.total for sheet in game.lst_sheet]
+
+    return message
+
+
+def encode_payload(message=None):
+    """
+    :param message: dict of a message or an event
+    :return: bytes of the message without the frame header
+    """
+
+    message_type = message["type"]
+
+    if message_type == "event":
+        event = message["event"]
+        event_id = DICT_EVENT_ID[event]
+
+        if event == "turn":
+            return bytes([event_id, message["player_index"]])
+
+        if event == "roll":
+            return bytes([event_id, message["roll_turn"]]) + pack_dice(message["dices"])
+
+        if event == "hold":
+            return bytes([event_id, pack_held(message["held"])])
+
+        if event in ["announcement", "checkout"]:
+            return bytes([event_id, message["player_index"], message["row_id"]])
+
+        if event == "write":
+            return bytes([event_id]) + STRUCT_WRITE.pack(message["player_index"],
+                                                         pack_cell(message["col_id"], message["row_id"]),
+                                                         message["value"], message["total"])
+
+        if event == "finish":
+            totals = message.get("totals", [])
+            return bytes([event_id, len(totals)]) + b"".join(STRUCT_SCORE.pack(total) for total in totals)
+
+        if event == "start":
+            players = message["players"]
+            return (bytes([event_id, message["game_turns"], message.get("seat", 0), len(players)]) +
+                    b"".join(pack_text(name) for name in players) + pack_text(message["table"]))
+
+        # closed
+        return bytes([event_id]) + pack_text(message.get("reason", "")) + pack_text(message.get("table", ""))
+
+    message_id = DICT_MESSAGE_ID[message_type]
+
+    if message_type == "join":
+        return (bytes([message_id, message.get("seats", 2)]) + pack_text(message.get("table", "")) +
+                pack_text(message.get("name", "")))
+
+    if message_type in ["roll", "hold"]:
+        held_mask = message.get("held")
+        if held_mask is None:
+            return bytes([message_id, 0])
+        return bytes([message_id, HELD_GIVEN | pack_held(held_mask)])
+
+    if message_type == "announce":
+        return bytes([message_id, message["row"]])
+
+    if message_type == "write":
+        return bytes([message_id, pack_cell(message["col"], message["row"])])
+
+    if message_type == "joined":
+        return bytes([message_id, message["seat"], message["seats"]]) + pack_text(message["table"])
+
+    if message_type == "error":
+        return bytes([message_id]) + pack_text(message["message"])
+
+    # start, leave
+    return bytes([message_id])
+
+
+def decode_payload(data=b""):
+    """
+    :return: dict of the message, raises ValueError on malformed data
+    """
+
+    try:
+        return _decode_payload(data)
+    except (IndexError, KeyError, struct.error) as error:
+        raise ValueError("Malformed message: {0}".format(error))
+
+
+def _decode_payload(data=b""):
+    message_id = data[0]
+
+    event = DICT_EVENT_NAME.get(message_id)
+    if event is not None:
+        message = {"type": "event", "event": event}
+
+        if event == "turn":
+            message["player_index"] = data[1]
+
+        elif event == "roll":
+            if len(data) < 5:
+                raise ValueError("Malformed message: short roll")
+            message["roll_turn"] = data[1]
+            message["dices"] = unpack_dice(data[2:5])
+
+        elif event == "hold":
+            message["held"] = unpack_held(data[1])
+
+        elif event in ["announcement", "checkout"]:
+            message["player_index"] = data[1]
+            message["row_id"] = data[2]
+
+        elif event == "write":
+            player_index, cell, value, total = STRUCT_WRITE.unpack_from(data, 1)
+            message["player_index"] = player_index
+            message["col_id"], message["row_id"] = unpack_cell(cell)
+            message["value"] = value
+            message["total"] = total
+
+        elif event == "finish":
+            message["totals"] = [STRUCT_SCORE.unpack_from(data, 2 + 2 * i)[0] for i in range(data[1])]
+
+        elif event == "start":
+            message["game_turns"] = data[1]
+            message["seat"] = data[2]
+            offset = 4
+            players = []
+            for i in range(data[3]):
+                name, offset = unpack_text(data, offset)
+                players.append(name)
+            message["players"] = players
+            message["table"], offset = unpack_text(data, offset)
+
+        else:
+            message["reason"], offset = unpack_text(data, 1)
+            message["table"], offset = unpack_text(data, offset)
+
+        return message
+
+    if message_id == MSG_JOIN:
+        table, offset = unpack_text(data, 2)
+        name, offset = unpack_text(data, offset)
+        return {"type": "join", "seats": data[1], "table": table, "name": name}
+
+    if message_id in [MSG_ROLL, MSG_HOLD]:
+        message = {"type": "roll" if message_id == MSG_ROLL else "hold"}
+        if data[1] & HELD_GIVEN:
+            message["held"] = unpack_held(data[1])
+        return message
+
+    if message_id == MSG_ANNOUNCE:
+        return {"type": "announce", "row": data[1]}
+
+    if message_id == MSG_WRITE:
+        col_id, row_id = unpack_cell(data[1])
+        return {"type": "write", "col": col_id, "row": row_id}
+
+    if message_id == MSG_JOINED:
+        return {"type": "joined", "seat": data[1], "seats": data[2], "table": unpack_text(data, 3)[0]}
+
+    if message_id == MSG_ERROR:
+        return {"type": "error", "message": unpack_text(data, 1)[0]}
+
+    if message_id == MSG_START:
+        return {"type": "start"}
+
+    if message_id == MSG_LEAVE:
+        return {"type": "leave"}
+
+    raise ValueError("Unknown message id: {0}".format(message_id))
+
+
+def encode_message(message=None):
+    """
+    :return: frame of the message, length prefix included
+    """
+
+    payload = encode_payload(message)
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+def decode_message(frame=b""):
+    """
+    :param frame: one whole frame, length prefix included
+    """
+
+    if len(frame) < FRAME_HEADER.size or FRAME_HEADER.unpack_from(frame)[0] != len(frame) - FRAME_HEADER.size:
+        raise ValueError("Invalid frame")
+
+    return decode_payload(frame[FRAME_HEADER.size:])
+
+
+async def read_message(reader=None):
+    """
+    :param reader: asyncio.StreamReader
+    :return: dict of the next message, None at the end of the stream
+    """
+
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+        length = FRAME_HEADER.unpack(header)[0]
+        if not length:
+            raise ValueError("Empty frame")
+        payload = await reader.readexactly(length)
+    except EOFError:
+        return None
+
+    return decode_payload(payload)
+
+
+def get_sample_messages(games=10, seed=0):
+    """
+    :return: list of the messages of whole 2 player games, played by the greedy strategy
+    """
+
+    from jamb_game import JambGame
+    from jamb_random import DiceRandom
+    from jamb_strategy import get_strategy, choose_action
+
+    rng = random.Random(seed)
+    strategy = get_strategy("greedy", rng)
+    lst_message = []
+
+    for i in range(games):
+        game = JambGame(["Ana", "Bob"], rng=DiceRandom(rng.random()))
+
+        def listener(event="", data=None):
+            lst_message.append(get_event_message(game, event, data))
+
+        game.add_listener(listener)
+        lst_message.append({"type": "event", "event": "start", "table": "table-{0}".format(i),
+                            "players": ["Ana", "Bob"], "seat": 0, "game_turns": game.total_game_turns})
+        game.start()
+
+        while not game.is_finished():
+            action = choose_action(game, strategy)
+            if action[0] == "roll":
+                lst_message.append({"type": "roll", "held": list(action[1])} if action[1] else {"type": "roll"})
+                if action[1] is not None:
+                    game.set_held_mask(action[1])
+                game.roll()
+            elif action[0] == "announce":
+                lst_message.append({"type": "announce", "row": action[1]})
+                game.announce(action[1])
+            else:
+                lst_message.append({"type": "write", "col": action[1], "row": action[2]})
+                game.write(action[1], action[2])
+
+    return lst_message
+
+
+def encode_json(message=None):
+    return json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def decode_json(line=b""):
+    return json.loads(line.decode("utf-8"))
+
+
+def benchmark(repeat=20):
+    lst_message = get_sample_messages()
+    turns = sum(1 for message in lst_message if message.get("event") == "turn")
+
+    print("{0} messages, {1} turns".format(len(lst_message), turns))
+    print("{0:<8}{1:>12}{2:>12}{3:>14}{4:>14}".format("", "bytes", "bytes/turn", "encode us/msg", "decode us/msg"))
+
+    for name, encode, decode in [("json", encode_json, decode_json), ("binary", encode_message, decode_message)]:
+        lst_data = [encode(message) for message in lst_message]
+        size = sum(len(data) for data in lst_data)
+
+        start_time = time.perf_counter()
+        for i in range(repeat):
+            for message in lst_message:
+                encode(message)
+        encode_time = (time.perf_counter() - start_time) / (repeat * len(lst_message))
+
+        start_time = time.perf_counter()
+        for i in range(repeat):
+            for data in lst_data:
+                decode(data)
+        decode_time = (time.perf_counter() - start_time) / (repeat * len(lst_message))
+
+        print("{0:<8}{1:>12}{2:>12.1f}{3:>14.2f}{4:>14.2f}".format(name, size, size / float(turns),
+                                                                 encode_time * 1e6, decode_time * 1e6))
+
+
+if __name__ == "__main__":
+    sys.exit(benchmark())
@@ -0,0 +1,79 @@
+"""
+Seedable dice random generator, one per game.
+
+    rng = DiceRandom(seed=42)
+    dices = rng.roll(dices, held)       # new values for the dice that are not held
+    batch = rng.roll_batch(100000)      # (100000, NUMBER_OF_DICE) int8 array, needs numpy
+
+Game dice come from the game stream only, so the same seed plays the
+same dice. Animation frames draw from the cosmetic stream and never
+change the game stream.
+"""
+
+import random
+
+from jamb_rules import NUMBER_OF_DICE
+
+LST_FACE = [1, 2, 3, 4, 5, 6]
+
+
+class DiceRandom(object):
+
+    __slots__ = ("seed", "random", "cosmetic")
+
+    def __init__(self, seed=None):
+        """
+        :param seed: int or str, None seeds from the system
+        """
+
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.cosmetic = random.Random(None if seed is None else "{0}-cosmetic".format(seed))
+
+    def roll_dices(self, count=NUMBER_OF_DICE):
+        """
+        :return: list of count dice values from the game stream
+        """
+
+        return self.random.choices(LST_FACE, k=count)
+
+    def roll(self, dices=(), held=()):
+        """
+        :param dices: current dice values
+        :param held: held mask, held dice keep their value
+        :return: list of dice values, the dice that are not held drawn in one call
+        """
+
+        lst_index = [i for i in range(len(dices)) if not (i < len(held) and held[i])]
+        lst_dices = list(dices)
+
+        for i, dice_value in zip(lst_index, self.roll_dices(len(lst_index))):
+            lst_dices[i] = dice_value
+
+        return lst_dices
+
+    def roll_batch(self, rolls=1, count=NUMBER_OF_DICE):
+        """
+        Many rolls in one vectorized call, for simulations. The numpy generator
+        is seeded from the game stream so the batch is reproducible too.
+
+        :return: (rolls, count) int8 numpy array of dice values
+        """
+
+        import numpy as np
+
+        generator = np.random.default_rng(self.random.getrandbits(128))
+        return generator.integers(1, 7, size=(rolls, count), dtype=np.int8)
+
+    def cosmetic_dice(self):
+        """
+        :return: dice value for an animation frame
+        """
+
+        return self.cosmetic.choice(LST_FACE)
+
+    def getstate(self):
+        return self.random.getstate()
+
+    def setstate(self, state=None):
+        self.random.setstate(state)
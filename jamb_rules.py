@@ -0,0 +1,271 @@
+"""
+Jamb game rules without any Qt dependency.
+
+Rows of the player table (DICT_ROW_HEADER):
+    [0..5] = "1".."6"
+    [6] = "Max"
+    [7] = "Min"
+    [8] = "Trilling"
+    [9] = "Full House"
+    [10] = "Straight"
+    [11] = "Poker"
+    [12] = "Jamb"
+"""
+
+HAND_TURNS = 3
+LAST_TURN_EXTRA_ROLLS = 2
+# Rounds of a game, 0 plays until every sheet is full. A round limit is a house rule.
+# The last turn gets LAST_TURN_EXTRA_ROLLS more rolls: the last round of a round limit,
+# else the turn of the last empty cell of a sheet.
+TOTAL_GAME_TURNS = 0
+BONUS_THRESHOLD = 60
+BONUS_VALUE = 30
+NUMBER_OF_DICE = 6
+NUMBER_OF_ROWS = 13
+NUMBER_OF_COLS = 6
+
+DICT_ROW_HEADER = {}
+for i in range(6):
+    DICT_ROW_HEADER[i] = "{0}".format(i+1)
+
+DICT_ROW_HEADER[6] = "Max"
+DICT_ROW_HEADER[7] = "Min"
+DICT_ROW_HEADER[8] = "Trilling"
+DICT_ROW_HEADER[9] = "Full House"
+DICT_ROW_HEADER[10] = "Straight"
+DICT_ROW_HEADER[11] = "Poker"
+DICT_ROW_HEADER[12] = "Jamb"
+
+DICT_COL_HEADER = {}
+DICT_COL_HEADER[0] = "Free"
+DICT_COL_HEADER[1] = "Up"
+DICT_COL_HEADER[2] = "Down"
+DICT_COL_HEADER[3] = "Max/Min"
+DICT_COL_HEADER[4] = "Announcement"
+DICT_COL_HEADER[5] = "Checkout"
+
+COL_FREE = 0
+COL_UP = 1
+COL_DOWN = 2
+COL_MAX_MIN = 3
+COL_ANNOUNCEMENT = 4
+COL_CHECKOUT = 5
+
+ROW_MAX = 6
+ROW_MIN = 7
+ROW_TRILLING = 8
+ROW_FULL_HOUSE = 9
+ROW_STRAIGHT = 10
+ROW_POKER = 11
+ROW_JAMB = 12
+
+
+def count_dice(dice=()):
+    """
+    :param dice: iterable of dice values
+    :return: list of 7 counters, index is dice value (index 0 is unused)
+    """
+
+    lst_count = [0] * 7
+    for dice_value in dice:
+        if dice_value < 1 or dice_value > 6:
+            raise ValueError("Invalid dice value: {0}".format(dice_value))
+        lst_count[dice_value] += 1
+
+    return lst_count
+
+
+def score_dice(dice=()):
+    """
+    Score one roll for every row of the player table.
+
+    :param dice: tuple of NUMBER_OF_DICE dice values (1-6)
+    :return: list of NUMBER_OF_ROWS scores, index is row id from DICT_ROW_HEADER
+    """
+
+    lst_count = count_dice(dice)
+    lst_score = [0] * NUMBER_OF_ROWS
+
+    for dice_value in range(1, 7):
+        dice_count = lst_count[dice_value]
+        if not dice_count:
+            continue
+
+        value = dice_count * dice_value
+        lst_score[dice_value - 1] = value
+
+        if dice_count >= 3:  # Trilling
+            lst_score[ROW_TRILLING] = value + 30
+
+            for dice_other in range(1, 7):
+                if dice_other != dice_value and lst_count[dice_other] == 2:  # Full House
+                    lst_score[ROW_FULL_HOUSE] = value + dice_other * 2 + 40
+
+            if dice_count >= 4:  # Poker
+                lst_score[ROW_POKER] = value + 50
+
+                if dice_count >= 5:  # Low jamb
+                    jamb_value = value + 60
+                    if dice_value == 1:
+                        jamb_value = 100
+
+                    if dice_count == 6:  # Height jamb
+                        jamb_value = 150 if dice_value == 1 else 100
+
+                    lst_score[ROW_JAMB] = jamb_value
+
+    lst_dice = sorted(dice)
+    lst_score[ROW_MAX] = sum(lst_dice)
+    lst_score[ROW_MIN] = sum(lst_dice[:-1])
+
+    set_dice = set(lst_dice)
+    if len(set_dice) >= NUMBER_OF_DICE - 1:  # Low or Middle Kenta
+        value = 0
+
+        if len(set_dice & set([1, 2, 3, 4, 5])) == 5:
+            value = 45
+
+        if len(set_dice & set([2, 3, 4, 5, 6])) == 5:
+            value = 50
+
+        if len(set_dice) == NUMBER_OF_DICE:  # Height Kenta
+            value = 100
+
+        if value:
+            lst_score[ROW_STRAIGHT] = value
+
+    return lst_score
+
+
+def get_sign_dict(dice=()):
+    """
+    Same result as the old DicesTableWdg.get_sign_dict(): sign index is row id + 1.
+
+    :param dice: tuple of NUMBER_OF_DICE dice values (1-6)
+    :return: dict {sign_index: value}
+    """
+
+    dict_result = {0: 0}
+    for row_id, value in enumerate(score_dice(dice)):
+        dict_result[row_id + 1] = value
+
+    return dict_result
+
+
+class HouseRules(object):
+    """
+    Tunable rules of a game, the defaults are the rules of the app.
+    """
+
+    __slots__ = ("hand_turns", "last_turn_extra_rolls", "bonus_threshold", "bonus_value")
+
+    def __init__(self, hand_turns=HAND_TURNS, last_turn_extra_rolls=LAST_TURN_EXTRA_ROLLS,
+                 bonus_threshold=BONUS_THRESHOLD, bonus_value=BONUS_VALUE):
+        self.hand_turns = hand_turns
+        self.last_turn_extra_rolls = last_turn_extra_rolls
+        self.bonus_threshold = bonus_threshold
+        self.bonus_value = bonus_value
+
+    def get_total_roll_turns(self, last_turn=False):
+        """
+        :param last_turn: True for the last turn of the player, see JambGame.is_last_turn()
+        """
+        return self.hand_turns + self.last_turn_extra_rolls if last_turn else self.hand_turns
+
+
+DEFAULT_RULES = HouseRules()
+
+
+def get_column_total_from_parts(numbers_sum=0, signs_sum=0, ones=0, max_value=0, min_value=0,
+                                bonus_threshold=BONUS_THRESHOLD, bonus_value=BONUS_VALUE):
+    """
+    Total of one column from its running sums, see get_column_total().
+    """
+
+    total_col = numbers_sum
+
+    # Bonus +30
+    if total_col >= bonus_threshold:
+        total_col += bonus_value
+
+    # Min Max sub
+    if min_value > 0:
+        total_col += (max_value - min_value) * ones
+
+    # Signs totals
+    return total_col + signs_sum
+
+
+def get_column_total(lst_value=()):
+    """
+    Total of one column of the player table, unassigned cells are 0.
+
+    :param lst_value: NUMBER_OF_ROWS values, index is row id
+    :return: int
+    """
+
+    return get_column_total_from_parts(sum(lst_value[0:6]), sum(lst_value[ROW_TRILLING:]),
+                                       lst_value[0], lst_value[ROW_MAX], lst_value[ROW_MIN])
+
+
+# Rows 0..6 of the Max/Min column are written up from Max, rows 7..12 down from Min
+FULL_ROW_MASK = (1 << NUMBER_OF_ROWS) - 1
+MAX_MIN_UP_MASK = (1 << ROW_MIN) - 1
+MAX_MIN_DOWN_MASK = FULL_ROW_MASK & ~MAX_MIN_UP_MASK
+
+
+def get_open_mask(col_id=0, filled_mask=0):
+    """
+    Cells that can be written in a column. Free and Announcement take any empty cell. The other
+    columns are written in order: Up from the bottom row to the top, Down from the top row to the
+    bottom, Max/Min up from Max to the top and down from Min to the bottom. Their next cell is the
+    one after the last written cell of the direction.
+
+    :param col_id: column id from DICT_COL_HEADER
+    :param filled_mask: bit row_id is set if the cell is assigned
+    :return: mask, bit row_id is set if the cell can be written
+    """
+
+    if col_id in [COL_FREE, COL_ANNOUNCEMENT]:  # Free and Announcement column
+        return ~filled_mask & FULL_ROW_MASK
+
+    if col_id == COL_UP:  # Cursor above the highest written row (the lowest bit)
+        return (filled_mask & -filled_mask) >> 1 if filled_mask else 1 << (NUMBER_OF_ROWS - 1)
+
+    if col_id == COL_DOWN:  # Cursor below the lowest written row (the highest bit)
+        return (1 << filled_mask.bit_length()) & FULL_ROW_MASK
+
+    if col_id == COL_MAX_MIN:
+        up_mask = filled_mask & MAX_MIN_UP_MASK
+        down_mask = filled_mask & MAX_MIN_DOWN_MASK
+        open_mask = (up_mask & -up_mask) >> 1 if up_mask else 1 << ROW_MAX
+        open_mask |= (1 << down_mask.bit_length()) & FULL_ROW_MASK if down_mask else 1 << ROW_MIN
+        return open_mask
+
+    return 0
+
+
+def get_mask_rows(mask=0):
+    """
+    :return: list of the row ids set in the mask
+    """
+
+    lst_row = []
+    row_id = 0
+    while mask:
+        if mask & 1:
+            lst_row.append(row_id)
+        mask >>= 1
+        row_id += 1
+
+    return lst_row
+
+
+def get_open_rows(col_id=0, filled_mask=0):
+    """
+    Rows that can be written in a column, see get_open_mask().
+
+    :return: list of row ids
+    """
+
+    return get_mask_rows(get_open_mask(col_id, filled_mask))
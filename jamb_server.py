@@ -0,0 +1,361 @@
+"""
+Jamb multiplayer server: many tables in one asyncio process.
+
+    python jamb_server.py --port 8765
+
+Messages are dicts sent as jamb_protocol binary frames. Client messages:
+
+    {"type": "join", "table": "t1", "name": "Ana", "seats": 2}
+    {"type": "start"}                               start before the table is full
+    {"type": "roll", "held": [true, false, ...]}    "held" is optional
+    {"type": "hold", "held": [true, false, ...]}
+    {"type": "announce", "row": 12}
+    {"type": "write", "col": 0, "row": 5}
+    {"type": "leave"}
+
+Server messages are {"type": "joined", ...}, {"type": "error", ...} and
+the game events of the table, {"type": "event", "event": ...}: "start",
+"turn", "roll", "hold", "announcement", "checkout", "write", "finish" and
+"closed". The "start" event gives every client its final seat, the seat
+of "joined" changes when a client leaves before the start.
+
+The game is played by JambGame on the server, it rolls the dice and
+checks every move, only the current player can play.
+"""
+
+import sys
+import asyncio
+import argparse
+
+from jamb_rules import TOTAL_GAME_TURNS
+from jamb_game import JambGame
+from jamb_random import DiceRandom
+from jamb_protocol import get_event_message, encode_message, read_message
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Seats are sent as one byte by jamb_protocol
+MAXIMUM_TABLE_PLAYERS = 64
+# Names and table ids are jamb_protocol texts of at most 255 bytes, with room for the messages around them
+MAXIMUM_NAME_BYTES = 200
+# Rounds of a game are sent as one byte too, 0 plays until the sheets are full
+MAXIMUM_TABLE_GAME_TURNS = 255
+
+# Clients that do not read their events are dropped instead of growing the buffers
+MAXIMUM_WRITE_BUFFER = 1 << 20
+
+
+def get_game_turns(text=""):
+    """
+    argparse type of --game-turns.
+    """
+
+    try:
+        game_turns = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid int value: {0}".format(text))
+
+    if not 0 <= game_turns <= MAXIMUM_TABLE_GAME_TURNS:
+        raise argparse.ArgumentTypeError("must be between 0 and {0}".format(MAXIMUM_TABLE_GAME_TURNS))
+
+    return game_turns
+
+
+class ClientConnection(object):
+
+    __slots__ = ("writer", "name", "table", "seat")
+
+    def __init__(self, writer=None):
+        self.writer = writer
+        self.name = ""
+        self.table = None
+        self.seat = -1
+
+    def send(self, data=b""):
+        if self.writer.is_closing():
+            return
+
+        if self.writer.transport.get_write_buffer_size() > MAXIMUM_WRITE_BUFFER:
+            self.writer.close()
+            return
+
+        self.writer.write(data)
+
+
+class JambTable(object):
+    """
+    One game and the clients seated at it, game events are encoded once and sent to every client.
+    """
+
+    def __init__(self, table_id="", seats=2, total_game_turns=TOTAL_GAME_TURNS, rng=None):
+        self.table_id = table_id
+        self.seats = seats
+        self.total_game_turns = total_game_turns
+        self.rng = rng
+        self.lst_client = []
+        self.game = None
+
+    def is_full(self):
+        return len(self.lst_client) >= self.seats
+
+    def is_started(self):
+        return self.game is not None
+
+    def broadcast(self, message=None):
+        data = encode_message(message)
+        for client in self.lst_client:
+            client.send(data)
+
+    def add_client(self, client=None):
+        client.table = self
+        client.seat = len(self.lst_client)
+        self.lst_client.append(client)
+
+    def remove_client(self, client=None):
+        if client not in self.lst_client:
+            return
+
+        self.lst_client.remove(client)
+        client.table = None
+        client.seat = -1
+
+        # A game cannot go on without one of its players, the others leave the table too
+        if self.is_started():
+            if not self.game.is_finished():
+                try:
+                    self.broadcast({"type": "event", "event": "closed", "table": self.table_id,
+                                    "reason": "{0} left".format(client.name)})
+                except ValueError:
+                    # The table is closed anyway, the others are told by the end of their game
+                    pass
+
+            self.game.remove_listener(self.game_event)
+            for other in self.lst_client:
+                other.table = None
+                other.seat = -1
+            self.lst_client = []
+            return
+
+        # Seats follow the order of the clients, the game plays them by player index
+        for seat, other in enumerate(self.lst_client):
+            other.seat = seat
+
+    def start(self):
+        lst_player_name = [client.name for client in self.lst_client]
+        self.game = JambGame(lst_player_name, self.total_game_turns, rng=self.rng)
+        self.game.add_listener(self.game_event)
+
+        for seat, client in enumerate(self.lst_client):
+            client.seat = seat
+            client.send(encode_message({"type": "event", "event": "start", "table": self.table_id,
+                                        "players": lst_player_name, "seat": seat,
+                                        "game_turns": self.total_game_turns}))
+        self.game.start()
+
+    def game_event(self, event="", data=None):
+        self.broadcast(get_event_message(self.game, event, data))
+
+    def play(self, client=None, message=None):
+        """
+        Same moves as DeckWdg.clicked_btnRoll, dice_held, clicked_btnAnnouncement and clicked_write.
+
+        :return: error text or None
+        """
+
+        game = self.game
+        if game is None:
+            return "Game is not started"
+
+        if game.is_finished():
+            return "Game is finished"
+
+        if client.seat != game.player_index:
+            return "Not your turn"
+
+        message_type = message.get("type")
+
+        if message_type in ["roll", "hold"]:
+            held_mask = message.get("held")
+            if held_mask is not None:
+                if not isinstance(held_mask, list) or len(held_mask) != len(game.dices):
+                    return "Invalid held mask"
+                if not game.set_held_mask(held_mask):
+                    return "Roll before holding dice"
+
+            if message_type == "roll" and game.roll() is None:
+                return "No rolls left"
+
+        elif message_type == "announce":
+            row_id = message.get("row")
+            if not isinstance(row_id, int) or not game.announce(row_id):
+                return "Cannot announce this row"
+
+        elif message_type == "write":
+            col_id = message.get("col")
+            row_id = message.get("row")
+            if not isinstance(col_id, int) or not isinstance(row_id, int) or not game.write(col_id, row_id):
+                return "Cannot write this cell"
+
+        else:
+            return "Unknown message: {0}".format(message_type)
+
+        return None
+
+
+class JambServer(object):
+
+    def __init__(self, total_game_turns=TOTAL_GAME_TURNS, seed=None):
+
+        if not 0 <= total_game_turns <= MAXIMUM_TABLE_GAME_TURNS:
+            raise ValueError("Game turns must be between 0 and {0}".format(MAXIMUM_TABLE_GAME_TURNS))
+
+        self.total_game_turns = total_game_turns
+        self.seed = seed
+        self.dict_table = {}
+        self.server = None
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.server = await asyncio.start_server(self.handle_client, host, port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+
+    def get_table(self, table_id="", seats=2):
+        table = self.dict_table.get(table_id)
+
+        if table is None or table.is_started():
+            if table is not None and table.lst_client:
+                return None
+
+            rng = DiceRandom(None if self.seed is None else "{0}-{1}".format(self.seed, table_id))
+            table = JambTable(table_id, seats, self.total_game_turns, rng)
+            self.dict_table[table_id] = table
+
+        return table
+
+    def join(self, client=None, message=None):
+        """
+        :return: error text or None
+        """
+
+        if client.table is not None:
+            return "Already at a table"
+
+        try:
+            seats = int(message.get("seats", 2))
+        except (TypeError, ValueError):
+            return "Invalid seats"
+
+        if not 1 <= seats <= MAXIMUM_TABLE_PLAYERS:
+            return "Seats must be between 1 and {0}".format(MAXIMUM_TABLE_PLAYERS)
+
+        table_id = "{0}".format(message.get("table", ""))
+        if len(table_id.encode("utf-8")) > MAXIMUM_NAME_BYTES:
+            return "Table id is longer than {0} bytes".format(MAXIMUM_NAME_BYTES)
+
+        name = "{0}".format(message.get("name") or "")
+        if len(name.encode("utf-8")) > MAXIMUM_NAME_BYTES:
+            return "Name is longer than {0} bytes".format(MAXIMUM_NAME_BYTES)
+
+        table = self.get_table(table_id, seats)
+        if table is None or table.is_full():
+            return "Table {0} is playing".format(table_id)
+
+        client.name = name or "Player {0}".format(len(table.lst_client) + 1)
+        table.add_client(client)
+        client.send(encode_message({"type": "joined", "table": table_id, "seat": client.seat,
+                                    "seats": table.seats}))
+
+        if table.is_full():
+            table.start()
+
+        return None
+
+    def leave(self, client=None):
+        table = client.table
+        if table is None:
+            return
+
+        table.remove_client(client)
+        if not table.lst_client and self.dict_table.get(table.table_id) is table:
+            del self.dict_table[table.table_id]
+
+    def handle_message(self, client=None, message=None):
+        message_type = message.get("type")
+
+        if message_type == "join":
+            return self.join(client, message)
+
+        if client.table is None:
+            return "Join a table first"
+
+        if message_type == "leave":
+            self.leave(client)
+            return None
+
+        if message_type == "start":
+            if client.table.is_started():
+                return "Game is started"
+            client.table.start()
+            return None
+
+        return client.table.play(client, message)
+
+    async def handle_client(self, reader=None, writer=None):
+        client = ClientConnection(writer)
+
+        try:
+            while True:
+                try:
+                    message = await read_message(reader)
+                except ValueError:
+                    client.send(encode_message({"type": "error", "message": "Invalid message"}))
+                    continue
+
+                if message is None:
+                    break
+
+                error = self.handle_message(client, message)
+
+                if error is not None:
+                    client.send(encode_message({"type": "error", "message": error}))
+
+                await writer.drain()
+
+        except ConnectionError:
+            pass
+
+        finally:
+            self.leave(client)
+            writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Jamb multiplayer server")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port to listen on")
+    parser.add_argument("--game-turns", type=get_game_turns, default=TOTAL_GAME_TURNS,
+                        help="rounds of a game, 0 plays until the sheets are full")
+    parser.add_argument("--seed", default=None, help="seed of the dice of every table")
+    args = parser.parse_args()
+
+    async def run():
+        server = JambServer(args.game_turns, args.seed)
+        host, port = await server.start(args.host, args.port)
+        print("Jamb server on {0}:{1}".format(host, port))
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,291 @@
+"""
+Whole sheet solver for bot players.
+
+The value of a player sheet is split by column: V(col, filled_mask) is the
+expected score still to come from the open cells of one column when every
+remaining turn of that column is played optimally (HAND_TURNS rolls, hold
+solver from jamb_solver). With 13 rows a column has at most 2^13 fill
+masks, so all the column values fit in one small file:
+
+    header (8 bytes) + 6 columns * 8192 doubles, NaN = not computed yet
+
+The file is memory-mapped and filled lazily, or all at once with:
+
+    python jamb_sheet_solver.py --precompute
+
+The lazy fill of an empty file takes minutes, far beyond the BOT_MOVE_BUDGET
+of a move in Jumb.py: the bots of the app play quick moves until the file is
+filled, run --precompute before playing with "solver" bots. A missing file
+is created under a temporary name and renamed, processes that share the
+file never see it truncated.
+
+Cells are valued with the row scores (Min against MIN_ROW_REFERENCE like the
+hold solver). The real bonus progress (60 -> +30, (Max - Min) * ones) is
+added when a cell is chosen, from the column totals of the actual sheet.
+The Checkout column is only written when an opponent forces it and has no
+value of its own.
+"""
+
+import os
+import sys
+import mmap
+import time
+import argparse
+import tempfile
+
+from jamb_rules import HAND_TURNS, NUMBER_OF_ROWS, DICT_COL_HEADER, COL_ANNOUNCEMENT, COL_CHECKOUT, get_column_total, \
+    get_open_rows
+from jamb_table import NUMBER_OF_MULTISETS, DICT_MULTISET_INDEX, get_score_table
+from jamb_solver import DICT_KEPT_INDEX, get_transitions, get_sub_kept, get_row_value, solve_turn, get_turn_expect, \
+    suggest_hold
+
+VALUE_FILE_MAGIC = b"JAMBV001"
+NUMBER_OF_MASKS = 1 << NUMBER_OF_ROWS
+FULL_MASK = NUMBER_OF_MASKS - 1
+
+# Rolls left after the first roll of an announced turn
+ANNOUNCEMENT_ROLLS = HAND_TURNS - 1
+
+DEFAULT_VALUE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "jamb_values.bin")
+
+
+class StateValueStore(object):
+    """
+    Memory-mapped table of column values, indexed by (col_id, filled_mask).
+    """
+
+    def __init__(self, path=DEFAULT_VALUE_PATH):
+        self.path = path
+        self.value_count = len(DICT_COL_HEADER) * NUMBER_OF_MASKS
+        size = len(VALUE_FILE_MAGIC) + self.value_count * 8
+
+        if not os.path.exists(path) or os.path.getsize(path) != size or not self.check_magic(path):
+            self.create_file(path)
+
+        self.file = open(path, "r+b")
+        self.mmap = mmap.mmap(self.file.fileno(), size)
+        self.values = memoryview(self.mmap)[len(VALUE_FILE_MAGIC):].cast("d")
+
+    @staticmethod
+    def check_magic(path=""):
+        with open(path, "rb") as file_:
+            return file_.read(len(VALUE_FILE_MAGIC)) == VALUE_FILE_MAGIC
+
+    def create_file(self, path=""):
+        """
+        Write an empty table next to path and rename it, another process can have the old file mapped.
+        """
+
+        nan = memoryview(bytearray(8)).cast("d")
+        nan[0] = float("nan")
+        chunk = nan.tobytes() * NUMBER_OF_MASKS
+
+        handle, temp_path = tempfile.mkstemp(prefix=os.path.basename(path), dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            with os.fdopen(handle, "wb") as file_:
+                file_.write(VALUE_FILE_MAGIC)
+                for col_id in DICT_COL_HEADER:
+                    file_.write(chunk)
+            os.replace(temp_path, path)
+        except OSError:
+            os.remove(temp_path)
+            raise
+
+    def get(self, col_id=0, filled_mask=0):
+        value = self.values[col_id * NUMBER_OF_MASKS + filled_mask]
+        return None if value != value else value
+
+    def set(self, col_id=0, filled_mask=0, value=0.0):
+        self.values[col_id * NUMBER_OF_MASKS + filled_mask] = value
+
+    def flush(self):
+        self.mmap.flush()
+
+    def close(self):
+        self.values.release()
+        self.mmap.close()
+        self.file.close()
+
+
+class SheetSolver(object):
+
+    def __init__(self, store=None):
+        self.store = store if store is not None else StateValueStore()
+        self.lst_announcement_value = None
+
+    def get_first_roll(self):
+        return get_transitions()[DICT_KEPT_INDEX[()]]
+
+    def get_announcement_values(self):
+        """
+        :return: list indexed by row id of lists indexed by multiset index:
+                 expected row value when the row is announced after the first roll
+        """
+
+        if self.lst_announcement_value is None:
+            score_table = get_score_table()
+            lst_sub_kept = get_sub_kept()
+            lst_announcement_value = []
+
+            for row_id in range(NUMBER_OF_ROWS):
+                lst_terminal = [get_row_value(row_id, score_table[multiset_index * NUMBER_OF_ROWS + row_id])
+                                for multiset_index in range(NUMBER_OF_MULTISETS)]
+                lst_expect = solve_turn(lst_terminal, ANNOUNCEMENT_ROLLS)
+                lst_announcement_value.append([max(lst_expect[kept_index] for kept_index in lst_kept)
+                                               for lst_kept in lst_sub_kept])
+
+            self.lst_announcement_value = lst_announcement_value
+
+        return self.lst_announcement_value
+
+    def get_column_value(self, col_id=0, filled_mask=0):
+        """
+        :return: expected score of the open cells of the column
+        """
+
+        value = self.store.get(col_id, filled_mask)
+        if value is not None:
+            return value
+
+        lst_open = get_open_rows(col_id, filled_mask)
+
+        if col_id == COL_CHECKOUT or not lst_open:
+            value = 0.0
+        else:
+            lst_next = [(row_id, self.get_column_value(col_id, filled_mask | (1 << row_id))) for row_id in lst_open]
+
+            if col_id == COL_ANNOUNCEMENT:
+                lst_announcement_value = self.get_announcement_values()
+                value = 0.0
+                for multiset_index, probability in self.get_first_roll():
+                    value += probability * max(lst_announcement_value[row_id][multiset_index] + next_value
+                                               for row_id, next_value in lst_next)
+            else:
+                score_table = get_score_table()
+                lst_terminal = []
+                for multiset_index in range(NUMBER_OF_MULTISETS):
+                    start = multiset_index * NUMBER_OF_ROWS
+                    lst_terminal.append(max(get_row_value(row_id, score_table[start + row_id]) + next_value
+                                            for row_id, next_value in lst_next))
+
+                value = solve_turn(lst_terminal, HAND_TURNS)[DICT_KEPT_INDEX[()]]
+
+        self.store.set(col_id, filled_mask, value)
+        return value
+
+    def get_cell_gain(self, lst_values=(), lst_filled=(), col_id=0, row_id=0, score=0):
+        """
+        :param lst_values: 6 lists of NUMBER_OF_ROWS cell values of the sheet
+        :param lst_filled: 6 filled masks of the sheet
+        :return: column total change plus change of the column value when score is written to the cell
+        """
+
+        lst_col = lst_values[col_id]
+        lst_new = list(lst_col)
+        lst_new[row_id] = score
+
+        filled_mask = lst_filled[col_id]
+        return (get_column_total(lst_new) - get_column_total(lst_col) +
+                self.get_column_value(col_id, filled_mask | (1 << row_id)) -
+                self.get_column_value(col_id, filled_mask))
+
+    def get_terminal(self, lst_values=(), lst_filled=(), open_cells=()):
+        """
+        :return: list of NUMBER_OF_MULTISETS values, gain of the best open cell for each multiset
+        """
+
+        score_table = get_score_table()
+        lst_terminal = []
+        for multiset_index in range(NUMBER_OF_MULTISETS):
+            start = multiset_index * NUMBER_OF_ROWS
+            lst_terminal.append(max(self.get_cell_gain(lst_values, lst_filled, col_id, row_id,
+                                                       score_table[start + row_id])
+                                    for col_id, row_id in open_cells))
+
+        return lst_terminal
+
+    def choose_cell(self, dice=(), lst_values=(), lst_filled=(), open_cells=()):
+        """
+        :return: ((col_id, row_id), gain) of the best open cell for the dice
+        """
+
+        scores = get_score_table()
+        start = DICT_MULTISET_INDEX[tuple(sorted(dice))] * NUMBER_OF_ROWS
+
+        best_cell = None
+        best_gain = None
+        for col_id, row_id in open_cells:
+            gain = self.get_cell_gain(lst_values, lst_filled, col_id, row_id, scores[start + row_id])
+            if best_gain is None or gain > best_gain:
+                best_cell = (col_id, row_id)
+                best_gain = gain
+
+        return best_cell, best_gain
+
+    def choose_hold(self, dice=(), rolls_left=0, lst_values=(), lst_filled=(), open_cells=()):
+        """
+        :return: (held mask, expected gain)
+        """
+
+        key = ("sheet", tuple(tuple(lst_col) for lst_col in lst_values), tuple(lst_filled), tuple(open_cells))
+        lst_expect = get_turn_expect(key, rolls_left, lambda: self.get_terminal(lst_values, lst_filled, open_cells))
+
+        return suggest_hold(dice, rolls_left, lst_expect)
+
+    def choose_announcement(self, dice=(), lst_values=(), lst_filled=(), open_cells=()):
+        """
+        Called after the first roll: announce a row of the Announcement column or play on.
+
+        :return: row id to announce or None
+        """
+
+        multiset_index = DICT_MULTISET_INDEX[tuple(sorted(dice))]
+        filled_mask = lst_filled[COL_ANNOUNCEMENT]
+        column_value = self.get_column_value(COL_ANNOUNCEMENT, filled_mask)
+        lst_announcement_value = self.get_announcement_values()
+
+        best_row = None
+        best_gain = None
+        for row_id in get_open_rows(COL_ANNOUNCEMENT, filled_mask):
+            gain = (lst_announcement_value[row_id][multiset_index] +
+                    self.get_column_value(COL_ANNOUNCEMENT, filled_mask | (1 << row_id)) - column_value)
+            if best_gain is None or gain > best_gain:
+                best_row = row_id
+                best_gain = gain
+
+        lst_other = [cell for cell in open_cells if cell[0] != COL_ANNOUNCEMENT]
+        if best_row is None or not lst_other:
+            return best_row
+
+        held_mask, other_gain = self.choose_hold(dice, ANNOUNCEMENT_ROLLS, lst_values, lst_filled, lst_other)
+        return best_row if best_gain > other_gain else None
+
+    def precompute(self, verbose=False):
+        for col_id, col_name in DICT_COL_HEADER.items():
+            start_time = time.time()
+            self.get_column_value(col_id, 0)
+            self.store.flush()
+            if verbose:
+                print("{0}: {1:.2f} ({2:.1f}s)".format(col_name, self.get_column_value(col_id, 0),
+                                                      time.time() - start_time))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Jamb sheet solver")
+    parser.add_argument("--path", default=DEFAULT_VALUE_PATH, help="column value file")
+    parser.add_argument("--precompute", action="store_true", help="compute every column value")
+    args = parser.parse_args()
+
+    solver = SheetSolver(StateValueStore(args.path))
+    if args.precompute:
+        solver.precompute(verbose=True)
+
+    for col_id, col_name in DICT_COL_HEADER.items():
+        value = solver.store.get(col_id, 0)
+        print("{0}: {1}".format(col_name, "-" if value is None else "{0:.2f}".format(value)))
+
+    solver.store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+"""
+Monte Carlo simulation of whole Jamb games without the GUI.
+
+Games are split in shards of --chunk games, every shard seeds its own
+random streams from (--seed, shard index), so the results are the same
+for any number of worker processes:
+
+    python jamb_simulate.py --games 100000 --players 2 --strategy greedy
+    python jamb_simulate.py --games 20000 --strategy greedy,random --hand-turns 4 --output result.json
+    python jamb_simulate.py --games 100000 --players 4 --export sheets.npy    # every sheet, see jamb_export
+
+Results are aggregated per column (DICT_COL_HEADER), per row category
+(DICT_ROW_HEADER) and per player game total.
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import multiprocessing
+from collections import Counter
+
+from jamb_rules import HAND_TURNS, LAST_TURN_EXTRA_ROLLS, TOTAL_GAME_TURNS, BONUS_THRESHOLD, BONUS_VALUE, \
+    NUMBER_OF_ROWS, NUMBER_OF_COLS, DICT_ROW_HEADER, DICT_COL_HEADER, COL_CHECKOUT, HouseRules
+from jamb_game import JambGame
+from jamb_random import DiceRandom
+from jamb_strategy import DICT_STRATEGY, get_strategy, play_turn
+from jamb_history import pack_cells
+from jamb_export import SheetArrayWriter
+
+# Every cell of the sheet except the Checkout column can be written once
+MAXIMUM_GAME_TURNS = (NUMBER_OF_COLS - 1) * NUMBER_OF_ROWS
+
+LST_PERCENTILE = [5, 25, 50, 75, 95]
+
+
+class SimulationStats(object):
+    """
+    Histograms of the simulated scores, they merge without losing anything.
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.total = Counter()
+        self.dict_col = dict((col_id, Counter()) for col_id in DICT_COL_HEADER)
+        self.dict_row = dict((row_id, Counter()) for row_id in DICT_ROW_HEADER)
+        self.dict_seat = {}
+
+        # Packed sheets of the games (jamb_history.pack_cells), only for the export
+        self.sheet_data = None
+
+    def add_game(self, game=None):
+        self.games += 1
+
+        for seat, sheet in enumerate(game.lst_sheet):
+            self.total[sheet.total] += 1
+            self.dict_seat.setdefault(seat, Counter())[sheet.total] += 1
+
+            for col_id in DICT_COL_HEADER:
+                self.dict_col[col_id][sheet.col_total[col_id]] += 1
+
+                for row_id in DICT_ROW_HEADER:
+                    if sheet.is_filled(col_id, row_id):
+                        self.dict_row[row_id][sheet.get_value(col_id, row_id)] += 1
+
+    def merge(self, other=None):
+        self.games += other.games
+        self.total.update(other.total)
+        for col_id, counter in other.dict_col.items():
+            self.dict_col[col_id].update(counter)
+        for row_id, counter in other.dict_row.items():
+            self.dict_row[row_id].update(counter)
+        for seat, counter in other.dict_seat.items():
+            self.dict_seat.setdefault(seat, Counter()).update(counter)
+
+    @staticmethod
+    def get_summary(counter=None):
+        """
+        :return: dict of count, mean, std, min, max and percentiles of a histogram
+        """
+
+        count = sum(counter.values())
+        if not count:
+            return {"count": 0}
+
+        # Sorted values keep the float sums the same whatever the merge order of the shards
+        lst_item = sorted(counter.items())
+        mean = sum(value * number for value, number in lst_item) / float(count)
+        variance = sum((value - mean) ** 2 * number for value, number in lst_item) / float(count)
+
+        dict_summary = {"count": count, "mean": mean, "std": variance ** 0.5, "min": min(counter),
+                        "max": max(counter)}
+
+        lst_rank = [(percentile, percentile / 100.0 * (count - 1)) for percentile in LST_PERCENTILE]
+        seen = 0
+        for value, number in lst_item:
+            seen += number
+            while lst_rank and lst_rank[0][1] < seen:
+                dict_summary["p{0}".format(lst_rank.pop(0)[0])] = value
+
+        return dict_summary
+
+    def to_dict(self):
+        return {
+            "games": self.games,
+            "total": self.get_summary(self.total),
+            "seats": dict((seat, self.get_summary(counter)) for seat, counter in sorted(self.dict_seat.items())),
+            "columns": dict((DICT_COL_HEADER[col_id], self.get_summary(counter))
+                            for col_id, counter in self.dict_col.items()),
+            "rows": dict((DICT_ROW_HEADER[row_id], self.get_summary(counter))
+                         for row_id, counter in self.dict_row.items()),
+        }
+
+
+def get_player_names(lst_strategy_name=()):
+    return ["{0} {1}".format(name, seat + 1) for seat, name in enumerate(lst_strategy_name)]
+
+
+def run_shard(dict_shard=None):
+    """
+    Play one shard of games, top level function to be picklable by multiprocessing.
+
+    :param dict_shard: seed, shard_index, games, strategies, game_turns, rules and export arguments
+    :return: SimulationStats
+    """
+
+    seed_text = "jamb-{0}-{1}".format(dict_shard["seed"], dict_shard["shard_index"])
+
+    dice_rng = DiceRandom(seed_text)
+    rng = random.Random(seed_text + "-strategy")
+
+    rules = HouseRules(**dict_shard["rules"])
+    lst_strategy = [get_strategy(name, rng) for name in dict_shard["strategies"]]
+    lst_player_name = get_player_names(dict_shard["strategies"])
+
+    stats = SimulationStats()
+    lst_data = [] if dict_shard.get("export") else None
+    for i in range(dict_shard["games"]):
+        game = JambGame(lst_player_name, dict_shard["game_turns"], rules, dice_rng)
+        game.start()
+
+        while not game.is_finished():
+            if play_turn(game, lst_strategy[game.player_index]) is None:
+                raise ValueError("The rules leave no roll to play a turn")
+
+        stats.add_game(game)
+        if lst_data is not None:
+            lst_data.extend(pack_cells(sheet.values) for sheet in game.lst_sheet)
+
+    if lst_data is not None:
+        stats.sheet_data = b"".join(lst_data)
+
+    return stats
+
+
+def get_shards(games=0, chunk=1, dict_shard=None):
+    lst_shard = []
+    shard_index = 0
+    while games > 0:
+        dict_item = dict(dict_shard)
+        dict_item["shard_index"] = shard_index
+        dict_item["games"] = min(chunk, games)
+        lst_shard.append(dict_item)
+        games -= chunk
+        shard_index += 1
+
+    return lst_shard
+
+
+def simulate(lst_shard=(), workers=1, writer=None):
+    """
+    :param writer: jamb_export.SheetArrayWriter of the sheets, in shard order
+    """
+
+    stats = SimulationStats()
+
+    def add_shard(shard_stats=None):
+        stats.merge(shard_stats)
+        if writer is not None:
+            writer.add_data(shard_stats.sheet_data, lst_player_name)
+
+    lst_player_name = get_player_names(lst_shard[0]["strategies"]) if lst_shard else []
+
+    if workers < 2 or len(lst_shard) < 2:
+        for dict_shard in lst_shard:
+            add_shard(run_shard(dict_shard))
+        return stats
+
+    pool = multiprocessing.Pool(workers)
+    try:
+        for shard_stats in (pool.imap if writer is not None else pool.imap_unordered)(run_shard, lst_shard):
+            add_shard(shard_stats)
+    finally:
+        pool.close()
+        pool.join()
+
+    return stats
+
+
+def print_summary(name="", dict_summary=None):
+    if not dict_summary.get("count"):
+        print("{0:<14}{1:>10}".format(name, "-"))
+        return
+
+    print("{0:<14}{1:>10.2f}{2:>10.2f}{3:>8}{4:>8}{5:>8}{6:>8}{7:>8}".format(
+        name, dict_summary["mean"], dict_summary["std"], dict_summary["min"], dict_summary["p5"],
+        dict_summary["p50"], dict_summary["p95"], dict_summary["max"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Jamb Monte Carlo simulation")
+    parser.add_argument("--games", type=int, default=1000, help="number of games")
+    parser.add_argument("--players", type=int, default=1, help="players in every game")
+    parser.add_argument("--strategy", default="greedy",
+                        help="strategy name or comma separated names per seat: {0}".format(
+                            ", ".join(sorted(DICT_STRATEGY))))
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(), help="worker processes")
+    parser.add_argument("--seed", default="0", help="seed of the simulation")
+    parser.add_argument("--chunk", type=int, default=100, help="games per shard")
+    parser.add_argument("--game-turns", type=int, default=TOTAL_GAME_TURNS,
+                        help="rounds of a game, at most {0}, 0 plays until the sheets are full".format(
+                            MAXIMUM_GAME_TURNS))
+    parser.add_argument("--hand-turns", type=int, default=HAND_TURNS, help="rolls per turn")
+    parser.add_argument("--extra-rolls", type=int, default=LAST_TURN_EXTRA_ROLLS, help="extra rolls of the last turn")
+    parser.add_argument("--bonus-threshold", type=int, default=BONUS_THRESHOLD, help="numbers sum for the bonus")
+    parser.add_argument("--bonus-value", type=int, default=BONUS_VALUE, help="bonus value")
+    parser.add_argument("--output", default="", help="write the results to a JSON file")
+    parser.add_argument("--export", default="", help="write every sheet to a .npy file (jamb_export)")
+    args = parser.parse_args()
+
+    lst_strategy_name = args.strategy.split(",")
+    for name in lst_strategy_name:
+        if name not in DICT_STRATEGY:
+            parser.error("unknown strategy: {0}".format(name))
+
+    if args.players < 1 or args.games < 1 or args.chunk < 1:
+        parser.error("--players, --games and --chunk must be positive")
+
+    if not 0 <= args.game_turns <= MAXIMUM_GAME_TURNS:
+        parser.error("--game-turns must be between 0 and {0}".format(MAXIMUM_GAME_TURNS))
+
+    if args.hand_turns < 1 or args.extra_rolls < 0:
+        parser.error("--hand-turns must be positive and --extra-rolls not negative")
+
+    lst_strategy_name = [lst_strategy_name[seat % len(lst_strategy_name)] for seat in range(args.players)]
+
+    dict_rules = {"hand_turns": args.hand_turns, "last_turn_extra_rolls": args.extra_rolls,
+                  "bonus_threshold": args.bonus_threshold, "bonus_value": args.bonus_value}
+    dict_shard = {"seed": args.seed, "strategies": lst_strategy_name, "game_turns": args.game_turns,
+                  "rules": dict_rules, "export": bool(args.export)}
+    lst_shard = get_shards(args.games, args.chunk, dict_shard)
+
+    writer = None
+    if args.export:
+        writer = SheetArrayWriter(args.export, args.players, "simulation",
+                                  {"seed": args.seed, "strategies": lst_strategy_name, "game_turns": args.game_turns,
+                                   "rules": dict_rules})
+
+    start_time = time.time()
+    stats = simulate(lst_shard, args.workers, writer)
+    elapsed = time.time() - start_time
+
+    if writer is not None:
+        writer.close()
+
+    print("{0} games, {1} players ({2}), {3} shards, {4:.1f}s".format(
+        stats.games, args.players, ", ".join(lst_strategy_name), len(lst_shard), elapsed))
+    print("{0:<14}{1:>10}{2:>10}{3:>8}{4:>8}{5:>8}{6:>8}{7:>8}".format(
+        "", "mean", "std", "min", "p5", "p50", "p95", "max"))
+
+    dict_result = stats.to_dict()
+    print_summary("Total", dict_result["total"])
+    for seat, dict_summary in dict_result["seats"].items():
+        print_summary("Seat {0}".format(seat + 1), dict_summary)
+
+    print("")
+    for col_id, col_name in DICT_COL_HEADER.items():
+        if col_id != COL_CHECKOUT or args.players > 1:
+            print_summary(col_name, dict_result["columns"][col_name])
+
+    print("")
+    for row_id, row_name in DICT_ROW_HEADER.items():
+        print_summary(row_name, dict_result["rows"][row_name])
+
+    if args.output:
+        dict_result["arguments"] = vars(args)
+        dict_result["seconds"] = elapsed
+        with open(args.output, "w") as file_:
+            json.dump(dict_result, file_, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
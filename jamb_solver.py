@@ -0,0 +1,254 @@
+"""
+"Which dice to hold" solver.
+
+One turn is solved with dynamic programming over the dice multisets:
+
+    V[0][M] = terminal value of ending the turn with multiset M
+    E[r][K] = sum(p(M' | K rolled) * V[r][M'])     K = kept dice, M' = K + rolled dice
+    V[r][M] = max(E[r-1][K] for K in sub-multisets of M)
+
+Keeping every die is the same as stopping, so V[r][M] >= V[0][M].
+There are 462 multisets of six dice and 924 kept multisets (0-6 dice),
+the transition lists between them are built once on first use and the
+solved turns are cached by (terminal key, rolls left).
+
+A search of a bot thread can be stopped early with search_stop(should_stop),
+solve_turn() then raises SearchCancelled.
+"""
+
+import itertools
+import threading
+from contextlib import contextmanager
+from math import factorial
+
+from jamb_rules import NUMBER_OF_DICE, NUMBER_OF_ROWS, ROW_MIN
+from jamb_table import LST_MULTISET, DICT_MULTISET_INDEX, NUMBER_OF_MULTISETS, get_score_table
+
+# Min row is better when lower, value it against the worst possible Min (five sixes)
+MIN_ROW_REFERENCE = 30
+
+MAXIMUM_CACHED_TURNS = 512
+
+LST_KEPT = [kept for size in range(NUMBER_OF_DICE + 1)
+            for kept in itertools.combinations_with_replacement(range(1, 7), size)]
+DICT_KEPT_INDEX = dict((kept, index) for index, kept in enumerate(LST_KEPT))
+
+_lst_transitions = None
+_lst_sub_kept = None
+_dict_turn_cache = {}
+_search_local = threading.local()
+
+
+class SearchCancelled(Exception):
+    pass
+
+
+@contextmanager
+def search_stop(should_stop=None):
+    """
+    The searches of this thread call should_stop() between their steps and stop when it returns True.
+    """
+
+    old_should_stop = getattr(_search_local, "should_stop", None)
+    _search_local.should_stop = should_stop
+    try:
+        yield
+    finally:
+        _search_local.should_stop = old_should_stop
+
+
+def check_search_stop():
+    should_stop = getattr(_search_local, "should_stop", None)
+    if should_stop is not None and should_stop():
+        raise SearchCancelled()
+
+
+def get_roll_probability(rolled=()):
+    """
+    :param rolled: sorted tuple of rolled dice
+    :return: probability to roll exactly this multiset with len(rolled) dice
+    """
+
+    permutations = factorial(len(rolled))
+    for dice_value in set(rolled):
+        permutations //= factorial(rolled.count(dice_value))
+
+    return permutations / float(6 ** len(rolled))
+
+
+def get_transitions():
+    """
+    :return: list indexed by kept index of [(multiset_index, probability), ...]
+    """
+
+    global _lst_transitions
+
+    if _lst_transitions is None:
+        dict_rolls = {}
+        for size in range(NUMBER_OF_DICE + 1):
+            dict_rolls[size] = [(rolled, get_roll_probability(rolled))
+                                for rolled in itertools.combinations_with_replacement(range(1, 7), size)]
+
+        lst_transitions = []
+        for kept in LST_KEPT:
+            lst_item = []
+            for rolled, probability in dict_rolls[NUMBER_OF_DICE - len(kept)]:
+                multiset = tuple(sorted(kept + rolled))
+                lst_item.append((DICT_MULTISET_INDEX[multiset], probability))
+            lst_transitions.append(lst_item)
+
+        _lst_transitions = lst_transitions
+
+    return _lst_transitions
+
+
+def get_sub_kept():
+    """
+    :return: list indexed by multiset index of the kept indexes it can hold,
+             the multiset itself (hold all, stop rolling) comes first
+    """
+
+    global _lst_sub_kept
+
+    if _lst_sub_kept is None:
+        lst_sub_kept = []
+        for multiset in LST_MULTISET:
+            lst_range = [range(multiset.count(dice_value), -1, -1) for dice_value in range(1, 7)]
+            lst_item = []
+            for lst_count in itertools.product(*lst_range):
+                kept = tuple(dice_value for dice_value, count in zip(range(1, 7), lst_count) for i in range(count))
+                lst_item.append(DICT_KEPT_INDEX[kept])
+            lst_sub_kept.append(lst_item)
+
+        _lst_sub_kept = lst_sub_kept
+
+    return _lst_sub_kept
+
+
+def get_row_value(row_id=0, score=0):
+    if row_id == ROW_MIN:
+        return MIN_ROW_REFERENCE - score
+    return score
+
+
+def get_open_rows_terminal(open_rows=()):
+    """
+    :param open_rows: row ids the turn can be written to
+    :return: list of NUMBER_OF_MULTISETS values, the best open row for each multiset
+    """
+
+    score_table = get_score_table()
+    lst_terminal = []
+    for multiset_index in range(NUMBER_OF_MULTISETS):
+        start = multiset_index * NUMBER_OF_ROWS
+        lst_value = [get_row_value(row_id, score_table[start + row_id]) for row_id in open_rows]
+        lst_terminal.append(max(lst_value) if lst_value else 0)
+
+    return lst_terminal
+
+
+def solve_turn(lst_terminal=(), rolls_left=0):
+    """
+    :param lst_terminal: NUMBER_OF_MULTISETS values of ending the turn with each multiset
+    :param rolls_left: number of rolls still available
+    :return: list of expected values indexed by kept index, after keeping the dice
+             there are rolls_left - 1 rolls to go (empty list when rolls_left is 0)
+    """
+
+    if rolls_left < 1:
+        return []
+
+    lst_transitions = get_transitions()
+    lst_sub_kept = get_sub_kept()
+
+    lst_value = list(lst_terminal)
+    lst_expect = []
+
+    for i in range(rolls_left):
+        check_search_stop()
+        lst_expect = [sum(lst_value[multiset_index] * probability for multiset_index, probability in lst_item)
+                      for lst_item in lst_transitions]
+
+        if i < rolls_left - 1:
+            lst_value = [max(lst_expect[kept_index] for kept_index in lst_kept) for lst_kept in lst_sub_kept]
+
+    return lst_expect
+
+
+def get_turn_expect(key=None, rolls_left=0, lst_terminal=None):
+    """
+    Cached solve_turn().
+
+    :param key: hashable key of the terminal values
+    :param lst_terminal: terminal values or callable returning them, used on cache miss
+    """
+
+    cache_key = (key, rolls_left)
+    lst_expect = _dict_turn_cache.get(cache_key)
+
+    if lst_expect is None:
+        if callable(lst_terminal):
+            lst_terminal = lst_terminal()
+
+        if len(_dict_turn_cache) >= MAXIMUM_CACHED_TURNS:
+            _dict_turn_cache.clear()
+
+        lst_expect = solve_turn(lst_terminal, rolls_left)
+        _dict_turn_cache[cache_key] = lst_expect
+
+    return lst_expect
+
+
+def get_held_mask(dice=(), kept=()):
+    """
+    :return: tuple of bool for each die, True if the die is held to keep the kept multiset
+    """
+
+    lst_need = list(kept)
+    lst_held = []
+    for dice_value in dice:
+        if dice_value in lst_need:
+            lst_need.remove(dice_value)
+            lst_held.append(True)
+        else:
+            lst_held.append(False)
+
+    return tuple(lst_held)
+
+
+def suggest_hold(dice=(), rolls_left=0, lst_expect=()):
+    """
+    :param dice: current dice values
+    :param rolls_left: number of rolls still available
+    :param lst_expect: result of solve_turn() for the same rolls_left
+    :return: (held mask, expected value)
+    """
+
+    multiset_index = DICT_MULTISET_INDEX[tuple(sorted(dice))]
+
+    if rolls_left < 1:
+        return tuple(True for dice_value in dice), None
+
+    best_kept_index = None
+    best_value = None
+    for kept_index in get_sub_kept()[multiset_index]:
+        value = lst_expect[kept_index]
+        if best_value is None or value > best_value:
+            best_kept_index = kept_index
+            best_value = value
+
+    return get_held_mask(dice, LST_KEPT[best_kept_index]), best_value
+
+
+def suggest_hold_for_cells(dice=(), rolls_left=0, open_cells=()):
+    """
+    :param dice: current dice values
+    :param rolls_left: number of rolls still available
+    :param open_cells: (col_id, row_id) cells the turn can be written to
+    :return: (held mask, expected value)
+    """
+
+    open_rows = tuple(sorted(set(row_id for col_id, row_id in open_cells)))
+    lst_expect = get_turn_expect(("rows", open_rows), rolls_left, lambda: get_open_rows_terminal(open_rows))
+
+    return suggest_hold(dice, rolls_left, lst_expect)
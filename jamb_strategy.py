@@ -0,0 +1,174 @@
+"""
+Players without a user: strategies that play whole turns of a JambGame.
+
+    strategy = get_strategy("greedy")
+    play_turn(game, strategy)
+
+DICT_STRATEGY holds the strategies that can be picked by name.
+"""
+
+import random
+from abc import ABC, abstractmethod
+
+from jamb_rules import COL_ANNOUNCEMENT
+from jamb_solver import get_row_value, suggest_hold_for_cells
+
+
+class Strategy(ABC):
+    """
+    Base of the strategies, they choose at least the cell to write.
+    """
+
+    name = ""
+
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else random.Random()
+
+    def choose_announcement(self, game=None):
+        """
+        :return: row id to announce after the first roll or None
+        """
+        return None
+
+    def choose_hold(self, game=None):
+        """
+        :return: held mask for the next roll, all dice held ends the rolls of the turn
+        """
+        return tuple(game.held)
+
+    @abstractmethod
+    def choose_cell(self, game=None):
+        """
+        :return: (col_id, row_id) to write
+        """
+
+
+class RandomStrategy(Strategy):
+
+    name = "random"
+
+    def choose_hold(self, game=None):
+        return tuple(self.rng.random() < 0.5 for dice in game.dices)
+
+    def choose_cell(self, game=None):
+        return self.rng.choice(game.get_open_cells())
+
+
+class GreedyStrategy(Strategy):
+    """
+    Holds dice with the hold solver for the open cells and writes the best row score.
+    """
+
+    name = "greedy"
+
+    def choose_hold(self, game=None):
+        held_mask, expected_value = suggest_hold_for_cells(tuple(game.dices), game.get_rolls_left(),
+                                                           game.get_open_cells())
+        return held_mask
+
+    def choose_cell(self, game=None):
+        scores = game.scores
+        return max(game.get_open_cells(), key=lambda cell: get_row_value(cell[1], scores[cell[1]]))
+
+
+class SolverStrategy(Strategy):
+    """
+    Plays with jamb_sheet_solver, run 'python jamb_sheet_solver.py --precompute' once before.
+    """
+
+    name = "solver"
+
+    def __init__(self, rng=None, solver=None):
+        super(SolverStrategy, self).__init__(rng)
+
+        if solver is None:
+            from jamb_sheet_solver import SheetSolver
+            solver = SheetSolver()
+
+        self.solver = solver
+
+    def get_sheet(self, game=None):
+        sheet = game.get_this_sheet()
+        return sheet.get_values_matrix(), list(sheet.filled)
+
+    def choose_announcement(self, game=None):
+        lst_values, lst_filled = self.get_sheet(game)
+        return self.solver.choose_announcement(tuple(game.dices), lst_values, lst_filled, game.get_open_cells())
+
+    def choose_hold(self, game=None):
+        lst_values, lst_filled = self.get_sheet(game)
+        held_mask, expected_value = self.solver.choose_hold(tuple(game.dices), game.get_rolls_left(), lst_values,
+                                                            lst_filled, game.get_open_cells())
+        return held_mask
+
+    def choose_cell(self, game=None):
+        lst_values, lst_filled = self.get_sheet(game)
+        cell, gain = self.solver.choose_cell(tuple(game.dices), lst_values, lst_filled, game.get_open_cells())
+        return cell
+
+
+DICT_STRATEGY = {}
+for strategy_class in [RandomStrategy, GreedyStrategy, SolverStrategy]:
+    DICT_STRATEGY[strategy_class.name] = strategy_class
+
+
+def get_strategy(name="", rng=None):
+    strategy_class = DICT_STRATEGY.get(name)
+    if strategy_class is None:
+        raise ValueError("Unknown strategy: {0}".format(name))
+    return strategy_class(rng=rng)
+
+
+def choose_action(game=None, strategy=None):
+    """
+    Next action of the current player, for local games and remote clients.
+
+    :return: ("roll", held mask or None), ("announce", row_id) or ("write", col_id, row_id)
+    """
+
+    if game.roll_turn == 0:
+        return "roll", None
+
+    if game.can_roll():
+        if game.can_announce():
+            row_id = strategy.choose_announcement(game)
+            if row_id is not None:
+                return "announce", row_id
+
+        # The Announcement column closes with the next roll
+        open_cells = game.get_open_cells()
+        if [cell for cell in open_cells if cell[0] != COL_ANNOUNCEMENT] or game.announcement:
+            held_mask = strategy.choose_hold(game)
+            if not all(held_mask):
+                return "roll", tuple(held_mask)
+
+    col_id, row_id = strategy.choose_cell(game)
+    return "write", col_id, row_id
+
+
+def play_turn(game=None, strategy=None):
+    """
+    Play the current turn of the game: rolls, holds, announcement and write.
+
+    :return: (col_id, row_id) written, None if the game is finished or the dice cannot be rolled
+    """
+
+    if game.is_finished():
+        return None
+
+    while True:
+        action = choose_action(game, strategy)
+
+        if action[0] == "roll":
+            if action[1] is not None:
+                game.set_held_mask(action[1])
+            if game.roll() is None:
+                # Rules without rolls, the turn cannot go on
+                return None
+
+        elif action[0] == "announce":
+            game.announce(action[1])
+
+        else:
+            game.write(action[1], action[2])
+            return action[1:]
@@ -0,0 +1,61 @@
+"""
+Precomputed score table for every roll of NUMBER_OF_DICE dice.
+
+Six dice have 6^6 = 46656 ordered outcomes but only 462 distinct multisets
+(sorted dice). The scores of every multiset are computed once with
+jamb_rules.score_dice() on first use and kept in a flat array:
+
+    SCORE_TABLE[multiset_index * NUMBER_OF_ROWS + row_id]
+
+A roll is scored by sorting its dice and looking up the multiset index.
+"""
+
+import itertools
+from array import array
+
+from jamb_rules import NUMBER_OF_DICE, NUMBER_OF_ROWS, score_dice as calc_score_dice
+from jamb_trace import traced
+
+LST_MULTISET = list(itertools.combinations_with_replacement(range(1, 7), NUMBER_OF_DICE))
+DICT_MULTISET_INDEX = dict((multiset, index) for index, multiset in enumerate(LST_MULTISET))
+
+NUMBER_OF_MULTISETS = len(LST_MULTISET)
+
+_score_table = None
+
+
+def get_score_table():
+    """
+    :return: array('H') of NUMBER_OF_MULTISETS * NUMBER_OF_ROWS scores
+    """
+
+    global _score_table
+
+    if _score_table is None:
+        table = array("H")
+        for multiset in LST_MULTISET:
+            table.extend(calc_score_dice(multiset))
+        _score_table = table
+
+    return _score_table
+
+
+def get_multiset_index(dice=()):
+    return DICT_MULTISET_INDEX[tuple(sorted(dice))]
+
+
+def get_multiset_scores(multiset_index=0):
+    start = multiset_index * NUMBER_OF_ROWS
+    return tuple(get_score_table()[start:start + NUMBER_OF_ROWS])
+
+
+@traced("score_dice")
+def score_dice(dice=()):
+    """
+    Table backed version of jamb_rules.score_dice().
+
+    :param dice: tuple of NUMBER_OF_DICE dice values (1-6)
+    :return: tuple of NUMBER_OF_ROWS scores, index is row id from DICT_ROW_HEADER
+    """
+
+    return get_multiset_scores(get_multiset_index(dice))
@@ -0,0 +1,222 @@
+"""
+Opt-in tracing of the turn phases, off unless JAMB_TRACE is set:
+
+    JAMB_TRACE=trace.json python Jumb.py      # Chrome trace events: chrome://tracing, Perfetto, speedscope
+    JAMB_TRACE=trace.folded python Jumb.py    # folded stacks: flamegraph.pl, speedscope
+
+Functions are traced with @traced(name) and blocks with `with span(name)`,
+both nest. Phases that go through the Qt event loop (the roll animation)
+use begin(name) / end(token). count(name) counts calls; count_widget_calls()
+counts the setEnabled and setText calls of widgets.
+The counters are written per turn (mark_turn) and a summary is printed when
+the program exits.
+
+When JAMB_TRACE is not set traced() returns the function itself and span()
+a shared null context, so the instrumented code runs as before.
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+TRACE_PATH = os.environ.get("JAMB_TRACE", "")
+
+# Chrome trace thread ids: nested spans, then the phases that cross the event loop
+TID_MAIN = 1
+TID_ASYNC = 2
+
+NULL_SPAN = nullcontext()
+
+
+class Tracer(object):
+
+    def __init__(self, path=""):
+        self.path = path
+        self.start_time = time.perf_counter()
+        self.lst_event = []
+        self.lst_stack = []
+        # Time of the child spans of every span of lst_stack, the folded stacks count self time
+        self.lst_child_time = []
+        self.dict_folded = Counter()
+        self.dict_time = Counter()
+        self.dict_calls = Counter()
+        self.dict_count = Counter()
+        self.dict_turn_count = Counter()
+        self.turns = 0
+        self.lock = threading.Lock()
+
+    def get_timestamp(self, perf_time=0.0):
+        return (perf_time - self.start_time) * 1e6
+
+    def add_span(self, name="", start=0.0, end=0.0, tid=TID_MAIN, stack=(), child_time=0.0):
+        duration = (end - start) * 1e6
+        with self.lock:
+            self.lst_event.append({"name": name, "ph": "X", "pid": 1, "tid": tid,
+                                   "ts": self.get_timestamp(start), "dur": duration})
+            self.dict_folded[";".join(tuple(stack) + (name,))] += duration - child_time
+            self.dict_time[name] += duration
+            self.dict_calls[name] += 1
+
+    @contextmanager
+    def span(self, name=""):
+        # Spans of other threads are not nested in the main stack
+        nested = threading.current_thread() is threading.main_thread()
+        stack = tuple(self.lst_stack) if nested else ()
+        if nested:
+            self.lst_stack.append(name)
+            self.lst_child_time.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            child_time = 0.0
+            if nested:
+                self.lst_stack.pop()
+                child_time = self.lst_child_time.pop()
+                if self.lst_child_time:
+                    self.lst_child_time[-1] += (end - start) * 1e6
+            self.add_span(name, start, end, TID_MAIN if nested else TID_ASYNC, stack, child_time)
+
+    def begin(self, name=""):
+        return name, time.perf_counter()
+
+    def end(self, token=None):
+        if token is not None:
+            self.add_span(token[0], token[1], time.perf_counter(), TID_ASYNC)
+
+    def count(self, name="", number=1):
+        with self.lock:
+            self.dict_count[name] += number
+            self.dict_turn_count[name] += number
+
+    def mark_turn(self):
+        """
+        Write the counters of the turn that ends.
+        """
+
+        with self.lock:
+            timestamp = self.get_timestamp(time.perf_counter())
+            if self.dict_turn_count:
+                self.lst_event.append({"name": "calls per turn", "ph": "C", "pid": 1, "tid": TID_MAIN,
+                                       "ts": timestamp, "args": dict(self.dict_turn_count)})
+            self.lst_event.append({"name": "turn {0}".format(self.turns + 1), "ph": "i", "s": "p", "pid": 1,
+                                   "tid": TID_MAIN, "ts": timestamp})
+            self.dict_turn_count = Counter()
+            self.turns += 1
+
+    def write(self):
+        if self.path.endswith(".json"):
+            dict_trace = {"traceEvents": [{"name": "thread_name", "ph": "M", "pid": 1, "tid": TID_MAIN,
+                                           "args": {"name": "main"}},
+                                          {"name": "thread_name", "ph": "M", "pid": 1, "tid": TID_ASYNC,
+                                           "args": {"name": "event loop phases"}}] + self.lst_event,
+                          "displayTimeUnit": "ms"}
+            with open(self.path, "w") as file_:
+                json.dump(dict_trace, file_)
+        else:
+            with open(self.path, "w") as file_:
+                for stack, duration in sorted(self.dict_folded.items()):
+                    file_.write("{0} {1}\n".format(stack, int(round(duration))))
+
+    def print_summary(self, file_=None):
+        file_ = file_ or sys.stderr
+        turns = max(self.turns, 1)
+
+        file_.write("{0:<36}{1:>10}{2:>12}{3:>12}\n".format("Trace: {0} turns".format(self.turns), "calls",
+                                                            "total ms", "mean us"))
+        for name, duration in self.dict_time.most_common():
+            calls = self.dict_calls[name]
+            file_.write("{0:<36}{1:>10}{2:>12.1f}{3:>12.1f}\n".format(name, calls, duration / 1000.0,
+                                                                      duration / calls))
+
+        file_.write("{0:<36}{1:>10}{2:>12}{3:>12}\n".format("", "calls", "", "per turn"))
+        for name, number in self.dict_count.most_common():
+            file_.write("{0:<36}{1:>10}{2:>12}{3:>12.1f}\n".format(name, number, "", number / float(turns)))
+
+    def close(self):
+        self.write()
+        self.print_summary()
+
+
+TRACER = Tracer(TRACE_PATH) if TRACE_PATH else None
+
+if TRACER is not None:
+    atexit.register(TRACER.close)
+
+
+def is_enabled():
+    return TRACER is not None
+
+
+def traced(name=""):
+    """
+    Decorator, the function is returned as it is when tracing is off.
+    """
+
+    def decorator(func):
+        if TRACER is None:
+            return func
+
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with TRACER.span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def span(name=""):
+    return TRACER.span(name) if TRACER is not None else NULL_SPAN
+
+
+def begin(name=""):
+    return TRACER.begin(name) if TRACER is not None else None
+
+
+def end(token=None):
+    if TRACER is not None:
+        TRACER.end(token)
+
+
+def count(name="", number=1):
+    if TRACER is not None:
+        TRACER.count(name, number)
+
+
+def mark_turn():
+    if TRACER is not None:
+        TRACER.mark_turn()
+
+
+def count_widget_calls(lst_widget=(), lst_method=("setEnabled", "setText")):
+    """
+    Count the calls of the widgets to the methods, from Python.
+    The methods are wrapped on the instances, shiboken ignores methods set on the Qt classes.
+    """
+
+    if TRACER is None:
+        return
+
+    for widget in lst_widget:
+        for method_name in lst_method:
+            method = getattr(widget, method_name, None)
+            if method is None or getattr(method, "traced", False):
+                continue
+
+            def wrapper(*args, method=method, counter_name=method_name):
+                TRACER.count(counter_name)
+                return method(*args)
+
+            wrapper.traced = True
+            setattr(widget, method_name, wrapper)
@@ -20,7 +20,7 @@ def make_build(script_target=""):
         "packages": ["os", "sys"],
         "include_files": include_files,
         "excludes": ["Tkinter", "Tkconstants", "tcl", ],
-        "includes": ["PySide2.QtCore", "PySide2.QtWidgets","PySide2.QtGui", "shiboken2"],
+        "includes": ["PySide2.QtCore", "PySide2.QtWidgets","PySide2.QtGui", "PySide2.QtSvg", "shiboken2"],
         "build_exe": "./build_script/Jamb-x64"
     }
 
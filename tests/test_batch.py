@@ -0,0 +1,31 @@
+import itertools
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from jamb_rules import NUMBER_OF_DICE, score_dice
+from jamb_batch import score_batch
+
+
+def test_score_batch_matches_score_dice():
+    all_dice = np.array(list(itertools.product(range(1, 7), repeat=NUMBER_OF_DICE)))
+    batch_scores = score_batch(all_dice)
+
+    lst_mismatch = []
+    for dice, row_scores in zip(all_dice, batch_scores):
+        dice = tuple(int(dice_value) for dice_value in dice)
+        if list(row_scores) != score_dice(dice):
+            lst_mismatch.append((dice, list(row_scores), score_dice(dice)))
+
+    assert lst_mismatch == []
+
+
+def test_score_batch_two_trillings():
+    # The highest face of the two with 3 dice counts, there is no pair for a Full House
+    assert list(score_batch([[1, 1, 1, 2, 2, 2]])[0]) == score_dice((1, 1, 1, 2, 2, 2))
+
+
+def test_score_batch_shape():
+    with pytest.raises(ValueError):
+        score_batch([[1, 2, 3]])
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from jamb_game import JambGame
+from jamb_random import DiceRandom
+from jamb_journal import RECORD_SNAPSHOT, GameJournal, read_records
+from jamb_protocol import FRAME_HEADER, EVENT_WRITE
+from jamb_strategy import get_strategy, play_turn
+
+
+def get_state(game=None):
+    return ([(list(sheet.values), list(sheet.filled)) for sheet in game.lst_sheet], game.player_index,
+            game.roll_turn, list(game.dices), list(game.held))
+
+
+def test_resume_twice_after_bad_record(tmp_path):
+    path = str(tmp_path / "journal.bin")
+    strategy = get_strategy("greedy", random.Random(0))
+
+    game = JambGame(["Ana", "Bob"], rng=DiceRandom(1))
+    journal = GameJournal(path)
+    journal.start(game)
+    game.start()
+    for turn in range(5):
+        play_turn(game, strategy)
+    game.roll()
+    journal.close()
+
+    # Write to a cell that does not exist in the last write record, the records of the next turn follow it
+    lst_record, end_offset = read_records(path)
+    offset = [offset for offset, payload in lst_record if payload[0] == EVENT_WRITE][-1]
+    with open(path, "r+b") as file_:
+        file_.seek(offset + FRAME_HEADER.size + 2)
+        file_.write(b"\xff")
+
+    journal = GameJournal(path)
+    game = journal.resume()
+    assert game.roll_turn > 0
+
+    # Quit in the middle of the turn, before the snapshot of the next turn
+    assert game.set_held_mask([not held for held in game.held])
+    state = get_state(game)
+    journal.close()
+
+    # The moves played after the first resume are kept
+    journal = GameJournal(path)
+    game = journal.resume()
+    assert get_state(game) == state
+    journal.close()
+
+
+def test_resume_damaged_snapshot(tmp_path):
+    path = str(tmp_path / "journal.bin")
+    strategy = get_strategy("greedy", random.Random(0))
+
+    game = JambGame(["Ana", "Bob"], rng=DiceRandom(1))
+    journal = GameJournal(path)
+    journal.start(game)
+    game.start()
+    for turn in range(3):
+        play_turn(game, strategy)
+    journal.close()
+
+    # A whole record with the snapshot cut in the middle
+    lst_record, end_offset = read_records(path)
+    offset, payload = [(offset, payload) for offset, payload in lst_record if payload[0] == RECORD_SNAPSHOT][-1]
+    with open(path, "rb") as file_:
+        data = file_.read()
+    end = offset + FRAME_HEADER.size + len(payload)
+    for size in [2, len(payload) // 2]:
+        with open(path, "wb") as file_:
+            file_.write(data[:offset] + FRAME_HEADER.pack(size) + payload[:size] + data[end:])
+
+        with pytest.raises(ValueError):
+            GameJournal(path).resume()
@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+from jamb_protocol import encode_message, decode_message, get_sample_messages, pack_text
+
+
+def test_same_messages_as_json():
+    # Tuples come back as lists, like JSON
+    for message in get_sample_messages(games=2):
+        assert decode_message(encode_message(message)) == json.loads(json.dumps(message)), message
+
+
+@pytest.mark.parametrize("text", ["", "a" * 254, "a" * 255, "é" * 127, "a" + "é" * 127, "€" * 85])
+def test_texts_up_to_255_bytes(text):
+    for message in [{"type": "join", "table": text, "name": text, "seats": 2},
+                    {"type": "joined", "table": text, "seat": 1, "seats": 2},
+                    {"type": "error", "message": text},
+                    {"type": "event", "event": "closed", "table": text, "reason": text},
+                    {"type": "event", "event": "start", "table": text, "players": [text, "Bob"], "seat": 0,
+                     "game_turns": 0}]:
+        assert decode_message(encode_message(message)) == message
+
+
+@pytest.mark.parametrize("text", ["a" * 256, "é" * 128, "€" * 86])
+def test_texts_over_255_bytes(text):
+    with pytest.raises(ValueError):
+        pack_text(text)
+
+    with pytest.raises(ValueError):
+        encode_message({"type": "error", "message": text})
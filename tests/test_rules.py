@@ -0,0 +1,249 @@
+import random
+import itertools
+
+from jamb_rules import HAND_TURNS, LAST_TURN_EXTRA_ROLLS, NUMBER_OF_DICE, NUMBER_OF_ROWS, NUMBER_OF_COLS, COL_FREE, \
+    COL_UP, COL_DOWN, COL_MAX_MIN, COL_ANNOUNCEMENT, COL_CHECKOUT, ROW_MAX, ROW_MIN, get_open_mask, get_mask_rows, \
+    score_dice
+from jamb_table import score_dice as score_dice_table
+from jamb_game import JambGame
+from jamb_random import DiceRandom
+
+
+def get_direction_rows(lst_filled=(), row_start=0, row_end=0, direction=0):
+    """
+    Open row of JambPlayerTable.set_column_rule_direction() of the first version of Jumb.py:
+    the row after the last written row, direction 1 goes from row_end to row_start.
+    """
+
+    lst_index = list(range(row_start, row_end + 1))
+    if direction == 1:
+        lst_index.sort(reverse=True)
+
+    row_edit = lst_index[0]
+    for i, row in enumerate(lst_index):
+        if lst_filled[row] and i < len(lst_index) - 1:
+            row_edit = lst_index[i + 1]
+
+    return set() if lst_filled[row_edit] else {row_edit}
+
+
+def get_column_rows(col_id=0, lst_filled=()):
+    """
+    Open rows of JambPlayerTable.set_column_rules() of the first version of Jumb.py.
+    """
+
+    if col_id in [COL_FREE, COL_ANNOUNCEMENT]:
+        return set(row for row in range(NUMBER_OF_ROWS) if not lst_filled[row])
+
+    if col_id == COL_UP:
+        return get_direction_rows(lst_filled, 0, NUMBER_OF_ROWS - 1, 1)
+
+    if col_id == COL_DOWN:
+        return get_direction_rows(lst_filled, 0, NUMBER_OF_ROWS - 1, 0)
+
+    if col_id == COL_MAX_MIN:
+        return get_direction_rows(lst_filled, 0, ROW_MAX, 1) | get_direction_rows(lst_filled, ROW_MIN,
+                                                                                   NUMBER_OF_ROWS - 1, 0)
+
+    return set()
+
+
+def get_sign_dict(dice=()):
+    """
+    DicesTableWdg.get_sign_dict() of the first version of Jumb.py, key is row id + 1.
+    """
+
+    dict_dices = {}
+    for value in dice:
+        dict_dices[value] = dict_dices.get(value, 0) + 1
+
+    dict_result = dict((i, 0) for i in range(NUMBER_OF_ROWS))
+    lst_dice = []
+
+    for dice in sorted(dict_dices):
+        dice_count = dict_dices.get(dice)
+        value = dice_count * dice
+        lst_dice.extend([dice] * dice_count)
+        dict_result[dice] = value
+
+        if dice_count >= 3:  # Trilling
+            dict_result[9] = value + 30
+
+            for dice_other in sorted(dict_dices):
+                other_dice_count = dict_dices.get(dice_other)
+                if dice != dice_other and other_dice_count == 2:
+                    dict_result[10] = value + dice_other * other_dice_count + 40
+
+            if dice_count >= 4:  # Poker
+                dict_result[12] = value + 50
+
+                if dice_count >= 5:  # Jamb
+                    add_value = 60
+                    if dice == 1:
+                        value = 100
+                        add_value = 0
+
+                    if dice_count == 6:
+                        add_value = 0
+                        value = 150 if dice == 1 else 100
+
+                    dict_result[13] = value + add_value
+
+    dict_result[7] = sum(lst_dice)
+    dict_result[8] = sum(lst_dice[:-1])
+
+    if len(dict_dices) >= NUMBER_OF_DICE - 1:  # Straight
+        value = 0
+        if len(set(dict_dices) & {1, 2, 3, 4, 5}) == 5:
+            value = 45
+        if len(set(dict_dices) & {2, 3, 4, 5, 6}) == 5:
+            value = 50
+        if len(dict_dices) == NUMBER_OF_DICE:
+            value = 100
+        if value:
+            dict_result[11] = value
+
+    return dict_result
+
+
+def test_score_dice_matches_sign_dict():
+    for dice in itertools.product(range(1, 7), repeat=NUMBER_OF_DICE):
+        dict_sign = get_sign_dict(dice)
+        lst_score = [dict_sign.get(row_id + 1, 0) for row_id in range(NUMBER_OF_ROWS)]
+        assert list(score_dice(dice)) == lst_score, dice
+        assert list(score_dice_table(dice)) == lst_score, dice
+
+
+def test_open_mask_matches_column_rules():
+    rng = random.Random(0)
+
+    for col_id in range(NUMBER_OF_COLS):
+        for sheet in range(200):
+            lst_filled = [False] * NUMBER_OF_ROWS
+            filled_mask = 0
+
+            while True:
+                open_mask = get_open_mask(col_id, filled_mask)
+                assert set(get_mask_rows(open_mask)) == get_column_rows(col_id, lst_filled), (col_id, filled_mask)
+                if not open_mask:
+                    break
+
+                row_id = rng.choice(get_mask_rows(open_mask))
+                lst_filled[row_id] = True
+                filled_mask |= 1 << row_id
+
+            # Every cell is reachable, the Checkout column is only written by a checkout
+            assert all(lst_filled) == (col_id != COL_CHECKOUT)
+
+
+def get_expected_masks(game=None):
+    """
+    Cells of the current player with the column rules, the announcement and the checkout of the first version.
+    """
+
+    sheet = game.get_this_sheet()
+    lst_mask = [0] * NUMBER_OF_COLS
+
+    if game.roll_turn == 0:
+        return lst_mask
+
+    if sheet.checkout:
+        lst_mask[COL_CHECKOUT] = 1 << sheet.checkout_row_index
+        return lst_mask
+
+    if game.announcement:
+        lst_mask[COL_ANNOUNCEMENT] = 1 << game.announcement_row
+        return lst_mask
+
+    for col_id in range(COL_CHECKOUT):
+        if col_id == COL_ANNOUNCEMENT and game.roll_turn > 1:
+            continue
+
+        lst_filled = [sheet.is_filled(col_id, row_id) for row_id in range(NUMBER_OF_ROWS)]
+        for row_id in get_column_rows(col_id, lst_filled):
+            lst_mask[col_id] |= 1 << row_id
+
+    return lst_mask
+
+
+def test_open_masks_of_random_games():
+    rng = random.Random(1)
+
+    for i in range(20):
+        game = JambGame(["Ana", "Bob"], rng=DiceRandom(i))
+        game.start()
+
+        while not game.is_finished():
+            assert game.get_open_masks() == get_expected_masks(game)
+
+            lst_cell = game.get_open_cells()
+            if game.can_announce() and rng.random() < 0.2:
+                row_id = rng.choice(get_mask_rows(game.get_open_masks()[COL_ANNOUNCEMENT]) or [-1])
+                if row_id >= 0:
+                    assert game.announce(row_id)
+                    continue
+
+            if game.can_roll() and (not lst_cell or rng.random() < 0.5):
+                game.set_held_mask([rng.random() < 0.5 for dice in game.dices])
+                assert game.roll() is not None
+            else:
+                assert game.write(*rng.choice(lst_cell))
+
+        assert all(sheet.is_full() for sheet in game.lst_sheet)
+
+
+def test_announcement_and_checkout():
+    game = JambGame(["Ana", "Bob"], rng=DiceRandom(0))
+    game.start()
+
+    game.roll()
+    assert game.can_announce()
+    assert game.announce(ROW_MAX)
+    assert game.get_open_cells() == [(COL_ANNOUNCEMENT, ROW_MAX)]
+
+    # The next player has to write the same row in the Checkout column
+    bob = game.lst_sheet[1]
+    assert bob.checkout and bob.checkout_row_index == ROW_MAX
+
+    # An announced turn can use every roll
+    while game.can_roll():
+        game.roll()
+    assert game.roll_turn == HAND_TURNS
+    assert game.write(COL_ANNOUNCEMENT, ROW_MAX)
+
+    assert game.player_index == 1
+    game.roll()
+    assert not game.can_announce()
+    assert game.get_open_cells() == [(COL_CHECKOUT, ROW_MAX)]
+    assert not game.write(COL_FREE, ROW_MAX)
+    assert game.write(COL_CHECKOUT, ROW_MAX)
+    assert not bob.checkout and bob.is_filled(COL_CHECKOUT, ROW_MAX)
+
+    # Writing to the Announcement column after the first roll announces it
+    game.roll()
+    assert game.write(COL_ANNOUNCEMENT, ROW_MIN)
+    assert bob.checkout and bob.checkout_row_index == ROW_MIN
+
+
+def test_only_announcement_column_left():
+    game = JambGame(["Ana"], rng=DiceRandom(0))
+    sheet = game.lst_sheet[0]
+    for col_id in range(COL_ANNOUNCEMENT):
+        for row_id in range(NUMBER_OF_ROWS):
+            sheet.write(col_id, row_id, 0)
+    game.start()
+
+    # The Announcement column closes with the second roll, the turn has to announce or write
+    game.roll()
+    assert not game.can_roll()
+    assert game.get_open_cells() == [(COL_ANNOUNCEMENT, row_id) for row_id in range(NUMBER_OF_ROWS)]
+    assert game.announce(ROW_MAX)
+    assert game.can_roll()
+    assert game.get_total_roll_turns() == HAND_TURNS
+
+    # The last empty cell of the sheet has the extra rolls of the last turn
+    for row_id in range(NUMBER_OF_ROWS - 1):
+        sheet.write(COL_ANNOUNCEMENT, row_id, 0)
+    game.start()
+    assert game.is_last_turn()
+    assert game.get_total_roll_turns() == HAND_TURNS + LAST_TURN_EXTRA_ROLLS
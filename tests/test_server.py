@@ -0,0 +1,95 @@
+import asyncio
+
+from jamb_server import MAXIMUM_NAME_BYTES, ClientConnection, JambServer
+from jamb_protocol import encode_message, read_message
+
+
+async def join(host="", port=0, name="", seats=2):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(encode_message({"type": "join", "table": "t1", "name": name, "seats": seats}))
+    message = await read_message(reader)
+    assert message["type"] == "joined"
+    return reader, writer, message
+
+
+async def read_event(reader=None, event=""):
+    while True:
+        message = await asyncio.wait_for(read_message(reader), 5)
+        assert message["type"] != "error", message
+        if message.get("event") == event:
+            return message
+
+
+def test_leave_before_start_renumbers_seats():
+
+    async def run():
+        server = JambServer(seed=1)
+        host, port = await server.start("127.0.0.1", 0)
+        try:
+            dict_client = {}
+            for name in ["A", "B", "C"]:
+                dict_client[name] = await join(host, port, name, 4)
+
+            dict_client.pop("A")[1].close()
+            # The server sees A leave before D and E join
+            await asyncio.sleep(0.1)
+            for name in ["D", "E"]:
+                dict_client[name] = await join(host, port, name, 4)
+
+            dict_seat = {}
+            for name, (reader, writer, joined) in dict_client.items():
+                message = await read_event(reader, "start")
+                assert message["players"] == ["B", "C", "D", "E"]
+                dict_seat[name] = message["seat"]
+
+            assert dict_seat == {"B": 0, "C": 1, "D": 2, "E": 3}
+
+            # The player of seat 0 plays the first turn
+            reader, writer, joined = dict_client["B"]
+            writer.write(encode_message({"type": "roll"}))
+            message = await read_event(reader, "roll")
+            assert message["roll_turn"] == 1
+
+            for reader, writer, joined in dict_client.values():
+                writer.close()
+        finally:
+            server.close()
+
+    asyncio.run(run())
+
+
+class FakeWriter(object):
+
+    class transport(object):
+
+        @staticmethod
+        def get_write_buffer_size():
+            return 0
+
+    def __init__(self):
+        self.data = b""
+
+    def is_closing(self):
+        return False
+
+    def write(self, data=b""):
+        self.data += data
+
+
+def test_long_names():
+    server = JambServer(seed=1)
+
+    client = ClientConnection(FakeWriter())
+    assert server.join(client, {"type": "join", "table": "t", "name": "A" * 255}) is not None
+    assert server.join(client, {"type": "join", "table": "t" * 255, "name": "A"}) is not None
+    assert client.table is None
+
+    lst_client = [ClientConnection(FakeWriter()) for i in range(2)]
+    for i, client in enumerate(lst_client):
+        assert server.join(client, {"type": "join", "table": "t", "name": "{0}".format(i) * MAXIMUM_NAME_BYTES}) is None
+
+    # Both leave even if the "closed" reason cannot be encoded
+    lst_client[0].name = "A" * 255
+    server.leave(lst_client[0])
+    assert lst_client[1].table is None
+    assert "t" not in server.dict_table